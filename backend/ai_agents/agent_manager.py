@@ -1,8 +1,13 @@
 """
 Agent Manager - orchestrates all AI agents for complete job analysis
 """
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterator, Optional, Tuple
+import contextvars
+import copy
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
 from datetime import datetime
 from sqlalchemy.orm import Session
 from models.job import Job, JobAnalysis
@@ -12,6 +17,8 @@ from ai_agents.matcher import ResumeMatcher
 from ai_agents.enhanced_ats_scorer import EnhancedATSScorer
 from ai_agents.optimizer import ApplicationOptimizer
 from ai_agents.researcher import CompanyResearcher
+from config import settings
+from database import SessionLocal
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -20,15 +27,23 @@ logger = setup_logger(__name__)
 class AgentManager:
     """Manages and orchestrates all AI agents for job analysis"""
     
-    def __init__(self, db: Session, preferred_provider: str = "openai"):
+    def __init__(self, db: Session, preferred_provider: str = "openai",
+                 db_factory: Callable[[], Session] = SessionLocal,
+                 ats_policy: str = "full", speculative_ats: bool = False):
         """
         Initialize AgentManager
         
         Args:
             db: Database session
             preferred_provider: Preferred AI provider (models selected from model_config.py)
+            db_factory: Creates the per-worker sessions used by batch_analyze
+            ats_policy: Multi-layer ATS Layer 3 policy ('full', 'skip' or 'defer')
+            speculative_ats: Run ATS Layer 2 in parallel with Layer 1
         """
         self.db = db
+        self.db_factory = db_factory
+        self.ats_policy = ats_policy
+        self.speculative_ats = speculative_ats
         
         # Initialize all agents - each uses optimal model from model_config.py
         self.analyzer = JDAnalyzer()              # DeepSeek Coder - fast parsing
@@ -37,12 +52,19 @@ class AgentManager:
         self.optimizer = ApplicationOptimizer()   # DeepSeek Coder - optimization
         self.researcher = CompanyResearcher()     # GPT-5-mini - research
         
+        self.last_stage_timings: Dict[str, float] = {}
+        self.batch_stats: Dict = {}
+        
         logger.info("✅ AgentManager initialized with multi-layer ATS scoring")
     
     def analyze_job(self, job_id: int, generate_materials: bool = True) -> Optional[JobAnalysis]:
         """
         Run complete AI analysis on job
         
+        Stages run as a dependency graph: JD analysis -> matching -> materials,
+        with ATS scoring and company research in parallel. Per-stage timings
+        are kept in self.last_stage_timings.
+        
         Args:
             job_id: ID of job to analyze
             generate_materials: Whether to generate tailored resume/cover letter
@@ -64,68 +86,80 @@ class AgentManager:
             logger.error("User profile or resume not found")
             return None
         
+        resume_text = user.resume_text
+        job_data = {
+            'title': job.title,
+            'company': job.company,
+            'description': job.description
+        }
+        user_info = user.to_dict()
+        
+        # A deferred ATS Layer 3 result is applied once both it and the saved
+        # analysis exist, by whichever of the two finishes last
+        deferred = {'saved': False, 'ats': None}
+        deferred_lock = threading.Lock()
+        
+        def on_deferred(ats: Dict):
+            with deferred_lock:
+                deferred['ats'] = ats
+                saved = deferred['saved']
+            if saved:
+                self._apply_deferred_ats(job_id, ats)
+        
+        # Stage graph: name -> (dependencies, fn(results) -> output).
+        # Only matching needs the JD analysis and only materials need the
+        # match; ATS scoring and company research start immediately.
+        stages = {
+            'jd_analysis': ((), lambda r: self.analyzer.process(job_data['description'])),
+            'match_analysis': (('jd_analysis',), lambda r: self.matcher.process(
+                resume_text,
+                job_data['description'],
+                r['jd_analysis']
+            )),
+            'ats_analysis': ((), lambda r: self.ats_scorer.process(
+                resume_text,
+                job_data['description'],
+                tier='premium',  # Always use full feedback
+                policy=self.ats_policy,
+                speculative=self.speculative_ats,
+                on_deferred=on_deferred
+            )),
+            'company_research': ((), lambda r: self.researcher.process(
+                job_data['company'],
+                job_data['title'],
+                job_data['description']
+            )),
+        }
+        
+        if generate_materials:
+            stages['materials'] = (('match_analysis',), lambda r: self.optimizer.process(
+                resume_text,
+                job_data,
+                r['match_analysis'],
+                user_info=user_info,
+                generate_type="both"
+            ))
+        else:
+            logger.info("  Skipping material generation")
+        
         try:
-            # Step 1: Analyze Job Description
-            logger.info("  1/5: Analyzing job description...")
-            jd_analysis = self.jd_analyzer.process(job.description)
-            
-            # Step 2: Match Resume to Job
-            logger.info("  2/5: Matching resume to job...")
-            match_analysis = self.matcher.process(
-                user.resume_text,
-                job.description,
-                jd_analysis
-            )
+            started_at = time.perf_counter()
+            results = self._run_stages(stages)
             
-            # Step 3: Calculate ATS Score (Multi-Layer: DeepSeek + GPT-5-mini + DeepSeek Reasoner)
-            logger.info("  3/5: Running 3-layer ATS scoring (this may take 10-15 seconds)...")
-            ats_analysis = self.ats_scorer.process(
-                user.resume_text,
-                job.description,
-                tier='premium'  # Always use full feedback
-            )
+            ats_analysis = results['ats_analysis']
             logger.info(f"     ✓ ATS Score: {ats_analysis.get('final_score', ats_analysis.get('ats_score', 0))}")
             
-            # Step 4: Generate Optimized Materials
-            tailored_resume = None
-            tailored_cover_letter = None
-            
-            if generate_materials:
-                logger.info("  4/5: Generating tailored materials...")
-                job_data = {
-                    'title': job.title,
-                    'company': job.company,
-                    'description': job.description
-                }
-                
-                optimized = self.optimizer.process(
-                    user.resume_text,
-                    job_data,
-                    match_analysis,
-                    user_info=user.to_dict(),
-                    generate_type="both"
-                )
-                
-                tailored_resume = optimized.get('tailored_resume')
-                tailored_cover_letter = optimized.get('tailored_cover_letter')
-            else:
-                logger.info("  4/5: Skipping material generation")
-            
-            # Step 5: Research Company and Generate Interview Questions
-            logger.info("  5/5: Researching company...")
-            company_research = self.researcher.process(
-                job.company,
-                job.title,
-                job.description
-            )
+            optimized = results.get('materials') or {}
+            tailored_resume = optimized.get('tailored_resume')
+            tailored_cover_letter = optimized.get('tailored_cover_letter')
             
-            interview_questions = company_research.get('likely_questions', [])
+            interview_questions = results['company_research'].get('likely_questions', [])
             
             # Combine all analyses
             combined_analysis = self._combine_analyses(
-                match_analysis,
+                results['match_analysis'],
                 ats_analysis,
-                jd_analysis,
+                results['jd_analysis'],
                 tailored_resume,
                 tailored_cover_letter,
                 interview_questions
@@ -134,6 +168,9 @@ class AgentManager:
             # Save to database
             analysis = self._save_analysis(job_id, combined_analysis)
             
+            self.last_stage_timings['total'] = round(time.perf_counter() - started_at, 2)
+            timings = ", ".join(f"{name} {seconds}s" for name, seconds in self.last_stage_timings.items())
+            logger.info(f"⏱️  Stage timings: {timings}")
             logger.info(f"✅ Analysis complete: Match {combined_analysis['match_score']:.0f}%, ATS {combined_analysis['ats_score']:.0f}%")
             
             return analysis
@@ -141,6 +178,96 @@ class AgentManager:
         except Exception as e:
             logger.error(f"❌ Error analyzing job {job_id}: {e}")
             return None
+        finally:
+            with deferred_lock:
+                deferred['saved'] = True
+                ats = deferred['ats']
+            if ats is not None:
+                self._apply_deferred_ats(job_id, ats)
+    
+    def _apply_deferred_ats(self, job_id: int, ats_analysis: Dict):
+        """
+        Update a saved analysis with the result of a deferred ATS Layer 3
+        
+        Args:
+            job_id: Job ID
+            ats_analysis: Complete 3-layer ATS result
+        """
+        db = self.db_factory()
+        try:
+            analysis = db.query(JobAnalysis).filter(JobAnalysis.job_id == job_id).first()
+            if not analysis:
+                return
+            
+            analysis.ats_score = ats_analysis.get('final_score', analysis.ats_score)
+            
+            feedback_recommendations = self._feedback_recommendations(ats_analysis.get('detailed_feedback'))
+            if feedback_recommendations:
+                recommendations = analysis.to_dict()['recommendations']
+                recommendations['resume'] = feedback_recommendations
+                analysis.recommendations = json.dumps(recommendations)
+            
+            db.commit()
+            logger.info(f"✅ Job {job_id}: deferred ATS Layer 3 applied, ATS {analysis.ats_score:.0f}%")
+        except Exception as e:
+            logger.error(f"Error applying deferred ATS result for job {job_id}: {e}")
+            db.rollback()
+        finally:
+            db.close()
+    
+    def _run_stages(self, stages: Dict[str, Tuple[Tuple[str, ...], Callable[[Dict], Dict]]]) -> Dict:
+        """
+        Run a stage dependency graph with maximum concurrency
+        
+        A stage is submitted as soon as all of its dependencies have finished.
+        Durations (seconds) are stored in self.last_stage_timings.
+        
+        Args:
+            stages: Stage name -> (dependency names, fn taking the results so far)
+            
+        Returns:
+            Dictionary of stage name -> stage output
+            
+        Raises:
+            Exception raised by the first failing stage
+        """
+        results = {}
+        self.last_stage_timings = {}
+        remaining = dict(stages)
+        workers = len(stages) if settings.analysis_concurrent else 1
+        
+        def run(name: str, fn: Callable[[Dict], Dict]):
+            stage_started = time.perf_counter()
+            try:
+                return fn(results)
+            finally:
+                self.last_stage_timings[name] = round(time.perf_counter() - stage_started, 2)
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="analysis")
+        try:
+            running = {}
+            while remaining or running:
+                # Submit every stage whose inputs are ready (in declaration order)
+                for name, (deps, fn) in list(remaining.items()):
+                    if all(dep in results for dep in deps):
+                        logger.info(f"  ▶ {name}")
+                        # Copy of the caller's context keeps refresh_cache() scope in the worker
+                        running[executor.submit(contextvars.copy_context().run, run, name, fn)] = name
+                        del remaining[name]
+                
+                if not running:
+                    raise ValueError(f"Unsatisfiable stage dependencies: {sorted(remaining)}")
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    logger.info(f"  ✓ {name} ({self.last_stage_timings.get(name, 0)}s)")
+        finally:
+            # Don't wait for stages still running after a failure
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return results
     
     def _combine_analyses(self, match_analysis: Dict, ats_analysis: Dict,
                          jd_analysis: Dict, tailored_resume: Optional[str],
@@ -164,23 +291,7 @@ class AgentManager:
         
         # Multi-layer ATS format
         if 'detailed_feedback' in ats_analysis and ats_analysis['detailed_feedback']:
-            feedback = ats_analysis['detailed_feedback']
-            
-            # Extract immediate fixes
-            if 'immediate_fixes' in feedback:
-                for fix in feedback.get('immediate_fixes', [])[:3]:
-                    if isinstance(fix, dict):
-                        ats_recommendations.append(f"🎯 {fix.get('action', '')} (Impact: {fix.get('impact', '')})") 
-            
-            # Extract strategic improvements
-            if 'strategic_improvements' in feedback:
-                for improvement in feedback.get('strategic_improvements', [])[:2]:
-                    if isinstance(improvement, dict):
-                        ats_recommendations.append(f"📈 {improvement.get('action', '')}")
-            
-            # Extract overall recommendation
-            if 'overall_recommendation' in feedback:
-                ats_recommendations.insert(0, f"💡 {feedback['overall_recommendation']}")
+            ats_recommendations = self._feedback_recommendations(ats_analysis['detailed_feedback'])
         
         # Legacy format fallback
         if 'keyword_analysis' in ats_analysis:
@@ -242,6 +353,31 @@ class AgentManager:
             'interview_questions': json.dumps(interview_questions),
         }
     
+    @staticmethod
+    def _feedback_recommendations(feedback: Optional[Dict]) -> list:
+        """Resume recommendations from multi-layer ATS (Layer 3) feedback"""
+        ats_recommendations = []
+        if not feedback:
+            return ats_recommendations
+        
+        # Extract immediate fixes
+        if 'immediate_fixes' in feedback:
+            for fix in feedback.get('immediate_fixes', [])[:3]:
+                if isinstance(fix, dict):
+                    ats_recommendations.append(f"🎯 {fix.get('action', '')} (Impact: {fix.get('impact', '')})") 
+        
+        # Extract strategic improvements
+        if 'strategic_improvements' in feedback:
+            for improvement in feedback.get('strategic_improvements', [])[:2]:
+                if isinstance(improvement, dict):
+                    ats_recommendations.append(f"📈 {improvement.get('action', '')}")
+        
+        # Extract overall recommendation
+        if 'overall_recommendation' in feedback:
+            ats_recommendations.insert(0, f"💡 {feedback['overall_recommendation']}")
+        
+        return ats_recommendations
+    
     def _save_analysis(self, job_id: int, analysis_data: Dict) -> JobAnalysis:
         """Save analysis to database"""
         try:
@@ -273,42 +409,101 @@ class AgentManager:
             self.db.rollback()
             raise
     
-    def batch_analyze(self, job_ids: list, max_concurrent: int = 5) -> Dict:
+    def batch_analyze(self, job_ids: list, max_concurrent: int = None,
+                      generate_materials: bool = False,
+                      progress_callback: Callable[[Dict], None] = None) -> Dict:
         """
-        Analyze multiple jobs (with rate limiting)
+        Analyze multiple jobs with bounded concurrency
+        
+        Each worker uses its own database session; LLM calls are paced by the
+        shared per-provider rate limiters.
         
         Args:
             job_ids: List of job IDs to analyze
-            max_concurrent: Maximum concurrent analyses
+            max_concurrent: Maximum concurrent analyses (default: settings.analysis_batch_concurrency)
+            generate_materials: Whether to generate tailored resume/cover letter
+            progress_callback: Called with the stats after each finished job
             
         Returns:
-            Dictionary with statistics
+            Dictionary with statistics, progress and ETA
         """
-        logger.info(f"📊 Batch analyzing {len(job_ids)} jobs...")
+        workers = max(1, min(max_concurrent or settings.analysis_batch_concurrency, len(job_ids) or 1))
+        logger.info(f"📊 Batch analyzing {len(job_ids)} jobs ({workers} at a time)...")
         
         stats = {
             'total': len(job_ids),
+            'completed': 0,
             'success': 0,
             'failed': 0,
-            'errors': []
+            'errors': [],
+            'progress': 0.0,
+            'elapsed_seconds': 0.0,
+            'eta_seconds': None,
         }
+        self.batch_stats = stats
+        stats_lock = threading.Lock()
+        started_at = time.perf_counter()
         
-        for job_id in job_ids:
+        def run(job_id: int) -> bool:
+            db = self.db_factory()
             try:
-                result = self.analyze_job(job_id, generate_materials=False)
-                if result:
-                    stats['success'] += 1
-                else:
-                    stats['failed'] += 1
-            except Exception as e:
-                stats['failed'] += 1
-                stats['errors'].append({'job_id': job_id, 'error': str(e)})
-                logger.error(f"Error analyzing job {job_id}: {e}")
-        
-        logger.info(f"✅ Batch analysis complete: {stats['success']} success, {stats['failed']} failed")
+                return self._for_session(db).analyze_job(job_id, generate_materials=generate_materials) is not None
+            finally:
+                db.close()
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-analysis") as executor:
+            futures = {executor.submit(contextvars.copy_context().run, run, job_id): job_id for job_id in job_ids}
+            
+            for future in as_completed(futures):
+                job_id = futures[future]
+                
+                with stats_lock:
+                    try:
+                        if future.result():
+                            stats['success'] += 1
+                        else:
+                            stats['failed'] += 1
+                    except Exception as e:
+                        stats['failed'] += 1
+                        stats['errors'].append({'job_id': job_id, 'error': str(e)})
+                        logger.error(f"Error analyzing job {job_id}: {e}")
+                    
+                    self._update_progress(stats, started_at)
+                    logger.info(f"  📈 {stats['completed']}/{stats['total']} analyzed "
+                               f"({stats['progress']:.0f}%, ETA {stats['eta_seconds']}s)")
+                
+                if progress_callback:
+                    try:
+                        progress_callback(dict(stats))
+                    except Exception as e:
+                        logger.error(f"Error in batch progress callback: {e}")
+        
+        self._update_progress(stats, started_at)
+        logger.info(f"✅ Batch analysis complete: {stats['success']} success, {stats['failed']} failed "
+                   f"in {stats['elapsed_seconds']}s")
         
         return stats
     
+    @staticmethod
+    def _update_progress(stats: Dict, started_at: float):
+        """Refresh completed count, progress percentage, elapsed time and ETA"""
+        stats['completed'] = stats['success'] + stats['failed']
+        elapsed = time.perf_counter() - started_at
+        stats['elapsed_seconds'] = round(elapsed, 1)
+        stats['progress'] = round(100.0 * stats['completed'] / stats['total'], 1) if stats['total'] else 100.0
+        
+        if stats['completed']:
+            remaining = stats['total'] - stats['completed']
+            # Jobs run in parallel, so the observed throughput already reflects concurrency
+            stats['eta_seconds'] = round(elapsed / stats['completed'] * remaining, 1)
+    
+    def _for_session(self, db: Session) -> 'AgentManager':
+        """Shallow copy sharing the agents but using another database session"""
+        manager = copy.copy(self)
+        manager.db = db
+        manager.last_stage_timings = {}
+        return manager
+    
     def get_analysis(self, job_id: int) -> Optional[Dict]:
         """
         Get analysis for job (run if doesn't exist)
@@ -326,3 +521,81 @@ class AgentManager:
             analysis = self.analyze_job(job_id)
         
         return analysis.to_dict() if analysis else None
+    
+    def stream_material(self, job_id: int, material: str) -> Optional[Iterator[str]]:
+        """
+        Stream a tailored resume or cover letter for a job
+        
+        An already generated material is returned as a single chunk. Otherwise
+        it is generated with the provider's streaming API and saved to the
+        job's analysis once the stream completes. A job that was never analyzed
+        is analyzed first (without materials), as the non-streaming endpoints
+        do, so the resume is tailored against a real match analysis.
+        
+        Args:
+            job_id: Job ID
+            material: 'tailored_resume' or 'tailored_cover_letter'
+            
+        Returns:
+            Iterator of text chunks (empty if the analysis failed),
+            or None if the job or resume is missing
+        """
+        job = self.db.query(Job).get(job_id)
+        user = self.db.query(UserProfile).filter(UserProfile.id == 1).first()
+        if not job or not user or not user.resume_text:
+            return None
+        
+        analysis = self.db.query(JobAnalysis).filter(JobAnalysis.job_id == job_id).first()
+        existing = getattr(analysis, material, None) if analysis else None
+        if existing:
+            return iter([existing])
+        
+        if material not in ('tailored_resume', 'tailored_cover_letter'):
+            raise ValueError(f"Unknown material: {material}")
+        
+        if not analysis:
+            logger.info(f"  Job {job_id} not analyzed yet - running analysis before streaming {material}")
+            analysis = self.analyze_job(job_id, generate_materials=False)
+            if not analysis:
+                logger.error(f"❌ Cannot stream {material} for job {job_id}: analysis failed")
+                return iter([])
+        
+        if material == 'tailored_resume':
+            chunks = self.optimizer.stream_tailored_resume(
+                user.resume_text, job.description, analysis.to_dict()
+            )
+        else:
+            chunks = self.optimizer.stream_cover_letter(
+                user.resume_text, job.title, job.company, job.description, user.to_dict()
+            )
+        
+        return self._save_streamed_material(job_id, material, chunks)
+    
+    def _save_streamed_material(self, job_id: int, material: str,
+                                chunks: Iterator[str]) -> Iterator[str]:
+        """Pass chunks through and store the full text on the job's analysis"""
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        
+        if not parts:
+            return
+        
+        # The request's session may already be closed while a response streams
+        db = self.db_factory()
+        try:
+            analysis = db.query(JobAnalysis).filter(JobAnalysis.job_id == job_id).first()
+            if not analysis:
+                # Deleted or never saved while streaming - keep the text anyway
+                logger.warning(f"⚠️ No analysis for job {job_id}, creating one for the streamed {material}")
+                analysis = JobAnalysis(job_id=job_id)
+                db.add(analysis)
+            setattr(analysis, material, "".join(parts))
+            db.commit()
+            logger.info(f"💾 Saved streamed {material} for job {job_id}")
+        except Exception as e:
+            logger.error(f"Error saving streamed {material} for job {job_id}: {e}")
+            db.rollback()
+        finally:
+            db.close()
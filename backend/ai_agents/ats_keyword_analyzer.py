@@ -5,6 +5,7 @@ Uses DeepSeek Reasoner for deep JD analysis and strategic keyword extraction
 import json
 from typing import Dict, List
 from ai_agents.base_agent import BaseAgent
+from ai_agents.jd_cache import get_parsed_jd, store_parsed_jd
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -16,6 +17,9 @@ class ATSKeywordAnalyzer(BaseAgent):
     Extracts categorized keywords, identifies gaps, provides strategic recommendations
     """
     
+    # Bump when the prompt or output schema changes so memoized parses are redone
+    PARSE_VERSION = 1
+    
     def __init__(self):
         # Use DeepSeek Reasoner for deep analysis
         super().__init__(preferred_provider="deepseek", model="deepseek-reasoner")
@@ -61,6 +65,10 @@ class ATSKeywordAnalyzer(BaseAgent):
         Returns:
             Dict with categorized keywords, ATS importance scores, and context
         """
+        memoized = get_parsed_jd(job_description, "ats_keywords", self.PARSE_VERSION)
+        if memoized:
+            return memoized
+        
         prompt = f"""You are an expert ATS (Applicant Tracking System) keyword analyzer. Your job is to extract EVERY keyword that an ATS would scan for from this job description.
 
 Job Description:
@@ -125,7 +133,7 @@ INSTRUCTIONS:
 Focus on keywords that an ATS would use to FILTER and RANK candidates. Think like a recruiter setting up search filters.
 """
         
-        response = self.generate(prompt, temperature=0.3)
+        response = self.generate(prompt, temperature=0.3, validate=self.is_json_response)
         
         if not response:
             logger.error("❌ Failed to get response from DeepSeek Reasoner")
@@ -141,6 +149,8 @@ Focus on keywords that an ATS would use to FILTER and RANK candidates. Think lik
                    f"{len(parsed.get('seniority_leadership', []))} leadership, "
                    f"{len(parsed.get('tools_technologies', []))} tools")
         
+        store_parsed_jd(job_description, "ats_keywords", self.PARSE_VERSION, parsed)
+        
         return parsed
     
     def analyze_cv_gaps(self, resume_text: str, jd_keywords: Dict) -> Dict:
@@ -246,7 +256,7 @@ Analyze and return ONLY valid JSON:
 Be specific with line-by-line recommendations. Show exact text to replace and why.
 """
         
-        response = self.generate(prompt, temperature=0.4)
+        response = self.generate(prompt, temperature=0.4, validate=self.is_json_response)
         
         if not response:
             logger.error("❌ Failed to get gap analysis")
@@ -64,7 +64,7 @@ Scoring criteria:
 Identify specific issues and provide actionable recommendations.
 """
         
-        response = self.generate(prompt, temperature=0.3)
+        response = self.generate(prompt, temperature=0.3, validate=self.is_json_response)
         
         if not response:
             return self._get_default_ats_score()
@@ -3,46 +3,21 @@ Base AI Agent class
 Provides common functionality for all AI agents with multi-provider support
 """
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Iterator, List, Tuple
+import asyncio
 import json
+import queue
+import threading
+import time
 from config import settings
+from ai_agents.llm_clients import get_async_client, get_client, gemini_model_name
+from ai_agents.provider_health import get_health, route_providers
+from ai_agents.rate_limits import estimate_tokens, get_limiter, rate_limit_info
+from ai_agents.response_cache import get_response_cache, make_cache_key
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
-# Import AI providers
-try:
-    from google import genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    try:
-        import google.generativeai as genai_legacy
-        GEMINI_AVAILABLE = True
-        GEMINI_LEGACY = True
-    except ImportError:
-        GEMINI_AVAILABLE = False
-        GEMINI_LEGACY = False
-else:
-    GEMINI_LEGACY = False
-
-try:
-    from anthropic import Anthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
-
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-
-try:
-    from openai import OpenAI as PerplexityClient
-    PERPLEXITY_AVAILABLE = True
-except ImportError:
-    PERPLEXITY_AVAILABLE = False
-
 
 class BaseAgent(ABC):
     """Abstract base class for AI agents"""
@@ -63,157 +38,580 @@ class BaseAgent(ABC):
             logger.error("❌ No AI providers available! Please configure API keys.")
     
     def _initialize_providers(self) -> Dict[str, Any]:
-        """Initialize available AI providers"""
+        """Look up available AI providers (clients are shared process-wide)"""
         providers = {}
         
-        # DeepSeek (PRIMARY for most tasks - cost-effective and powerful)
-        if OPENAI_AVAILABLE and settings.deepseek_api_key:
+        # DeepSeek (PRIMARY for most tasks - cost-effective and powerful),
+        # then Perplexity, Gemini (FALLBACK), Claude and OpenAI
+        for provider_name in ('deepseek', 'perplexity', 'gemini', 'claude', 'openai'):
             try:
-                providers['deepseek'] = OpenAI(
-                    api_key=settings.deepseek_api_key,
-                    base_url="https://api.deepseek.com"
-                )
-                logger.info("✅ DeepSeek initialized (Primary provider)")
+                client = get_client(provider_name)
             except Exception as e:
-                logger.error(f"Failed to initialize DeepSeek: {e}")
+                logger.error(f"Failed to initialize {provider_name}: {e}")
+                continue
+            if client is None:
+                continue
+            providers[provider_name] = client
+            if provider_name == 'gemini':
+                providers['gemini_model'] = gemini_model_name()
         
-        # Perplexity
-        if PERPLEXITY_AVAILABLE and settings.perplexity_api_key:
-            try:
-                providers['perplexity'] = PerplexityClient(
-                    api_key=settings.perplexity_api_key,
-                    base_url="https://api.perplexity.ai"
-                )
-                logger.info("✅ Perplexity AI initialized")
-            except TypeError as e:
-                # Handle proxies parameter issue in older OpenAI client versions
-                try:
-                    import httpx
-                    http_client = httpx.Client()
-                    providers['perplexity'] = PerplexityClient(
-                        api_key=settings.perplexity_api_key,
-                        base_url="https://api.perplexity.ai",
-                        http_client=http_client
-                    )
-                    logger.info("✅ Perplexity AI initialized (with custom client)")
-                except Exception as e2:
-                    logger.error(f"Failed to initialize Perplexity: {e2}")
-            except Exception as e:
-                logger.error(f"Failed to initialize Perplexity: {e}")
+        return providers
+    
+    def generate(self, prompt: str, temperature: float = 0.7, max_tokens: int = 2000,
+                 use_cache: bool = True,
+                 validate: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        Generate response using available AI provider
         
-        # Gemini (FALLBACK)
-        if GEMINI_AVAILABLE and settings.gemini_api_key:
-            try:
-                if not GEMINI_LEGACY:
-                    # New google.genai SDK (v2.0+)
-                    client = genai.Client(api_key=settings.gemini_api_key)
-                    providers['gemini'] = client
-                    providers['gemini_model'] = 'gemini-2.0-flash-exp'  # Fast and reliable
-                    logger.info("✅ Gemini 2.0 Flash initialized (new SDK)")
-                else:
-                    # Legacy google-generativeai SDK
-                    genai_legacy.configure(api_key=settings.gemini_api_key)
-                    providers['gemini'] = genai_legacy.GenerativeModel('gemini-1.5-flash')
-                    providers['gemini_model'] = 'legacy'
-                    logger.info("✅ Gemini 1.5 Flash initialized (legacy SDK)")
-            except Exception as e:
-                logger.error(f"Failed to initialize Gemini: {e}")
+        Identical requests are served from the response cache when enabled.
+        Providers with an open circuit are skipped and slow requests may be
+        hedged to the next provider (see ai_agents/provider_health.py).
         
-        # Claude
-        if ANTHROPIC_AVAILABLE and settings.anthropic_api_key:
-            try:
-                providers['claude'] = Anthropic(api_key=settings.anthropic_api_key)
-                logger.info("✅ Claude initialized")
-            except Exception as e:
-                logger.error(f"Failed to initialize Claude: {e}")
+        Args:
+            prompt: Input prompt
+            temperature: Sampling temperature (0-1)
+            max_tokens: Maximum tokens in response
+            use_cache: Read/write the LLM response cache
+            validate: Only cache responses it accepts (e.g. is_json_response)
+            
+        Returns:
+            Generated text or None if all providers fail
+        """
+        cache = get_response_cache() if use_cache else None
         
-        # OpenAI (GPT-5-mini for knowledge-heavy tasks)
-        if OPENAI_AVAILABLE and settings.openai_api_key:
-            try:
-                providers['openai'] = OpenAI(api_key=settings.openai_api_key)
-                logger.info("✅ OpenAI GPT-5-mini initialized")
-            except Exception as e:
-                logger.error(f"Failed to initialize OpenAI: {e}")
+        if cache:
+            cached = self._cache_lookup(cache, prompt, temperature, max_tokens)
+            if cached:
+                return cached
         
-        return providers
+        result, provider_name = self._call_providers(prompt, temperature, max_tokens)
+        return self._finish(cache, result, provider_name, prompt, temperature, max_tokens, validate)
     
-    def generate(self, prompt: str, temperature: float = 0.7, max_tokens: int = 2000) -> Optional[str]:
+    async def agenerate(self, prompt: str, temperature: float = 0.7, max_tokens: int = 2000,
+                        use_cache: bool = True,
+                        validate: Optional[Callable[[str], bool]] = None) -> Optional[str]:
         """
-        Generate response using available AI provider
+        Async version of generate() using the providers' async SDK clients
         
         Args:
             prompt: Input prompt
             temperature: Sampling temperature (0-1)
             max_tokens: Maximum tokens in response
+            use_cache: Read/write the LLM response cache
+            validate: Only cache responses it accepts (e.g. is_json_response)
             
         Returns:
             Generated text or None if all providers fail
         """
-        # Try preferred provider first
-        if self.preferred_provider in self.providers:
-            result = self._try_provider(self.preferred_provider, prompt, temperature, max_tokens)
-            if result:
-                return result
+        cache = get_response_cache() if use_cache else None
         
-        # Fallback to other providers
-        for provider_name in self.providers:
-            if provider_name != self.preferred_provider:
-                result = self._try_provider(provider_name, prompt, temperature, max_tokens)
-                if result:
-                    logger.info(f"Fallback to {provider_name} successful")
-                    return result
+        if cache:
+            cached = self._cache_lookup(cache, prompt, temperature, max_tokens)
+            if cached:
+                return cached
+        
+        result, provider_name = await self._acall_providers(prompt, temperature, max_tokens)
+        return self._finish(cache, result, provider_name, prompt, temperature, max_tokens, validate)
+    
+    def generate_stream(self, prompt: str, temperature: float = 0.7, max_tokens: int = 2000,
+                        use_cache: bool = True,
+                        validate: Optional[Callable[[str], bool]] = None) -> Iterator[str]:
+        """
+        Generate a response as a stream of text chunks
+        
+        Providers are tried in routed order like generate(), but only until
+        one of them produced its first chunk: a stream that breaks later
+        ends early instead of restarting on another provider. A cached
+        response is yielded as a single chunk and a completed stream is
+        stored in the cache.
+        
+        Args:
+            prompt: Input prompt
+            temperature: Sampling temperature (0-1)
+            max_tokens: Maximum tokens in response
+            use_cache: Read/write the LLM response cache
+            validate: Only cache responses it accepts (e.g. is_json_response)
+            
+        Yields:
+            Text chunks in order (nothing if all providers fail)
+        """
+        cache = get_response_cache() if use_cache else None
+        
+        if cache:
+            cached = self._cache_lookup(cache, prompt, temperature, max_tokens)
+            if cached:
+                yield cached
+                return
+        
+        for name in route_providers(self._provider_order(), self.preferred_provider, self._provider_models()):
+            parts: List[str] = []
+            completed = yield from self._stream_provider(name, prompt, temperature, max_tokens, parts)
+            
+            if completed and parts:
+                self._finish(cache, "".join(parts), name, prompt, temperature, max_tokens, validate)
+                return
+            if parts:
+                logger.error(f"❌ {name} stream interrupted after {len(parts)} chunks")
+                return
         
         logger.error("❌ All AI providers failed")
-        return None
+    
+    def _call_providers(self, prompt: str, temperature: float,
+                        max_tokens: int) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Try providers in routed order until one answers
+        
+        When the current provider+model has enough latency history for this
+        max_tokens budget and the request takes longer than its p95 (counted
+        from when the request was actually sent), the same request is also
+        sent to the next provider and whichever answers first wins.
+        
+        Returns:
+            (response, provider name) or (None, None)
+        """
+        order = route_providers(self._provider_order(), self.preferred_provider, self._provider_models())
+        i = 0
+        
+        while i < len(order):
+            name = order[i]
+            hedge_after = self._hedge_delay(order, i, max_tokens)
+            
+            if hedge_after is None:
+                result = self._try_provider(name, prompt, temperature, max_tokens)
+                if result:
+                    return result, name
+                i += 1
+                continue
+            
+            result, winner, tried = self._hedged_call(order[i], order[i + 1], hedge_after,
+                                                      prompt, temperature, max_tokens)
+            if result:
+                return result, winner
+            i += tried
+        
+        return None, None
+    
+    def _hedged_call(self, name: str, backup: str, hedge_after: float, prompt: str,
+                     temperature: float, max_tokens: int) -> Tuple[Optional[str], Optional[str], int]:
+        """
+        Call a provider and hedge with a backup provider when it is slow
+        
+        Each request runs on its own thread, so the caller can return the
+        first answer while the slower request finishes in the background.
+        
+        Returns:
+            (response, provider name, providers tried)
+        """
+        results = queue.Queue()
+        started = threading.Event()
+        
+        def run(provider_name: str, started_event: Optional[threading.Event] = None):
+            try:
+                result = self._try_provider(provider_name, prompt, temperature, max_tokens, started_event)
+            finally:
+                if started_event:
+                    started_event.set()  # Also unblocks the wait when the call was skipped
+            results.put((provider_name, result))
+        
+        threading.Thread(target=run, args=(name, started), daemon=True, name=f"llm-{name}").start()
+        
+        # Time spent waiting for the rate limiter doesn't count towards the hedge delay
+        started.wait()
+        try:
+            provider_name, result = results.get(timeout=hedge_after)
+            return result, provider_name, 1
+        except queue.Empty:
+            pass
+        
+        logger.info(f"🔀 {name} slower than its p95 ({hedge_after:.1f}s), hedging with {backup}")
+        threading.Thread(target=run, args=(backup,), daemon=True, name=f"llm-{backup}").start()
+        
+        for _ in range(2):
+            provider_name, result = results.get()
+            if result:
+                # A slower hedged request keeps running; its result is dropped
+                return result, provider_name, 2
+        return None, None, 2
+    
+    async def _acall_providers(self, prompt: str, temperature: float,
+                               max_tokens: int) -> Tuple[Optional[str], Optional[str]]:
+        """Async version of _call_providers (the losing hedge is cancelled)"""
+        order = route_providers(self._provider_order(), self.preferred_provider, self._provider_models())
+        i = 0
+        
+        while i < len(order):
+            name = order[i]
+            hedge_after = self._hedge_delay(order, i, max_tokens)
+            started = asyncio.Event()
+            tasks = {asyncio.ensure_future(self._atry_provider(name, prompt, temperature, max_tokens, started)): name}
+            
+            if hedge_after is not None:
+                # Time spent waiting for the rate limiter doesn't count towards the hedge delay
+                started_wait = asyncio.ensure_future(started.wait())
+                await asyncio.wait([started_wait, *tasks], return_when=asyncio.FIRST_COMPLETED)
+                started_wait.cancel()
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                if not done:
+                    i += 1
+                    backup = order[i]
+                    logger.info(f"🔀 {name} slower than its p95 ({hedge_after:.1f}s), hedging with {backup}")
+                    tasks[asyncio.ensure_future(self._atry_provider(backup, prompt, temperature, max_tokens))] = backup
+            
+            pending = set(tasks)
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        result = task.result()
+                        if result:
+                            return result, tasks[task]
+            finally:
+                for task in pending:
+                    task.cancel()
+            i += 1
+        
+        return None, None
+    
+    def _hedge_delay(self, order: List[str], index: int, max_tokens: int) -> Optional[float]:
+        """Hedge delay for order[index], or None if there is no one to hedge with"""
+        if not settings.llm_hedging_enabled or index + 1 >= len(order):
+            return None
+        return self._health(order[index]).hedge_delay(max_tokens)
+    
+    def _cache_lookup(self, cache, prompt: str, temperature: float, max_tokens: int) -> Optional[str]:
+        """Cached response for any of this agent's providers"""
+        cached = cache.get(*[
+            self._cache_key(name, prompt, temperature, max_tokens) for name in self._provider_order()
+        ])
+        if cached:
+            logger.debug("LLM cache hit")
+        return cached
+    
+    def _finish(self, cache, result: Optional[str], provider_name: Optional[str],
+                prompt: str, temperature: float, max_tokens: int,
+                validate: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """Log the outcome and store a successful (and valid) response in the cache"""
+        if not result:
+            logger.error("❌ All AI providers failed")
+            return None
+        
+        if provider_name != self.preferred_provider:
+            logger.info(f"Fallback to {provider_name} successful")
+        if cache and validate and not validate(result):
+            # Don't pin a malformed response for the cache TTL - the next call retries
+            logger.warning(f"⚠️ Not caching invalid {provider_name} response")
+        elif cache:
+            cache.set(
+                self._cache_key(provider_name, prompt, temperature, max_tokens),
+                result,
+                provider=provider_name,
+                model=self._provider_model(provider_name),
+            )
+        return result
+    
+    def _provider_order(self) -> List[str]:
+        """Preferred provider first, then the remaining ones"""
+        names = [name for name in self.providers if name != 'gemini_model']
+        if self.preferred_provider in names:
+            names.remove(self.preferred_provider)
+            names.insert(0, self.preferred_provider)
+        return names
+    
+    def _provider_models(self) -> Dict[str, str]:
+        """Model sent to each of this agent's providers"""
+        return {name: self._provider_model(name) for name in self._provider_order()}
+    
+    def _health(self, provider_name: str):
+        """Health tracker of the provider+model this agent uses"""
+        return get_health(provider_name, self._provider_model(provider_name))
+    
+    def _provider_model(self, provider_name: str) -> str:
+        """Model actually sent to the given provider"""
+        if provider_name == 'perplexity':
+            return "sonar"
+        if provider_name == 'gemini':
+            return self.providers.get('gemini_model', 'gemini-2.0-flash-exp')
+        if provider_name == 'claude':
+            return "claude-3-sonnet-20240229"
+        return self.model
+    
+    def _cache_key(self, provider_name: str, prompt: str, temperature: float, max_tokens: int) -> str:
+        return make_cache_key(provider_name, self._provider_model(provider_name),
+                              temperature, max_tokens, prompt)
+    
+    # System prompts for providers using the OpenAI chat completions API
+    SYSTEM_PROMPTS = {
+        'deepseek': "You are a helpful AI assistant specialized in job analysis, ATS optimization, and resume matching. Always respond with valid JSON when requested.",
+        'perplexity': "You are a helpful AI assistant specialized in job analysis and ATS optimization. Always respond with valid JSON when requested.",
+        'openai': "You are an expert ATS (Applicant Tracking System) analyzer and resume optimization specialist. Always respond with valid JSON when requested.",
+    }
     
     def _try_provider(self, provider_name: str, prompt: str, 
-                     temperature: float, max_tokens: int) -> Optional[str]:
-        """Try to generate response with specific provider"""
+                     temperature: float, max_tokens: int,
+                     started: Optional[threading.Event] = None) -> Optional[str]:
+        """
+        Try to generate response with specific provider (paced by its rate limiter)
+        
+        `started` is set once the request is actually sent.
+        """
+        limiter = get_limiter(provider_name, self._provider_model(provider_name))
+        estimated_tokens = estimate_tokens(prompt) + max_tokens
+        
+        health = self._health(provider_name)
+        if not health.allow_request():
+            logger.debug(f"{provider_name} circuit open, skipping")
+            return None
+        
+        if not limiter.acquire(estimated_tokens, timeout=settings.llm_limiter_max_wait):
+            logger.warning(f"⏳ {provider_name} rate limit wait exceeded, skipping")
+            health.release_probe()
+            return None
+        if started:
+            started.set()
+        
+        result = None
+        rate_limited, retry_after = False, None
+        started_at = time.perf_counter()
         try:
             if provider_name == 'deepseek':
-                return self._generate_deepseek(prompt, temperature, max_tokens)
+                result = self._generate_deepseek(prompt, temperature, max_tokens)
             elif provider_name == 'perplexity':
-                return self._generate_perplexity(prompt, temperature, max_tokens)
+                result = self._generate_perplexity(prompt, temperature, max_tokens)
             elif provider_name == 'gemini':
-                return self._generate_gemini(prompt, temperature, max_tokens)
+                result = self._generate_gemini(prompt, temperature, max_tokens)
             elif provider_name == 'claude':
-                return self._generate_claude(prompt, temperature, max_tokens)
+                result = self._generate_claude(prompt, temperature, max_tokens)
             elif provider_name == 'openai':
-                return self._generate_openai(prompt, temperature, max_tokens)
+                result = self._generate_openai(prompt, temperature, max_tokens)
+            return result
         except Exception as e:
+            rate_limited, retry_after = rate_limit_info(e)
             logger.error(f"Error with {provider_name}: {e}")
             return None
+        finally:
+            limiter.release(
+                estimated_tokens,
+                used_tokens=estimate_tokens(prompt) + estimate_tokens(result) if result else None,
+                rate_limited=rate_limited,
+                retry_after=retry_after
+            )
+            self._record_health(health, result, rate_limited, time.perf_counter() - started_at, max_tokens)
     
-    def _generate_deepseek(self, prompt: str, temperature: float, max_tokens: int) -> str:
-        """Generate response using DeepSeek"""
-        client = self.providers['deepseek']
+    async def _atry_provider(self, provider_name: str, prompt: str,
+                             temperature: float, max_tokens: int,
+                             started: Optional[asyncio.Event] = None) -> Optional[str]:
+        """
+        Try to generate response with specific provider (async clients)
         
-        response = client.chat.completions.create(
-            model=self.model,  # deepseek-chat or deepseek-coder
-            messages=[
-                {"role": "system", "content": "You are a helpful AI assistant specialized in job analysis, ATS optimization, and resume matching. Always respond with valid JSON when requested."},
+        `started` is set once the request is actually sent.
+        """
+        client = get_async_client(provider_name)
+        if client is None:
+            return None
+        
+        limiter = get_limiter(provider_name, self._provider_model(provider_name))
+        estimated_tokens = estimate_tokens(prompt) + max_tokens
+        
+        health = self._health(provider_name)
+        if not health.allow_request():
+            logger.debug(f"{provider_name} circuit open, skipping")
+            return None
+        
+        if not await limiter.aacquire(estimated_tokens, timeout=settings.llm_limiter_max_wait):
+            logger.warning(f"⏳ {provider_name} rate limit wait exceeded, skipping")
+            health.release_probe()
+            return None
+        if started:
+            started.set()
+        
+        result = None
+        rate_limited, retry_after = False, None
+        started_at = time.perf_counter()
+        try:
+            if provider_name in self.SYSTEM_PROMPTS:
+                response = await client.chat.completions.create(
+                    **self._chat_request(provider_name, prompt, temperature, max_tokens)
+                )
+                result = response.choices[0].message.content
+            elif provider_name == 'gemini':
+                model_name = self.providers.get('gemini_model', 'gemini-2.0-flash-exp')
+                if model_name == 'legacy':
+                    response = await client.generate_content_async(
+                        prompt, generation_config=self._gemini_config(temperature, max_tokens)
+                    )
+                else:
+                    response = await client.aio.models.generate_content(
+                        model=model_name,
+                        contents=prompt,
+                        config=self._gemini_config(temperature, max_tokens)
+                    )
+                result = response.text
+            elif provider_name == 'claude':
+                message = await client.messages.create(
+                    **self._claude_request(prompt, temperature, max_tokens)
+                )
+                result = message.content[0].text
+            return result
+        except Exception as e:
+            rate_limited, retry_after = rate_limit_info(e)
+            logger.error(f"Error with {provider_name}: {e}")
+            return None
+        finally:
+            limiter.release(
+                estimated_tokens,
+                used_tokens=estimate_tokens(prompt) + estimate_tokens(result) if result else None,
+                rate_limited=rate_limited,
+                retry_after=retry_after
+            )
+            self._record_health(health, result, rate_limited, time.perf_counter() - started_at, max_tokens)
+    
+    def _stream_provider(self, provider_name: str, prompt: str, temperature: float,
+                         max_tokens: int, parts: List[str]):
+        """
+        Stream a response from a specific provider (paced by its rate limiter)
+        
+        Chunks are yielded and appended to `parts`.
+        
+        Returns:
+            True if the stream completed, False if it failed or was skipped
+        """
+        limiter = get_limiter(provider_name, self._provider_model(provider_name))
+        estimated_tokens = estimate_tokens(prompt) + max_tokens
+        
+        health = self._health(provider_name)
+        if not health.allow_request():
+            logger.debug(f"{provider_name} circuit open, skipping")
+            return False
+        
+        if not limiter.acquire(estimated_tokens, timeout=settings.llm_limiter_max_wait):
+            logger.warning(f"⏳ {provider_name} rate limit wait exceeded, skipping")
+            health.release_probe()
+            return False
+        
+        rate_limited, retry_after = False, None
+        failed = False
+        started_at = time.perf_counter()
+        stream = self._open_stream(provider_name, prompt, temperature, max_tokens)
+        try:
+            for chunk in stream:
+                if chunk:
+                    parts.append(chunk)
+                    yield chunk
+            return True
+        except Exception as e:
+            failed = True
+            rate_limited, retry_after = rate_limit_info(e)
+            logger.error(f"Error streaming from {provider_name}: {e}")
+            return False
+        finally:
+            # Also runs when the consumer stops early (e.g. client disconnected)
+            stream.close()
+            result = "".join(parts)
+            limiter.release(
+                estimated_tokens,
+                used_tokens=estimate_tokens(prompt) + estimate_tokens(result) if result else None,
+                rate_limited=rate_limited,
+                retry_after=retry_after
+            )
+            self._record_health(health, None if failed else result, rate_limited,
+                                time.perf_counter() - started_at, max_tokens)
+    
+    def _open_stream(self, provider_name: str, prompt: str,
+                     temperature: float, max_tokens: int) -> Iterator[str]:
+        """Text chunks from a provider's streaming API"""
+        client = self.providers[provider_name]
+        
+        if provider_name in self.SYSTEM_PROMPTS:
+            response = client.chat.completions.create(
+                **self._chat_request(provider_name, prompt, temperature, max_tokens),
+                stream=True
+            )
+            try:
+                for chunk in response:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                close = getattr(response, "close", None)
+                if close:
+                    close()
+        
+        elif provider_name == 'gemini':
+            model_name = self.providers.get('gemini_model', 'gemini-2.0-flash-exp')
+            if model_name == 'legacy':
+                response = client.generate_content(
+                    prompt,
+                    generation_config=self._gemini_config(temperature, max_tokens),
+                    stream=True
+                )
+            else:
+                response = client.models.generate_content_stream(
+                    model=model_name,
+                    contents=prompt,
+                    config=self._gemini_config(temperature, max_tokens)
+                )
+            for chunk in response:
+                yield chunk.text
+        
+        elif provider_name == 'claude':
+            with client.messages.stream(**self._claude_request(prompt, temperature, max_tokens)) as stream:
+                yield from stream.text_stream
+    
+    @staticmethod
+    def _record_health(health, result: Optional[str], rate_limited: bool, latency: float,
+                       max_tokens: Optional[int] = None):
+        """Feed a call outcome to the provider's health tracker"""
+        if result:
+            health.record_success(latency, max_tokens)
+        elif rate_limited:
+            # Quota pressure is handled by the rate limiter, not the circuit breaker
+            health.release_probe()
+        else:
+            health.record_failure()
+    
+    def _chat_request(self, provider_name: str, prompt: str, temperature: float, max_tokens: int) -> Dict:
+        """Chat completions request for OpenAI-compatible providers"""
+        return {
+            "model": self._provider_model(provider_name),
+            "messages": [
+                {"role": "system", "content": self.SYSTEM_PROMPTS[provider_name]},
                 {"role": "user", "content": prompt}
             ],
-            temperature=temperature,
-            max_tokens=max_tokens
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+    
+    def _claude_request(self, prompt: str, temperature: float, max_tokens: int) -> Dict:
+        """Messages API request for Claude"""
+        return {
+            "model": self._provider_model('claude'),
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+        }
+    
+    @staticmethod
+    def _gemini_config(temperature: float, max_tokens: int) -> Dict:
+        return {
+            'temperature': temperature,
+            'max_output_tokens': max_tokens,
+        }
+    
+    def _generate_deepseek(self, prompt: str, temperature: float, max_tokens: int) -> str:
+        """Generate response using DeepSeek (deepseek-chat or deepseek-coder)"""
+        client = self.providers['deepseek']
+        response = client.chat.completions.create(
+            **self._chat_request('deepseek', prompt, temperature, max_tokens)
         )
-        
         return response.choices[0].message.content
     
     def _generate_perplexity(self, prompt: str, temperature: float, max_tokens: int) -> str:
         """Generate response using Perplexity AI"""
         client = self.providers['perplexity']
-        
         response = client.chat.completions.create(
-            model="sonar",
-            messages=[
-                {"role": "system", "content": "You are a helpful AI assistant specialized in job analysis and ATS optimization. Always respond with valid JSON when requested."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=temperature,
-            max_tokens=max_tokens
+            **self._chat_request('perplexity', prompt, temperature, max_tokens)
         )
-        
         return response.choices[0].message.content
     
     def _generate_gemini(self, prompt: str, temperature: float, max_tokens: int) -> str:
@@ -223,13 +621,9 @@ class BaseAgent(ABC):
         
         if model_name == 'legacy':
             # Legacy SDK (google-generativeai)
-            generation_config = {
-                'temperature': temperature,
-                'max_output_tokens': max_tokens,
-            }
             response = client.generate_content(
                 prompt,
-                generation_config=generation_config
+                generation_config=self._gemini_config(temperature, max_tokens)
             )
             return response.text
         else:
@@ -237,42 +631,22 @@ class BaseAgent(ABC):
             response = client.models.generate_content(
                 model=model_name,
                 contents=prompt,
-                config={
-                    'temperature': temperature,
-                    'max_output_tokens': max_tokens,
-                }
+                config=self._gemini_config(temperature, max_tokens)
             )
             return response.text
     
     def _generate_claude(self, prompt: str, temperature: float, max_tokens: int) -> str:
         """Generate response using Claude"""
         client = self.providers['claude']
-        
-        message = client.messages.create(
-            model="claude-3-sonnet-20240229",
-            max_tokens=max_tokens,
-            temperature=temperature,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
+        message = client.messages.create(**self._claude_request(prompt, temperature, max_tokens))
         return message.content[0].text
     
     def _generate_openai(self, prompt: str, temperature: float, max_tokens: int) -> str:
-        """Generate response using OpenAI"""
+        """Generate response using OpenAI (gpt-5-mini or other models)"""
         client = self.providers['openai']
-        
         response = client.chat.completions.create(
-            model=self.model,  # gpt-5-mini or other models
-            messages=[
-                {"role": "system", "content": "You are an expert ATS (Applicant Tracking System) analyzer and resume optimization specialist. Always respond with valid JSON when requested."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=temperature,
-            max_tokens=max_tokens
+            **self._chat_request('openai', prompt, temperature, max_tokens)
         )
-        
         return response.choices[0].message.content
     
     def parse_json_response(self, response: str) -> Optional[Dict]:
@@ -286,21 +660,30 @@ class BaseAgent(ABC):
             Parsed JSON dict or empty dict if parsing fails
         """
         try:
-            # Try to find JSON in response (sometimes wrapped in markdown)
-            if '```json' in response:
-                json_str = response.split('```json')[1].split('```')[0].strip()
-            elif '```' in response:
-                json_str = response.split('```')[1].strip()
-            else:
-                json_str = response.strip()
-            
-            return json.loads(json_str)
+            return json.loads(self._json_text(response))
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing JSON response: {e}")
             logger.warning(f"Malformed JSON - continuing with default values")
             # Return empty dict to allow processing to continue
             return {}
     
+    def is_json_response(self, response: str) -> bool:
+        """Whether parse_json_response() can parse the response (cache validator)"""
+        try:
+            json.loads(self._json_text(response))
+            return True
+        except (json.JSONDecodeError, IndexError):
+            return False
+    
+    @staticmethod
+    def _json_text(response: str) -> str:
+        """JSON part of an AI response (sometimes wrapped in markdown)"""
+        if '```json' in response:
+            return response.split('```json')[1].split('```')[0].strip()
+        elif '```' in response:
+            return response.split('```')[1].strip()
+        return response.strip()
+    
     @abstractmethod
     def process(self, *args, **kwargs) -> Dict:
         """
@@ -0,0 +1,91 @@
+"""
+Company knowledge cache
+Company-level research (overview, culture, news) is generated once per
+company and reused by every job of that company until it goes stale
+"""
+import json
+from datetime import datetime
+from typing import Dict, Optional
+
+from config import settings
+from database import SessionLocal
+from models.company import CompanyResearch, normalize_company_name
+from ai_agents.response_cache import is_refreshing
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def get_company_knowledge(company_name: str, kind: str, refresh: bool = False) -> Optional[Dict]:
+    """
+    Get fresh cached research for a company
+
+    Inside refresh_cache() (e.g. "regenerate") nothing is returned, so the
+    caller researches again and store_company_knowledge() replaces the entry.
+
+    Args:
+        company_name: Company name as it appears on the job
+        kind: Research schema (e.g. "company_info", "manual_prep")
+        refresh: Ignore the cached research
+
+    Returns:
+        Cached research dict, or None if missing, older than the TTL or refreshing
+    """
+    key = normalize_company_name(company_name)
+    if not key or refresh or is_refreshing():
+        return None
+
+    db = SessionLocal()
+    try:
+        research = db.query(CompanyResearch).filter(
+            CompanyResearch.company_key == key,
+            CompanyResearch.kind == kind
+        ).first()
+
+        if not research or not research.is_fresh(settings.company_research_ttl_hours):
+            return None
+
+        data = research.get_data()
+        if data:
+            logger.info(f"♻️  Reusing {kind} research for {company_name}")
+        return data or None
+    except Exception as e:
+        logger.error(f"Error reading company research for {company_name}: {e}")
+        return None
+    finally:
+        db.close()
+
+
+def store_company_knowledge(company_name: str, kind: str, data: Dict):
+    """
+    Store (or refresh) research for a company
+
+    Args:
+        company_name: Company name as it appears on the job
+        kind: Research schema (e.g. "company_info", "manual_prep")
+        data: Research to cache
+    """
+    key = normalize_company_name(company_name)
+    if not key or not data:
+        return
+
+    db = SessionLocal()
+    try:
+        research = db.query(CompanyResearch).filter(
+            CompanyResearch.company_key == key,
+            CompanyResearch.kind == kind
+        ).first()
+
+        if research is None:
+            research = CompanyResearch(company_key=key, company_name=company_name, kind=kind)
+            db.add(research)
+
+        research.data = json.dumps(data)
+        research.generated_at = datetime.utcnow()
+        db.commit()
+    except Exception as e:
+        # Another worker may have inserted the same company concurrently
+        logger.error(f"Error storing company research for {company_name}: {e}")
+        db.rollback()
+    finally:
+        db.close()
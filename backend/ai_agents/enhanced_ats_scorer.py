@@ -27,7 +27,8 @@ class EnhancedATSScorer(BaseAgent):
         self.use_multi_layer = use_multi_layer
         self.multi_layer_scorer = MultiLayerATSScorer() if use_multi_layer else None
     
-    def process(self, resume_text: str, job_description: str, tier: str = 'standard') -> Dict:
+    def process(self, resume_text: str, job_description: str, tier: str = 'standard',
+                **layer_options) -> Dict:
         """
         Comprehensive ATS analysis with 30+ checks (Jobscan standard)
         
@@ -35,6 +36,9 @@ class EnhancedATSScorer(BaseAgent):
             resume_text: Full resume text
             job_description: Full job description text
             tier: 'basic', 'standard', or 'premium' (for multi-layer mode)
+            **layer_options: Multi-layer options (policy, speculative,
+                             agreement_threshold, on_deferred - see
+                             MultiLayerATSScorer.assess_resume)
         
         Returns:
             industry-standard ATS score with detailed breakdown
@@ -42,7 +46,8 @@ class EnhancedATSScorer(BaseAgent):
         # Use multi-layer scoring if enabled
         if self.use_multi_layer and self.multi_layer_scorer:
             self.logger.info(f"🚀 Using Multi-Layer ATS Scoring ({tier} tier)...")
-            return self.multi_layer_scorer.assess_resume(resume_text, job_description, tier)
+            return self.multi_layer_scorer.assess_resume(resume_text, job_description, tier,
+                                                         **layer_options)
         
         # Legacy mode: Traditional 30+ checks
         self.logger.info("🔍 Starting Enhanced ATS Analysis (30+ checks)...")
@@ -152,7 +157,8 @@ Resume:
 CALCULATE ACCURATELY. Score 0-100 where 75%+ is excellent.
 """
         try:
-            response = self.generate(prompt, temperature=0.1, max_tokens=1500)
+            response = self.generate(prompt, temperature=0.1, max_tokens=1500,
+                                     validate=self.is_json_response)
             parsed = self.parse_json_response(response)
             
             # Ensure keyword_match_rate is calculated
@@ -223,7 +229,7 @@ Return ONLY valid JSON:
 Resume sample:
 {resume_text[:1000]}
 """
-        response = self.generate(prompt, temperature=0.2)
+        response = self.generate(prompt, temperature=0.2, validate=self.is_json_response)
         parsed = self.parse_json_response(response)
         return parsed or {'font_score': 70, 'issues': [], 'recommendations': []}
     
@@ -257,7 +263,7 @@ Return ONLY valid JSON:
 Resume structure analysis:
 {resume_text[:1500]}
 """
-        response = self.generate(prompt, temperature=0.2)
+        response = self.generate(prompt, temperature=0.2, validate=self.is_json_response)
         parsed = self.parse_json_response(response)
         return parsed or {'layout_score': 70, 'issues': [], 'recommendations': []}
     
@@ -291,7 +297,7 @@ Return ONLY valid JSON:
 Resume:
 {resume_text[:1000]}
 """
-        response = self.generate(prompt, temperature=0.2)
+        response = self.generate(prompt, temperature=0.2, validate=self.is_json_response)
         parsed = self.parse_json_response(response)
         return parsed or {'page_setup_score': 70, 'issues': [], 'recommendations': []}
     
@@ -350,7 +356,8 @@ Job Description (for context of required skills):
 Resume:
 {resume_text[:3000]}
 """
-        response = self.generate(prompt, temperature=0.2, max_tokens=1000)
+        response = self.generate(prompt, temperature=0.2, max_tokens=1000,
+                                 validate=self.is_json_response)
         parsed = self.parse_json_response(response)
         return parsed or {
             'structure_score': 70,
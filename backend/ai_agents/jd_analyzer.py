@@ -4,12 +4,16 @@ Extracts structured information from job descriptions
 """
 from typing import Dict, List
 from ai_agents.base_agent import BaseAgent
+from ai_agents.jd_cache import get_parsed_jd, store_parsed_jd
 from ai_agents.model_config import get_model_config
 
 
 class JDAnalyzer(BaseAgent):
     """Analyzes job descriptions and extracts key information"""
     
+    # Bump when the prompt or output schema changes so memoized parses are redone
+    PARSE_VERSION = 1
+    
     def __init__(self):
         config = get_model_config("JDAnalyzer")
         super().__init__(preferred_provider=config["provider"], model=config["model"])
@@ -18,12 +22,18 @@ class JDAnalyzer(BaseAgent):
         """
         Analyze job description and extract structured information
         
+        Results are memoized by description hash (see ai_agents/jd_cache.py).
+        
         Args:
             job_description: Full job description text
             
         Returns:
             Dictionary with extracted information
         """
+        memoized = get_parsed_jd(job_description, "jd_analysis", self.PARSE_VERSION)
+        if memoized:
+            return self._normalize_analysis(memoized)
+        
         prompt = f"""
 Analyze this job description and extract structured information. Return ONLY valid JSON with this exact structure:
 
@@ -48,7 +58,7 @@ Job Description:
 Extract all relevant information. If a field is not mentioned, use null or empty array. Be thorough and precise.
 """
         
-        response = self.generate(prompt, temperature=0.3)
+        response = self.generate(prompt, temperature=0.3, validate=self.is_json_response)
         
         if not response:
             return self._get_default_analysis()
@@ -60,6 +70,7 @@ Extract all relevant information. If a field is not mentioned, use null or empty
         
         # Ensure all required fields exist
         analysis = self._normalize_analysis(parsed)
+        store_parsed_jd(job_description, "jd_analysis", self.PARSE_VERSION, analysis)
         
         return analysis
     
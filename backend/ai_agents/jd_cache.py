@@ -0,0 +1,93 @@
+"""
+Job description parse memoization
+Parsed JD structures are stored by normalized-description hash, so the
+same description is only sent to the LLM once per parser version
+"""
+import json
+from typing import Dict, Optional
+
+from database import SessionLocal
+from models.job import ParsedJobDescription
+from ai_agents.response_cache import is_refreshing
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def _versioned_kind(kind: str, version: int) -> str:
+    """Stored kind, so parses made by an older prompt/schema are not reused"""
+    return f"{kind}:v{version}"
+
+
+def get_parsed_jd(job_description: str, kind: str, version: int) -> Optional[Dict]:
+    """
+    Get a memoized parse of a job description
+
+    Inside refresh_cache() (e.g. "regenerate") nothing is returned, so the
+    caller parses again and store_parsed_jd() replaces the entry.
+
+    Args:
+        job_description: Job description text
+        kind: Parser name ("jd_analysis", "ats_keywords")
+        version: Parser prompt/schema version
+
+    Returns:
+        Parsed structure, or None if this description was not parsed yet
+        by this parser version or refreshing
+    """
+    if not job_description or not job_description.strip() or is_refreshing():
+        return None
+
+    description_hash = ParsedJobDescription.hash_description(job_description)
+    db = SessionLocal()
+    try:
+        parsed = db.query(ParsedJobDescription).filter(
+            ParsedJobDescription.description_hash == description_hash,
+            ParsedJobDescription.kind == _versioned_kind(kind, version)
+        ).first()
+
+        data = parsed.get_data() if parsed else None
+        if data:
+            logger.info(f"♻️  Reusing {kind} for description {description_hash[:12]}")
+        return data or None
+    except Exception as e:
+        logger.error(f"Error reading memoized {kind}: {e}")
+        return None
+    finally:
+        db.close()
+
+
+def store_parsed_jd(job_description: str, kind: str, version: int, data: Dict):
+    """
+    Memoize the parse of a job description
+
+    Args:
+        job_description: Job description text
+        kind: Parser name ("jd_analysis", "ats_keywords")
+        version: Parser prompt/schema version
+        data: Parsed structure
+    """
+    if not job_description or not job_description.strip() or not data:
+        return
+
+    description_hash = ParsedJobDescription.hash_description(job_description)
+    versioned_kind = _versioned_kind(kind, version)
+    db = SessionLocal()
+    try:
+        parsed = db.query(ParsedJobDescription).filter(
+            ParsedJobDescription.description_hash == description_hash,
+            ParsedJobDescription.kind == versioned_kind
+        ).first()
+
+        if parsed is None:
+            parsed = ParsedJobDescription(description_hash=description_hash, kind=versioned_kind)
+            db.add(parsed)
+
+        parsed.data = json.dumps(data)
+        db.commit()
+    except Exception as e:
+        # Another worker may have stored the same description concurrently
+        logger.error(f"Error storing memoized {kind}: {e}")
+        db.rollback()
+    finally:
+        db.close()
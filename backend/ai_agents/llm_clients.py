@@ -0,0 +1,204 @@
+"""
+Process-wide LLM client registry
+Every agent shares one SDK client per provider (and API key), so HTTP
+connection pools are reused instead of rebuilt per agent instance
+"""
+import asyncio
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from config import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+try:
+    from google import genai
+    GEMINI_AVAILABLE = True
+    GEMINI_LEGACY = False
+except ImportError:
+    try:
+        import google.generativeai as genai_legacy
+        GEMINI_AVAILABLE = True
+        GEMINI_LEGACY = True
+    except ImportError:
+        GEMINI_AVAILABLE = False
+        GEMINI_LEGACY = False
+
+try:
+    from anthropic import Anthropic, AsyncAnthropic
+    ANTHROPIC_AVAILABLE = True
+except ImportError:
+    ANTHROPIC_AVAILABLE = False
+
+try:
+    from openai import OpenAI, AsyncOpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+
+# OpenAI-compatible providers and their endpoints
+OPENAI_COMPATIBLE_BASE_URLS = {
+    'deepseek': "https://api.deepseek.com",
+    'perplexity': "https://api.perplexity.ai",
+    'openai': None,
+}
+
+GEMINI_MODEL = 'gemini-2.0-flash-exp'
+GEMINI_LEGACY_MODEL = 'gemini-1.5-flash'
+
+_sync_clients: Dict[Tuple[str, str], Any] = {}
+_sync_lock = threading.Lock()
+
+# Async SDK clients wrap an httpx.AsyncClient bound to the event loop that
+# first used it, so they are kept per loop
+_async_clients: Dict[asyncio.AbstractEventLoop, Dict[Tuple[str, str], Any]] = {}
+
+
+def provider_api_key(provider: str) -> Optional[str]:
+    """API key configured for a provider"""
+    return {
+        'deepseek': settings.deepseek_api_key,
+        'perplexity': settings.perplexity_api_key,
+        'openai': settings.openai_api_key,
+        'gemini': settings.gemini_api_key,
+        'claude': settings.anthropic_api_key,
+    }.get(provider)
+
+
+def provider_available(provider: str) -> bool:
+    """Whether the SDK for a provider is installed and a key is configured"""
+    if not provider_api_key(provider):
+        return False
+    if provider in OPENAI_COMPATIBLE_BASE_URLS:
+        return OPENAI_AVAILABLE
+    if provider == 'gemini':
+        return GEMINI_AVAILABLE
+    if provider == 'claude':
+        return ANTHROPIC_AVAILABLE
+    return False
+
+
+def _build_sync_client(provider: str, api_key: str) -> Any:
+    if provider in OPENAI_COMPATIBLE_BASE_URLS:
+        base_url = OPENAI_COMPATIBLE_BASE_URLS[provider]
+        kwargs = {"api_key": api_key}
+        if base_url:
+            kwargs["base_url"] = base_url
+        try:
+            return OpenAI(**kwargs)
+        except TypeError:
+            # Handle proxies parameter issue in older OpenAI client versions
+            import httpx
+            return OpenAI(http_client=httpx.Client(), **kwargs)
+
+    if provider == 'gemini':
+        if not GEMINI_LEGACY:
+            return genai.Client(api_key=api_key)
+        genai_legacy.configure(api_key=api_key)
+        return genai_legacy.GenerativeModel(GEMINI_LEGACY_MODEL)
+
+    if provider == 'claude':
+        return Anthropic(api_key=api_key)
+
+    raise ValueError(f"Unknown provider: {provider}")
+
+
+def _build_async_client(provider: str, api_key: str) -> Any:
+    if provider in OPENAI_COMPATIBLE_BASE_URLS:
+        base_url = OPENAI_COMPATIBLE_BASE_URLS[provider]
+        kwargs = {"api_key": api_key}
+        if base_url:
+            kwargs["base_url"] = base_url
+        return AsyncOpenAI(**kwargs)
+
+    if provider == 'gemini':
+        # google.genai exposes async methods on client.aio; the legacy
+        # GenerativeModel has generate_content_async on the same object
+        return get_client(provider)
+
+    if provider == 'claude':
+        return AsyncAnthropic(api_key=api_key)
+
+    raise ValueError(f"Unknown provider: {provider}")
+
+
+def get_client(provider: str) -> Optional[Any]:
+    """
+    Get the shared blocking SDK client for a provider
+
+    Args:
+        provider: deepseek, perplexity, openai, gemini or claude
+
+    Returns:
+        SDK client, or None if the provider is not available
+    """
+    if not provider_available(provider):
+        return None
+
+    api_key = provider_api_key(provider)
+    key = (provider, api_key)
+    client = _sync_clients.get(key)
+
+    if client is None:
+        with _sync_lock:
+            client = _sync_clients.get(key)
+            if client is None:
+                client = _build_sync_client(provider, api_key)
+                _sync_clients[key] = client
+                logger.info(f"✅ {provider} client initialized")
+
+    return client
+
+
+def get_async_client(provider: str) -> Optional[Any]:
+    """
+    Get the shared async SDK client for a provider on the running event loop
+
+    Args:
+        provider: deepseek, perplexity, openai, gemini or claude
+
+    Returns:
+        Async SDK client, or None if the provider is not available
+    """
+    if not provider_available(provider):
+        return None
+
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.get(loop)
+
+    if clients is None:
+        # Forget clients of loops that are gone (e.g. previous asyncio.run calls)
+        for old_loop in [l for l in _async_clients if l.is_closed()]:
+            _async_clients.pop(old_loop, None)
+        clients = _async_clients.setdefault(loop, {})
+
+    api_key = provider_api_key(provider)
+    key = (provider, api_key)
+
+    if key not in clients:
+        clients[key] = _build_async_client(provider, api_key)
+        logger.debug(f"Created shared async {provider} client")
+
+    return clients[key]
+
+
+def gemini_model_name() -> str:
+    """Model name used with the shared Gemini client ('legacy' for the old SDK)"""
+    return 'legacy' if GEMINI_LEGACY else GEMINI_MODEL
+
+
+async def close_async_clients():
+    """Close the async LLM clients of the running loop (call on shutdown)"""
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.pop(loop, {})
+
+    for (provider, _), client in clients.items():
+        close = getattr(client, "close", None)
+        if provider == 'gemini' or close is None:
+            continue
+        try:
+            await close()
+        except Exception as e:
+            logger.error(f"Error closing async {provider} client: {e}")
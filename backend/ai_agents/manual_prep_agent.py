@@ -4,8 +4,10 @@ Advanced interview preparation using DeepSeek Reasoner + GPT-5-mini
 Generates comprehensive preparation materials from job URL and company details
 """
 from typing import Dict, List, Optional
+import asyncio
 import json
 from ai_agents.base_agent import BaseAgent
+from ai_agents.company_knowledge import get_company_knowledge, store_company_knowledge
 from ai_agents.model_config import get_model_config
 from utils.logger import setup_logger
 
@@ -96,10 +98,86 @@ class ManualPrepAgent(BaseAgent):
             "preparation_tips": prep_tips
         }
     
+    async def aprocess(self, company_name: str, job_title: Optional[str] = None,
+                       job_description: Optional[str] = None, job_url: Optional[str] = None,
+                       resume_text: Optional[str] = None) -> Dict:
+        """
+        Async version of process() for the FastAPI routes
+        
+        LLM calls are awaited on the shared async clients (agenerate), so the
+        event loop is not blocked. The technical, behavioral and HR sections
+        only depend on the company research and are generated concurrently.
+        
+        Args:
+            company_name: Company name (required)
+            job_title: Job title (optional)
+            job_description: Job description text (optional)
+            job_url: Job posting URL (optional, for reference)
+            resume_text: User's resume for personalized preparation
+            
+        Returns:
+            Dictionary with all preparation materials (same as process())
+        """
+        logger.info(f"🎯 Generating advanced prep for {company_name} - {job_title} (async)")
+        
+        company_insights = get_company_knowledge(company_name, "manual_prep")
+        if not company_insights:
+            response = await self._aask(self.research_agent, self._research_prompt(
+                company_name, job_title, job_description), 0.3, 2000)
+            company_insights = self._research_result(company_name, response)
+        
+        technical_response, behavioral_response, hr_response = await asyncio.gather(
+            self._aask(self, self._technical_qa_prompt(
+                company_name, job_title, job_description, resume_text, company_insights), 0.6, 3000),
+            self._aask(self, self._behavioral_qa_prompt(
+                company_name, job_title, job_description, company_insights), 0.7, 2500),
+            self._aask(self.research_agent, self._hr_qa_prompt(company_name, job_title), 0.5, 1500),
+        )
+        technical_qa = self._technical_qa_result(company_name, job_title, technical_response)
+        behavioral_qa = self._behavioral_qa_result(company_name, behavioral_response)
+        hr_qa = self._hr_qa_result(hr_response)
+        
+        response = await self._aask(self, self._strategic_prompt(
+            company_name, job_title, company_insights), 0.7, 2000)
+        talking_points, prep_tips = self._strategic_result(company_name, job_title, response)
+        
+        logger.info("✅ Manual prep generation complete")
+        
+        return {
+            "company_insights": company_insights,
+            "technical_qa": technical_qa,
+            "behavioral_qa": behavioral_qa,
+            "hr_qa": hr_qa,
+            "key_talking_points": talking_points,
+            "preparation_tips": prep_tips
+        }
+    
+    @staticmethod
+    def _ask(agent: BaseAgent, prompt: str, temperature: float, max_tokens: int) -> Optional[str]:
+        """JSON prompt through agent.generate (malformed replies are not cached)"""
+        return agent.generate(prompt, temperature=temperature, max_tokens=max_tokens,
+                              validate=agent.is_json_response)
+    
+    @staticmethod
+    async def _aask(agent: BaseAgent, prompt: str, temperature: float, max_tokens: int) -> Optional[str]:
+        """Async version of _ask()"""
+        return await agent.agenerate(prompt, temperature=temperature, max_tokens=max_tokens,
+                                     validate=agent.is_json_response)
+    
     def _research_company(self, company_name: str, job_title: Optional[str] = None, 
                          job_description: Optional[str] = None) -> Dict:
-        """Research company using GPT-5-mini for latest information"""
+        """Research company using GPT-5-mini for latest information (cached per company)"""
+        cached = get_company_knowledge(company_name, "manual_prep")
+        if cached:
+            return cached
         
+        response = self._ask(self.research_agent, self._research_prompt(
+            company_name, job_title, job_description), 0.3, 2000)
+        return self._research_result(company_name, response)
+    
+    def _research_prompt(self, company_name: str, job_title: Optional[str],
+                         job_description: Optional[str]) -> str:
+        """Company research prompt"""
         job_context = f"\nJob Title: {job_title}" if job_title else ""
         jd_context = f"\nJob Description: {job_description[:1000]}" if job_description else ""
         
@@ -124,10 +202,15 @@ Provide detailed information in JSON format:
 
 Be specific and factual. Use latest available information.
 """
-        
-        response = self.research_agent.generate(prompt, temperature=0.3, max_tokens=2000)
+        return prompt
+    
+    def _research_result(self, company_name: str, response: Optional[str]) -> Dict:
+        """Parse (and store) the company research, or default insights"""
         result = self.parse_json_response(response) if response else {}
         
+        if result:
+            store_company_knowledge(company_name, "manual_prep", result)
+        
         return result or {
             "overview": f"Leading company in their industry",
             "culture": "Dynamic and innovative work environment",
@@ -141,7 +224,14 @@ Be specific and factual. Use latest available information.
                                job_description: Optional[str], resume_text: Optional[str],
                                company_insights: Dict) -> List[Dict]:
         """Generate technical Q&A using DeepSeek Reasoner for deep analysis"""
-        
+        response = self._ask(self, self._technical_qa_prompt(
+            company_name, job_title, job_description, resume_text, company_insights), 0.6, 3000)
+        return self._technical_qa_result(company_name, job_title, response)
+    
+    def _technical_qa_prompt(self, company_name: str, job_title: Optional[str],
+                             job_description: Optional[str], resume_text: Optional[str],
+                             company_insights: Dict) -> str:
+        """Technical Q&A prompt"""
         jd_excerpt = job_description[:2000] if job_description else "General role"
         resume_excerpt = resume_text[:2000] if resume_text else "Experienced professional"
         tech_stack = ", ".join(company_insights.get('tech_stack', [])[:5])
@@ -172,8 +262,11 @@ Return JSON array:
 Make questions realistic, specific to the role, and progressively challenging.
 Include system design, coding, and conceptual questions.
 """
-        
-        response = self.generate(prompt, temperature=0.6, max_tokens=3000)
+        return prompt
+    
+    def _technical_qa_result(self, company_name: str, job_title: Optional[str],
+                             response: Optional[str]) -> List[Dict]:
+        """Parse the technical Q&A, or a default question"""
         result = self.parse_json_response(response) if response else []
         
         return result[:10] if result else [
@@ -190,7 +283,13 @@ Include system design, coding, and conceptual questions.
     def _generate_behavioral_qa(self, company_name: str, job_title: Optional[str],
                                 job_description: Optional[str], company_insights: Dict) -> List[Dict]:
         """Generate behavioral Q&A with STAR framework examples"""
-        
+        response = self._ask(self, self._behavioral_qa_prompt(
+            company_name, job_title, job_description, company_insights), 0.7, 2500)
+        return self._behavioral_qa_result(company_name, response)
+    
+    def _behavioral_qa_prompt(self, company_name: str, job_title: Optional[str],
+                              job_description: Optional[str], company_insights: Dict) -> str:
+        """Behavioral Q&A prompt"""
         culture = company_insights.get('culture', 'Collaborative environment')
         values = company_insights.get('why_work_here', [])
         
@@ -221,8 +320,10 @@ Return JSON array:
 
 Focus on: leadership, teamwork, conflict resolution, innovation, and handling pressure.
 """
-        
-        response = self.generate(prompt, temperature=0.7, max_tokens=2500)
+        return prompt
+    
+    def _behavioral_qa_result(self, company_name: str, response: Optional[str]) -> List[Dict]:
+        """Parse the behavioral Q&A, or a default question"""
         result = self.parse_json_response(response) if response else []
         
         return result[:8] if result else [
@@ -243,7 +344,11 @@ Focus on: leadership, teamwork, conflict resolution, innovation, and handling pr
     def _generate_hr_qa(self, company_name: str, job_title: Optional[str],
                        company_insights: Dict) -> List[Dict]:
         """Generate HR and salary negotiation questions"""
-        
+        response = self._ask(self.research_agent, self._hr_qa_prompt(company_name, job_title), 0.5, 1500)
+        return self._hr_qa_result(response)
+    
+    def _hr_qa_prompt(self, company_name: str, job_title: Optional[str]) -> str:
+        """HR/salary Q&A prompt"""
         prompt = f"""
 Generate 6 HR/salary interview questions and answers for {company_name} - {job_title}.
 
@@ -260,8 +365,10 @@ Return JSON array:
 
 Include: salary negotiation, why this company, career goals, work-life balance.
 """
-        
-        response = self.research_agent.generate(prompt, temperature=0.5, max_tokens=1500)
+        return prompt
+    
+    def _hr_qa_result(self, response: Optional[str]) -> List[Dict]:
+        """Parse the HR Q&A (empty list on failure)"""
         result = self.parse_json_response(response) if response else []
         
         return result[:6] if result else []
@@ -270,7 +377,11 @@ Include: salary negotiation, why this company, career goals, work-life balance.
                                     job_description: Optional[str], technical_qa: List,
                                     behavioral_qa: List, company_insights: Dict) -> tuple:
         """Generate key talking points and preparation tips using DeepSeek Reasoner"""
-        
+        response = self._ask(self, self._strategic_prompt(company_name, job_title, company_insights), 0.7, 2000)
+        return self._strategic_result(company_name, job_title, response)
+    
+    def _strategic_prompt(self, company_name: str, job_title: Optional[str], company_insights: Dict) -> str:
+        """Talking points / preparation tips prompt"""
         prompt = f"""
 Create strategic interview preparation for {company_name} - {job_title}.
 
@@ -298,8 +409,11 @@ Return JSON:
 
 Think strategically about what will make the candidate stand out at {company_name}.
 """
-        
-        response = self.generate(prompt, temperature=0.7, max_tokens=2000)
+        return prompt
+    
+    def _strategic_result(self, company_name: str, job_title: Optional[str],
+                          response: Optional[str]) -> tuple:
+        """Parse (talking points, preparation tips), with defaults"""
         result = self.parse_json_response(response) if response else {}
         
         talking_points = result.get('key_talking_points', [
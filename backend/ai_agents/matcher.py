@@ -65,7 +65,7 @@ Calculate match_score (0-100) based on:
 Be realistic and thorough. Identify ALL matching and missing skills.
 """
         
-        response = self.generate(prompt, temperature=0.4)
+        response = self.generate(prompt, temperature=0.4, validate=self.is_json_response)
         
         if not response:
             return self._get_default_match()
@@ -162,7 +162,7 @@ IMPORTANT for skills_matched:
 
 Be realistic. Score 0-100."""
         
-        response = self.generate(prompt, temperature=0.3)
+        response = self.generate(prompt, temperature=0.3, validate=self.is_json_response)
         
         if not response:
             return self._get_default_quick_match()
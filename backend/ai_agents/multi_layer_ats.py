@@ -7,17 +7,32 @@ Architecture:
 - Layer 2 (GPT-5-mini): Validation & refinement (all jobs for accurate score)
 - Layer 3 (DeepSeek Reasoner R1): Detailed feedback (based on tier)
 
-Every job goes through all 3 layers for maximum accuracy.
+Every job goes through all 3 layers for maximum accuracy by default; bulk
+scoring can skip or defer Layer 3 when Layers 1 and 2 already agree.
 Tier system controls what feedback is returned to user.
 """
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, Optional, Tuple
+import contextvars
+import copy
 import time
 from ai_agents.base_agent import BaseAgent
 from ai_agents.model_config import get_model_config
+from config import settings
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Layer 3 policies: always run it, skip it when Layers 1 and 2 agree, or
+# run it in the background when they agree
+LAYER3_POLICIES = ('full', 'skip', 'defer')
+
+# Speculative Layer 2 requests (run next to Layer 1)
+_layer_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ats-layer")
+
+# Background queue for deferred Layer 3 requests
+_deferred_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ats-deferred")
+
 
 class SimpleAgent(BaseAgent):
     """Concrete BaseAgent implementation for direct AI calls"""
@@ -65,23 +80,74 @@ class MultiLayerATSScorer:
         logger.info("✅ Multi-Layer ATS Scorer initialized (3 models)")
     
     def assess_resume(self, resume_text: str, job_description: str, 
-                     tier: str = 'standard') -> Dict:
+                     tier: str = 'standard', policy: str = 'full',
+                     speculative: bool = False,
+                     agreement_threshold: Optional[int] = None,
+                     on_deferred: Optional[Callable[[Dict], None]] = None) -> Dict:
         """
         Complete 3-layer ATS assessment
         
-        All jobs go through all 3 layers for accurate scoring.
-        Tier determines what feedback is returned.
+        By default all jobs go through all 3 layers for accurate scoring.
+        For bulk scoring, policy 'skip' or 'defer' trades accuracy for
+        throughput: when Layers 1 and 2 agree within `agreement_threshold`
+        points the final score comes from those two layers and Layer 3 is
+        skipped, or run in the background with `on_deferred` receiving the
+        full 3-layer result. Tier determines what feedback is returned.
         
         Args:
             resume_text: Full resume text
             job_description: Job description text
             tier: 'basic' (score only), 'standard' (score + insights), 
                   'premium' (score + full feedback)
+            policy: Layer 3 policy - 'full', 'skip' or 'defer'
+            speculative: Start Layer 2 together with Layer 1; Layer 2 then
+                         scores from the resume and job description only
+            agreement_threshold: Max Layer 1/2 score difference that counts as
+                                 agreement (default: settings.ats_agreement_threshold)
+            on_deferred: Called with the complete result once a deferred
+                         Layer 3 has finished
         
         Returns:
-            Dictionary with final score, layer details, and feedback
+            Dictionary with final score, layer details, feedback and the
+            layers that ran ('layers_run', 'deferred_layers')
+        """
+        results = {}
+        for event, data in self.iter_assessment(
+            resume_text, job_description, tier, policy=policy, speculative=speculative,
+            agreement_threshold=agreement_threshold, on_deferred=on_deferred
+        ):
+            if event == 'result':
+                results = data
+        return results
+    
+    def iter_assessment(self, resume_text: str, job_description: str, tier: str = 'standard',
+                        stream_feedback: bool = False, policy: str = 'full',
+                        speculative: bool = False,
+                        agreement_threshold: Optional[int] = None,
+                        on_deferred: Optional[Callable[[Dict], None]] = None
+                        ) -> Iterator[Tuple[str, Dict]]:
+        """
+        Run the layered assessment, reporting progress as it goes
+        
+        Args:
+            resume_text: Full resume text
+            job_description: Job description text
+            tier: 'basic', 'standard' or 'premium' (see assess_resume)
+            stream_feedback: Stream Layer 3's response instead of waiting for it
+            policy, speculative, agreement_threshold, on_deferred: See assess_resume
+        
+        Yields:
+            ('layer', layer score entry) after each layer,
+            ('feedback_chunk', {'text': ...}) for Layer 3 text when streaming,
+            ('result', assessment dict as returned by assess_resume) at the end
         """
-        logger.info(f"🔍 Starting {tier} tier assessment with 3-layer system...")
+        if policy not in LAYER3_POLICIES:
+            raise ValueError(f"Unknown Layer 3 policy: {policy}")
+        if agreement_threshold is None:
+            agreement_threshold = settings.ats_agreement_threshold
+        
+        logger.info(f"🔍 Starting {tier} tier assessment with 3-layer system "
+                    f"(Layer 3 policy: {policy}{', speculative Layer 2' if speculative else ''})...")
         
         start_time = time.time()
         
@@ -90,50 +156,99 @@ class MultiLayerATSScorer:
             'confidence': 1.0,
             'tier': tier,
             'layer_scores': [],
+            'layers_run': [],
+            'deferred_layers': [],
             'detailed_feedback': None,
             'cost_breakdown': {},
             'processing_time': None
         }
         
+        # LAYER 2 (speculative): validation from the raw resume and JD only,
+        # started before Layer 1 so both requests run at the same time
+        layer2_future = None
+        if speculative:
+            logger.info("  ⚡ Layer 2: Speculative validation in parallel with Layer 1...")
+            layer2_future = _layer_executor.submit(
+                contextvars.copy_context().run, self._layer2_validation, resume_text, job_description, None
+            )
+        
         # LAYER 1: Fast Baseline Scoring (DeepSeek Chat V3)
         logger.info("  📊 Layer 1: Fast baseline scoring...")
         layer1_result = self._layer1_baseline_scoring(resume_text, job_description)
-        results['layer_scores'].append({
-            'layer': 1,
-            'model': 'DeepSeek-Chat-V3',
-            'score': layer1_result['score'],
-            'keywords_matched': layer1_result.get('keywords_matched', 0),
-            'processing_time': layer1_result.get('processing_time', 0)
-        })
+        yield 'layer', self._add_layer(results, 1, layer1_result)
         
         # LAYER 2: Validation & Refinement (GPT-5-mini)
-        logger.info("  🔍 Layer 2: Validation with GPT-5-mini...")
-        layer2_result = self._layer2_validation(
-            resume_text, job_description, layer1_result
-        )
-        results['layer_scores'].append({
-            'layer': 2,
-            'model': 'GPT-5-mini',
-            'score': layer2_result['score'],
-            'refinements': layer2_result.get('refinements', []),
-            'processing_time': layer2_result.get('processing_time', 0)
-        })
+        if layer2_future is not None:
+            layer2_result = layer2_future.result()
+        else:
+            logger.info("  🔍 Layer 2: Validation with GPT-5-mini...")
+            layer2_result = self._layer2_validation(
+                resume_text, job_description, layer1_result
+            )
+        yield 'layer', self._add_layer(results, 2, layer2_result)
+        
+        # Early exit: Layers 1 and 2 agree, so Layer 3 is skipped or deferred
+        score_gap = abs(layer1_result.get('score', 0) - layer2_result.get('score', 0))
+        if policy != 'full' and score_gap <= agreement_threshold:
+            logger.info(f"  ⏭️  Layers 1 and 2 agree (gap {score_gap} <= {agreement_threshold}), "
+                        f"Layer 3 {'deferred' if policy == 'defer' else 'skipped'}")
+            
+            results['final_score'] = self._calculate_weighted_score(layer1_result, layer2_result)
+            results['confidence'] = self._calculate_confidence(layer1_result, layer2_result)
+            self._finish_results(results, layer1_result, None, start_time)
+            
+            if policy == 'defer':
+                results['deferred_layers'] = [3]
+                _deferred_executor.submit(
+                    contextvars.copy_context().run, self._run_deferred_layer3, resume_text, job_description,
+                    layer1_result, layer2_result, copy.deepcopy(results), on_deferred
+                )
+            
+            yield 'result', results
+            return
         
         # LAYER 3: Deep Reasoning Score + Feedback (DeepSeek Reasoner R1)
-        # Always runs for accurate scoring - contributes 30% to final score
+        # Contributes 30% to final score
         logger.info("  💡 Layer 3: Deep reasoning scoring with DeepSeek Reasoner...")
-        layer3_result = self._layer3_deep_reasoning(
-            resume_text, job_description, layer1_result, layer2_result,
-            include_full_feedback=True  # Always include full feedback
-        )
-        results['layer_scores'].append({
-            'layer': 3,
-            'model': 'DeepSeek-Reasoner-R1',
-            'score': layer3_result['score'],
-            'reasoning_depth': layer3_result.get('reasoning_depth', 'standard'),
-            'processing_time': layer3_result.get('processing_time', 0)
-        })
+        if stream_feedback:
+            layer3_result = yield from self._layer3_stream(
+                resume_text, job_description, layer1_result, layer2_result,
+                include_full_feedback=True
+            )
+        else:
+            layer3_result = self._layer3_deep_reasoning(
+                resume_text, job_description, layer1_result, layer2_result,
+                include_full_feedback=True  # Always include full feedback
+            )
+        yield 'layer', self._add_layer(results, 3, layer3_result)
+        
+        self._apply_layer3(results, layer1_result, layer2_result, layer3_result)
+        self._finish_results(results, layer1_result, layer3_result, start_time)
+        
+        yield 'result', results
+    
+    def _add_layer(self, results: Dict, layer: int, layer_result: Dict) -> Dict:
+        """Append a layer's score entry to the results"""
+        entry = {
+            'layer': layer,
+            'model': {1: 'DeepSeek-Chat-V3', 2: 'GPT-5-mini', 3: 'DeepSeek-Reasoner-R1'}[layer],
+            'score': layer_result['score'],
+        }
+        if layer == 1:
+            entry['keywords_matched'] = layer_result.get('keywords_matched', 0)
+        elif layer == 2:
+            entry['refinements'] = layer_result.get('refinements', [])
+        else:
+            entry['reasoning_depth'] = layer_result.get('reasoning_depth', 'standard')
+        entry['processing_time'] = layer_result.get('processing_time', 0)
         
+        results['layer_scores'].append(entry)
+        results['layers_run'].append(layer)
+        return entry
+    
+    def _apply_layer3(self, results: Dict, layer1_result: Dict, layer2_result: Dict,
+                      layer3_result: Dict):
+        """Set the final score and confidence from all 3 layers"""
         # Calculate weighted final score from ALL 3 layers
         results['final_score'] = self._calculate_weighted_score_3layer(
             layer1_result, layer2_result, layer3_result
@@ -141,7 +256,10 @@ class MultiLayerATSScorer:
         results['confidence'] = self._calculate_confidence_3layer(
             layer1_result, layer2_result, layer3_result
         )
-        
+    
+    def _finish_results(self, results: Dict, layer1_result: Dict,
+                        layer3_result: Optional[Dict], start_time: float):
+        """Add keyword analysis, feedback, timing and cost to the results"""
         # Include keyword analysis from Layer 1
         results['keyword_analysis'] = {
             'keyword_match_rate': layer1_result.get('keyword_match_percent', 0),
@@ -151,15 +269,35 @@ class MultiLayerATSScorer:
         }
         
         # Include full detailed feedback (no tier restrictions for personal use)
-        if layer3_result.get('feedback'):
+        if layer3_result and layer3_result.get('feedback'):
             results['detailed_feedback'] = layer3_result['feedback']
         
         results['processing_time'] = time.time() - start_time
         results['cost_breakdown'] = self.cost_tracker.copy()
         
-        logger.info(f"✅ Assessment complete: Score {results['final_score']} (confidence: {results['confidence']:.2f})")
-        
-        return results
+        logger.info(f"✅ Assessment complete: Score {results['final_score']} "
+                    f"(confidence: {results['confidence']:.2f}, layers {results['layers_run']})")
+    
+    def _run_deferred_layer3(self, resume: str, jd: str, layer1_result: Dict, layer2_result: Dict,
+                             results: Dict, on_deferred: Optional[Callable[[Dict], None]]):
+        """Run a deferred Layer 3 in the background and report the complete result"""
+        try:
+            start_time = time.time()
+            layer3_result = self._layer3_deep_reasoning(
+                resume, jd, layer1_result, layer2_result, include_full_feedback=True
+            )
+            self._add_layer(results, 3, layer3_result)
+            results['deferred_layers'] = []
+            self._apply_layer3(results, layer1_result, layer2_result, layer3_result)
+            
+            elapsed = results['processing_time']
+            self._finish_results(results, layer1_result, layer3_result, start_time)
+            results['processing_time'] += elapsed
+            
+            if on_deferred:
+                on_deferred(results)
+        except Exception as e:
+            logger.error(f"❌ Deferred Layer 3 failed: {e}")
     
     def _layer1_baseline_scoring(self, resume: str, jd: str) -> Dict:
         """
@@ -195,7 +333,8 @@ Return JSON:
 }}
 """
         
-        response = self.layer1_agent.generate(prompt, temperature=0.0, max_tokens=1000)
+        response = self.layer1_agent.generate(prompt, temperature=0.0, max_tokens=1000,
+                                              validate=self.layer1_agent.is_json_response)
         result = self.layer1_agent.parse_json_response(response) if response else {}
         
         result['processing_time'] = time.time() - start_time
@@ -203,14 +342,26 @@ Return JSON:
         
         return result
     
-    def _layer2_validation(self, resume: str, jd: str, layer1_result: Dict) -> Dict:
+    def _layer2_validation(self, resume: str, jd: str, layer1_result: Optional[Dict]) -> Dict:
         """
         Layer 2: Validate and refine Layer 1 score with GPT-5-mini
         
-        GPT-5-mini catches nuances, context, and provides more accurate scoring
+        GPT-5-mini catches nuances, context, and provides more accurate scoring.
+        Without a Layer 1 result (speculative mode) it scores independently.
         """
         start_time = time.time()
         
+        if layer1_result is None:
+            prompt = self._layer2_independent_prompt(resume, jd)
+            response = self.layer2_agent.generate(prompt, temperature=0.3, max_tokens=1200,
+                                                  validate=self.layer2_agent.is_json_response)
+            result = self.layer2_agent.parse_json_response(response) if response else {}
+            
+            result['processing_time'] = time.time() - start_time
+            self.cost_tracker['layer2'] += 0.0002  # Approximate cost
+            
+            return result
+        
         layer1_score = layer1_result.get('score', 0)
         
         prompt = f"""
@@ -242,7 +393,8 @@ Return refined score (0-100) and adjustments as JSON:
 }}
 """
         
-        response = self.layer2_agent.generate(prompt, temperature=0.3, max_tokens=1200)
+        response = self.layer2_agent.generate(prompt, temperature=0.3, max_tokens=1200,
+                                              validate=self.layer2_agent.is_json_response)
         result = self.layer2_agent.parse_json_response(response) if response else {}
         
         result['processing_time'] = time.time() - start_time
@@ -250,6 +402,32 @@ Return refined score (0-100) and adjustments as JSON:
         
         return result
     
+    def _layer2_independent_prompt(self, resume: str, jd: str) -> str:
+        """Layer 2 prompt for scoring without a Layer 1 result"""
+        return f"""
+SCORE this resume against the job description as an ATS expert (0-100).
+
+Resume excerpt: {resume[:3000]}
+Job Description excerpt: {jd[:2000]}
+
+Evaluate:
+1. Required skills and keywords present (including synonyms)
+2. Soft skills and contextual matches
+3. Hidden matches or false positives
+4. Critical red flags or strengths
+
+Return score and notes as JSON:
+{{
+    "score": 88,
+    "reason": "Strong technical match, soft skills implied by leadership experience",
+    "refinements": [
+        "Found 'team leadership' as synonym for 'people management'",
+        "Candidate has related experience in similar domain"
+    ],
+    "validation_notes": "Independent score"
+}}
+"""
+    
     def _layer3_deep_reasoning(self, resume: str, jd: str, 
                                layer1_result: Dict, layer2_result: Dict,
                                include_full_feedback: bool = False) -> Dict:
@@ -261,6 +439,35 @@ Return refined score (0-100) and adjustments as JSON:
         """
         start_time = time.time()
         
+        prompt = self._layer3_prompt(resume, jd, layer1_result, layer2_result, include_full_feedback)
+        response = self.layer3_agent.generate(prompt, temperature=0.5, max_tokens=3000,
+                                              validate=self.layer3_agent.is_json_response)
+        
+        return self._layer3_result(response, layer2_result, include_full_feedback, start_time)
+    
+    def _layer3_stream(self, resume: str, jd: str,
+                       layer1_result: Dict, layer2_result: Dict,
+                       include_full_feedback: bool = False):
+        """
+        Streaming version of _layer3_deep_reasoning
+        
+        Yields ('feedback_chunk', {'text': ...}) events and returns the
+        Layer 3 result (use with `yield from`)
+        """
+        start_time = time.time()
+        
+        prompt = self._layer3_prompt(resume, jd, layer1_result, layer2_result, include_full_feedback)
+        parts = []
+        for chunk in self.layer3_agent.generate_stream(prompt, temperature=0.5, max_tokens=3000,
+                                                       validate=self.layer3_agent.is_json_response):
+            parts.append(chunk)
+            yield 'feedback_chunk', {'text': chunk}
+        
+        return self._layer3_result("".join(parts), layer2_result, include_full_feedback, start_time)
+    
+    def _layer3_prompt(self, resume: str, jd: str, layer1_result: Dict, layer2_result: Dict,
+                       include_full_feedback: bool) -> str:
+        """Chain-of-thought scoring and feedback prompt for Layer 3"""
         layer1_score = layer1_result.get('score', 0)
         layer2_score = layer2_result.get('score', 0)
         
@@ -310,8 +517,13 @@ Return JSON:
     "overall_recommendation": "Focus on adding cloud certifications and emphasizing leadership"
 }}
 """
+        return prompt
+    
+    def _layer3_result(self, response: Optional[str], layer2_result: Dict,
+                       include_full_feedback: bool, start_time: float) -> Dict:
+        """Parse the Layer 3 response (falls back to the Layer 2 score)"""
+        layer2_score = layer2_result.get('score', 0)
         
-        response = self.layer3_agent.generate(prompt, temperature=0.5, max_tokens=3000)
         result = {'feedback': self.layer3_agent.parse_json_response(response)} if response else {}
         
         # Extract score from feedback
@@ -440,7 +652,8 @@ Return as JSON with specific, practical advice:
 }}
 """
         
-        response = self.layer3_agent.generate(prompt, temperature=0.7, max_tokens=3000)
+        response = self.layer3_agent.generate(prompt, temperature=0.7, max_tokens=3000,
+                                              validate=self.layer3_agent.is_json_response)
         result = {'feedback': self.layer3_agent.parse_json_response(response)} if response else {}
         
         result['processing_time'] = time.time() - start_time
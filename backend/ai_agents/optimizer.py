@@ -2,7 +2,7 @@
 Application Optimizer Agent
 Generates tailored resumes and cover letters
 """
-from typing import Dict, List
+from typing import Dict, Iterator, List
 from ai_agents.base_agent import BaseAgent
 from ai_agents.model_config import get_model_config
 
@@ -27,7 +27,80 @@ class ApplicationOptimizer(BaseAgent):
         Returns:
             Tailored resume content
         """
-        matching_skills = ', '.join([s['skill'] for s in match_analysis.get('matching_skills', [])])
+        prompt = self._tailored_resume_prompt(resume_text, job_description, match_analysis)
+        
+        response = self.generate(prompt, temperature=0.7, max_tokens=800)
+        
+        return response if response else "• Unable to generate tailored resume"
+    
+    def generate_cover_letter(self, resume_text: str, job_title: str, 
+                             company_name: str, job_description: str,
+                             match_analysis: Dict, user_info: Dict = None) -> str:
+        """
+        Generate personalized cover letter
+        
+        Args:
+            resume_text: User's resume
+            job_title: Target job title
+            company_name: Target company
+            job_description: Full job description
+            match_analysis: Match analysis data
+            user_info: User profile information
+            
+        Returns:
+            Cover letter text
+        """
+        prompt = self._cover_letter_prompt(resume_text, job_title, company_name,
+                                           job_description, user_info)
+        
+        response = self.generate(prompt, temperature=0.7, max_tokens=1000)
+        
+        return response if response else f"Dear Hiring Manager at {company_name},\n\nI am writing to express my strong interest in the {job_title} position.\n\n[Cover letter generation unavailable]"
+    
+    def stream_tailored_resume(self, resume_text: str, job_description: str,
+                               match_analysis: Dict) -> Iterator[str]:
+        """
+        Stream tailored resume bullets as they are generated
+        
+        Args:
+            resume_text: Original resume text
+            job_description: Target job description
+            match_analysis: Match analysis from ResumeMatcher
+            
+        Yields:
+            Text chunks of the tailored resume
+        """
+        prompt = self._tailored_resume_prompt(resume_text, job_description, match_analysis)
+        return self.generate_stream(prompt, temperature=0.7, max_tokens=800)
+    
+    def stream_cover_letter(self, resume_text: str, job_title: str,
+                            company_name: str, job_description: str,
+                            user_info: Dict = None) -> Iterator[str]:
+        """
+        Stream a personalized cover letter as it is generated
+        
+        Args:
+            resume_text: User's resume
+            job_title: Target job title
+            company_name: Target company
+            job_description: Full job description
+            user_info: User profile information
+            
+        Yields:
+            Text chunks of the cover letter
+        """
+        prompt = self._cover_letter_prompt(resume_text, job_title, company_name,
+                                           job_description, user_info)
+        return self.generate_stream(prompt, temperature=0.7, max_tokens=1000)
+    
+    def _tailored_resume_prompt(self, resume_text: str, job_description: str,
+                                match_analysis: Dict) -> str:
+        """Prompt for tailored resume bullets"""
+        # Fresh match analyses hold {"skill": ...} dicts, stored ones plain names
+        matching_skills = ', '.join([
+            s['skill'] if isinstance(s, dict) else str(s)
+            for s in match_analysis.get('matching_skills', [])
+        ])
         missing_skills = ', '.join(match_analysis.get('missing_skills', []))
         
         prompt = f"""
@@ -51,28 +124,11 @@ Generate 5-7 powerful resume bullets that:
 
 Return bullets as plain text, one per line, starting with "•".
 """
-        
-        response = self.generate(prompt, temperature=0.7, max_tokens=800)
-        
-        return response if response else "• Unable to generate tailored resume"
+        return prompt
     
-    def generate_cover_letter(self, resume_text: str, job_title: str, 
-                             company_name: str, job_description: str,
-                             match_analysis: Dict, user_info: Dict = None) -> str:
-        """
-        Generate personalized cover letter
-        
-        Args:
-            resume_text: User's resume
-            job_title: Target job title
-            company_name: Target company
-            job_description: Full job description
-            match_analysis: Match analysis data
-            user_info: User profile information
-            
-        Returns:
-            Cover letter text
-        """
+    def _cover_letter_prompt(self, resume_text: str, job_title: str, company_name: str,
+                             job_description: str, user_info: Dict = None) -> str:
+        """Prompt for a cover letter"""
         user_name = user_info.get('name', '[Your Name]') if user_info else '[Your Name]'
         
         prompt = f"""
@@ -102,10 +158,7 @@ Guidelines:
 
 Return the cover letter in plain text format, ready to use.
 """
-        
-        response = self.generate(prompt, temperature=0.7, max_tokens=1000)
-        
-        return response if response else f"Dear Hiring Manager at {company_name},\n\nI am writing to express my strong interest in the {job_title} position.\n\n[Cover letter generation unavailable]"
+        return prompt
     
     def process(self, resume_text: str, job_data: Dict, match_analysis: Dict, 
                 user_info: Dict = None, generate_type: str = "both") -> Dict:
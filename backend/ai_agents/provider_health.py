@@ -0,0 +1,224 @@
+"""
+LLM provider health tracking
+Latency EWMA, error rate and a circuit breaker per provider+model, used by
+BaseAgent to order fallbacks, skip failing providers and decide when to
+hedge a slow request
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ProviderHealth:
+    """
+    Rolling health of one provider+model
+
+    The circuit opens after `llm_circuit_failure_threshold` consecutive
+    failures, or when the error-rate EWMA exceeds `llm_circuit_error_rate`.
+    While open the provider is skipped; after the cool-down a single probe
+    request is let through (half-open) and its outcome closes or re-opens
+    the circuit.
+
+    Latency samples remember the max_tokens of their request, so a request
+    is only hedged against the latency of calls with at least its budget.
+    """
+
+    # Samples before the error-rate EWMA may open the circuit
+    MIN_SAMPLES = 5
+
+    def __init__(self, provider: str, model: Optional[str] = None):
+        self.provider = provider
+        self.model = model
+        self.label = f"{provider}/{model}" if model else provider
+        self.latency_ewma: Optional[float] = None
+        self.error_rate = 0.0
+        self.samples = 0
+        self.consecutive_failures = 0
+        self.latencies = deque(maxlen=100)  # (seconds, max_tokens)
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.open_count = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent now (takes the probe slot when half-open)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < settings.llm_circuit_cooldown_seconds:
+                    return False
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def release_probe(self):
+        """Give back the half-open probe slot when no request was actually sent"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def is_open(self) -> bool:
+        """Circuit open and still cooling down"""
+        with self._lock:
+            return (self.state == OPEN
+                    and time.monotonic() - self.opened_at < settings.llm_circuit_cooldown_seconds)
+
+    def record_success(self, latency: float, max_tokens: Optional[int] = None):
+        """Record a successful call, its latency (seconds) and its max_tokens"""
+        alpha = settings.llm_latency_ewma_alpha
+        with self._lock:
+            self.samples += 1
+            self.latencies.append((latency, max_tokens))
+            self.latency_ewma = latency if self.latency_ewma is None else (
+                alpha * latency + (1 - alpha) * self.latency_ewma
+            )
+            self.error_rate = (1 - alpha) * self.error_rate
+            self.consecutive_failures = 0
+            if self.state != CLOSED:
+                logger.info(f"✅ {self.label} recovered, closing circuit")
+            self.state = CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Record a failed call (error or empty response)"""
+        alpha = settings.llm_latency_ewma_alpha
+        with self._lock:
+            self.samples += 1
+            self.error_rate = alpha + (1 - alpha) * self.error_rate
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+
+            should_open = (
+                self.state == HALF_OPEN
+                or self.consecutive_failures >= settings.llm_circuit_failure_threshold
+                or (self.samples >= self.MIN_SAMPLES and self.error_rate >= settings.llm_circuit_error_rate)
+            )
+            if should_open and self.state != OPEN:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.open_count += 1
+                logger.warning(f"🔌 {self.label} circuit opened for "
+                               f"{settings.llm_circuit_cooldown_seconds}s "
+                               f"({self.consecutive_failures} consecutive failures, "
+                               f"error rate {self.error_rate:.0%})")
+
+    def p95_latency(self, max_tokens: Optional[int] = None) -> Optional[float]:
+        """
+        95th percentile of recent latencies (None with too few samples)
+
+        Args:
+            max_tokens: Only use calls with at least this max_tokens budget
+        """
+        with self._lock:
+            ordered = sorted(
+                latency for latency, budget in self.latencies
+                if max_tokens is None or (budget is not None and budget >= max_tokens)
+            )
+        if len(ordered) < settings.llm_hedge_min_samples:
+            return None
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def hedge_delay(self, max_tokens: Optional[int] = None) -> Optional[float]:
+        """
+        Seconds to wait before hedging a request to this provider+model
+
+        Returns None (don't hedge) until enough calls with at least the
+        request's max_tokens were measured - a p95 learned from short calls
+        says nothing about a long generation.
+        """
+        p95 = self.p95_latency(max_tokens)
+        if p95 is None:
+            return None
+        return max(p95, settings.llm_hedge_min_delay_seconds)
+
+    def stats(self) -> Dict:
+        """Current health snapshot"""
+        p95 = self.p95_latency()
+        with self._lock:
+            return {
+                "provider": self.provider,
+                "model": self.model,
+                "state": self.state,
+                "latency_ewma": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+                "latency_p95": round(p95, 3) if p95 is not None else None,
+                "error_rate": round(self.error_rate, 3),
+                "consecutive_failures": self.consecutive_failures,
+                "samples": self.samples,
+                "times_opened": self.open_count,
+            }
+
+
+_health: Dict[Tuple[str, Optional[str]], ProviderHealth] = {}
+_health_lock = threading.Lock()
+
+
+def get_health(provider: str, model: Optional[str] = None) -> ProviderHealth:
+    """
+    Get the shared health tracker of a provider+model
+
+    Args:
+        provider: deepseek, perplexity, openai, gemini or claude
+        model: Model name sent to the provider
+    """
+    key = (provider, model)
+    health = _health.get(key)
+
+    if health is None:
+        with _health_lock:
+            health = _health.get(key)
+            if health is None:
+                health = ProviderHealth(provider, model)
+                _health[key] = health
+
+    return health
+
+
+def route_providers(providers: List[str], preferred: Optional[str],
+                    models: Optional[Dict[str, str]] = None) -> List[str]:
+    """
+    Order providers for a request
+
+    The preferred provider stays first (agents pick it for the task);
+    fallbacks are ordered by latency EWMA, with unmeasured providers after
+    measured ones in their configured order. Providers whose circuit is
+    open are left out until their cool-down has passed.
+
+    Args:
+        providers: Available provider names in configured order
+        preferred: Agent's preferred provider
+        models: Model sent to each provider (health is tracked per provider+model)
+
+    Returns:
+        Provider names in the order to try them
+    """
+    models = models or {}
+    health = {name: get_health(name, models.get(name)) for name in providers}
+    healthy = [name for name in providers if not health[name].is_open()]
+
+    fallbacks = [name for name in healthy if name != preferred]
+    fallbacks.sort(key=lambda name: (
+        health[name].latency_ewma is None,
+        health[name].latency_ewma or 0.0,
+    ))
+
+    return ([preferred] if preferred in healthy else []) + fallbacks
+
+
+def health_stats() -> List[Dict]:
+    """Health snapshot of every provider+model seen so far"""
+    return [health.stats() for health in list(_health.values())]
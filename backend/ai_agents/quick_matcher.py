@@ -3,11 +3,94 @@ Quick Matcher - Fast keyword-based matching for real-time scoring
 Lightweight alternative to full AI analysis for initial job filtering
 """
 import re
-from typing import Dict, List, Set
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Set
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Common stopwords to ignore
+STOPWORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
+    'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should',
+    'could', 'can', 'may', 'might', 'must', 'this', 'that', 'these', 'those'
+})
+
+# Common technical skills/tools (can be expanded)
+SKILL_PATTERNS = [
+    # Programming languages
+    r'python|java|javascript|typescript|c\+\+|c#|go|rust|ruby|php|swift|kotlin',
+    # Data Science / ML
+    r'pytorch|tensorflow|keras|scikit-learn|pandas|numpy|spark|hadoop|kafka',
+    # Cloud / DevOps
+    r'aws|azure|gcp|docker|kubernetes|jenkins|terraform|ansible|gitlab|github',
+    # Databases
+    r'sql|mysql|postgresql|mongodb|redis|elasticsearch|cassandra',
+    # Frameworks
+    r'react|angular|vue|django|flask|fastapi|spring|node\.?js|express',
+    # Methods
+    r'agile|scrum|devops|ci/cd|mlops|rest|graphql|microservices',
+    # ML specific
+    r'machine learning|deep learning|nlp|computer vision|reinforcement learning',
+    r'neural network|cnn|rnn|lstm|transformer|bert|gpt',
+]
+
+# Words of 3+ letters (2-letter words never count as keywords)
+_WORD_RE = re.compile(r'\b[a-z]{3,}\b')
+
+# All skill patterns in one pass (no skill is part of another, so this finds
+# the same skills as matching each pattern separately)
+_SKILL_RE = re.compile(r'\b(?:' + '|'.join(SKILL_PATTERNS) + r')\b', re.IGNORECASE)
+
+_TITLE_TERM_RE = re.compile(r'\b[a-z]{3,}\b')
+_TITLE_STOPWORDS = frozenset({'the', 'and', 'or', 'senior', 'junior', 'lead'})
+
+# Batches smaller than this are scored in-process even when a pool is requested
+PROCESS_POOL_MIN_JOBS = 1000
+
+
+class ResumeProfile(NamedTuple):
+    """Resume side of the quick match, computed once per resume version"""
+    text: str  # Lowercased resume
+    keywords: frozenset
+    skills: frozenset
+
+
+@lru_cache(maxsize=16)
+def analyze_resume(resume_text: str) -> ResumeProfile:
+    """
+    Tokenize a resume for quick matching (cached per resume text)
+    
+    Args:
+        resume_text: User's resume text
+        
+    Returns:
+        ResumeProfile with lowercased text, keywords and technical skills
+    """
+    text = resume_text.lower()
+    return ResumeProfile(
+        text=text,
+        keywords=frozenset(_extract_keywords(text)),
+        skills=frozenset(_extract_technical_skills(text)),
+    )
+
+
+def _extract_keywords(text: str) -> Set[str]:
+    """Extract important keywords from lowercased text"""
+    return {w for w in _WORD_RE.findall(text) if w not in STOPWORDS}
+
+
+def _extract_technical_skills(text: str) -> Set[str]:
+    """Extract technical skills and tools"""
+    return {m.lower() for m in _SKILL_RE.findall(text)}
+
+
+def _score_chunk(resume_text: str, jobs: List[Dict]) -> Dict[int, float]:
+    """Process pool worker: score a chunk of jobs"""
+    return QuickMatcher()._score_jobs(analyze_resume(resume_text), jobs)
+
 
 class QuickMatcher:
     """Fast keyword-based matcher for real-time job scoring"""
@@ -34,20 +117,28 @@ class QuickMatcher:
             Match score 0-100
         """
         try:
+            return self._score(analyze_resume(resume_text), job_description, job_title)
+        except Exception as e:
+            self.logger.error(f"Error in quick match: {e}")
+            return 0
+    
+    def _score(self, resume: ResumeProfile, job_description: str, job_title: str = "") -> float:
+        """Quick match of one job against an analyzed resume"""
+        try:
+            job_text = job_description.lower()
+            
             # Extract keywords and skills
-            resume_keywords = self._extract_keywords(resume_text.lower())
-            job_keywords = self._extract_keywords(job_description.lower())
+            job_keywords = _extract_keywords(job_text)
             
             # Extract technical skills specifically
-            resume_skills = self._extract_technical_skills(resume_text.lower())
-            job_skills = self._extract_technical_skills(job_description.lower())
+            job_skills = _extract_technical_skills(job_text)
             
             # Calculate overlaps
-            keyword_overlap = len(resume_keywords & job_keywords) / max(len(job_keywords), 1)
-            skill_overlap = len(resume_skills & job_skills) / max(len(job_skills), 1)
+            keyword_overlap = len(resume.keywords & job_keywords) / max(len(job_keywords), 1)
+            skill_overlap = len(resume.skills & job_skills) / max(len(job_skills), 1)
             
             # Job title match
-            title_score = self._calculate_title_match(resume_text.lower(), job_title.lower())
+            title_score = self._calculate_title_match(resume.text, job_title.lower())
             
             # Weighted score
             match_score = (
@@ -64,49 +155,11 @@ class QuickMatcher:
     
     def _extract_keywords(self, text: str) -> Set[str]:
         """Extract important keywords from text"""
-        # Common stopwords to ignore
-        stopwords = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
-            'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should',
-            'could', 'can', 'may', 'might', 'must', 'this', 'that', 'these', 'those'
-        }
-        
-        # Extract words (2+ characters)
-        words = re.findall(r'\b[a-z]{2,}\b', text)
-        
-        # Filter stopwords and get unique keywords
-        keywords = {w for w in words if w not in stopwords and len(w) > 2}
-        
-        return keywords
+        return _extract_keywords(text)
     
     def _extract_technical_skills(self, text: str) -> Set[str]:
         """Extract technical skills and tools"""
-        # Common technical skills/tools (can be expanded)
-        skill_patterns = [
-            # Programming languages
-            r'\b(python|java|javascript|typescript|c\+\+|c#|go|rust|ruby|php|swift|kotlin)\b',
-            # Data Science / ML
-            r'\b(pytorch|tensorflow|keras|scikit-learn|pandas|numpy|spark|hadoop|kafka)\b',
-            # Cloud / DevOps
-            r'\b(aws|azure|gcp|docker|kubernetes|jenkins|terraform|ansible|gitlab|github)\b',
-            # Databases
-            r'\b(sql|mysql|postgresql|mongodb|redis|elasticsearch|cassandra)\b',
-            # Frameworks
-            r'\b(react|angular|vue|django|flask|fastapi|spring|node\.?js|express)\b',
-            # Methods
-            r'\b(agile|scrum|devops|ci/cd|mlops|rest|graphql|microservices)\b',
-            # ML specific
-            r'\b(machine learning|deep learning|nlp|computer vision|reinforcement learning)\b',
-            r'\b(neural network|cnn|rnn|lstm|transformer|bert|gpt)\b',
-        ]
-        
-        skills = set()
-        for pattern in skill_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            skills.update([m.lower() for m in matches])
-        
-        return skills
+        return _extract_technical_skills(text)
     
     def _calculate_title_match(self, resume_text: str, job_title: str) -> float:
         """Calculate how well resume matches job title"""
@@ -114,10 +167,10 @@ class QuickMatcher:
             return 0.5  # Neutral score if no title
         
         # Extract key terms from job title
-        title_terms = set(re.findall(r'\b[a-z]{3,}\b', job_title.lower()))
+        title_terms = set(_TITLE_TERM_RE.findall(job_title.lower()))
         
         # Remove common words
-        title_terms = {t for t in title_terms if t not in {'the', 'and', 'or', 'senior', 'junior', 'lead'}}
+        title_terms = title_terms - _TITLE_STOPWORDS
         
         if not title_terms:
             return 0.5
@@ -127,17 +180,39 @@ class QuickMatcher:
         
         return found_terms / len(title_terms)
     
-    def batch_calculate(self, resume_text: str, jobs: List[Dict]) -> Dict[int, float]:
+    def batch_calculate(self, resume_text: str, jobs: List[Dict],
+                        processes: Optional[int] = None) -> Dict[int, float]:
         """
         Calculate quick match for multiple jobs efficiently
         
+        The resume is analyzed once for the whole batch (and cached across
+        batches), so each job only costs one tokenization of its description.
+        
         Args:
             resume_text: User's resume
             jobs: List of job dicts with 'id', 'description', 'title'
+            processes: Score large batches (PROCESS_POOL_MIN_JOBS+) in this
+                       many worker processes
             
         Returns:
             Dict mapping job_id to match_score
         """
+        if processes and processes > 1 and len(jobs) >= PROCESS_POOL_MIN_JOBS:
+            chunk_size = -(-len(jobs) // (processes * 4))
+            chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+            results = {}
+            try:
+                with ProcessPoolExecutor(max_workers=processes) as executor:
+                    for chunk_scores in executor.map(_score_chunk, [resume_text] * len(chunks), chunks):
+                        results.update(chunk_scores)
+                return results
+            except Exception as e:
+                self.logger.error(f"Process pool quick match failed, scoring in-process: {e}")
+        
+        return self._score_jobs(analyze_resume(resume_text), jobs)
+    
+    def _score_jobs(self, resume: ResumeProfile, jobs: List[Dict]) -> Dict[int, float]:
+        """Score jobs with a description against an analyzed resume"""
         results = {}
         
         for job in jobs:
@@ -146,7 +221,6 @@ class QuickMatcher:
             title = job.get('title', '')
             
             if job_id and description:
-                score = self.calculate_quick_match(resume_text, description, title)
-                results[job_id] = score
+                results[job_id] = self._score(resume, description, title or "")
         
         return results
@@ -0,0 +1,261 @@
+"""
+Provider-aware LLM rate limiting
+One limiter per provider+model, shared by every agent in the process. Each
+limiter paces requests and tokens per minute, backs off when the provider
+reports a rate limit and adapts its concurrency (AIMD) to what the provider
+actually sustains
+"""
+import asyncio
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from config import settings
+from utils.logger import setup_logger
+from utils.rate_limiter import TokenBucket
+
+logger = setup_logger(__name__)
+
+# Rough characters-per-token ratio used to estimate token usage
+CHARS_PER_TOKEN = 4
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Cheap token estimate for quota accounting"""
+    return len(text or "") // CHARS_PER_TOKEN + 1
+
+
+def _quota(quotas: Dict[str, int], provider: str, model: str, default: int) -> int:
+    """Look up "provider:model" first, then "provider", then the default"""
+    return quotas.get(f"{provider}:{model}", quotas.get(provider, default))
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse retry hints: "12", "1.5", "6m0s", "250ms" -> seconds"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    factors = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * factors[unit] for number, unit in parts)
+
+
+def rate_limit_info(error: Exception) -> Tuple[bool, Optional[float]]:
+    """
+    Inspect a provider SDK exception
+
+    Args:
+        error: Exception raised by an SDK call
+
+    Returns:
+        (is_rate_limit, retry_after_seconds or None)
+    """
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    name = type(error).__name__
+    is_rate_limit = (
+        status == 429
+        or "RateLimit" in name
+        or "RESOURCE_EXHAUSTED" in str(error)
+    )
+    if not is_rate_limit:
+        return False, None
+
+    retry_after = None
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for header in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens",
+                   "anthropic-ratelimit-requests-reset"):
+        seconds = _parse_duration(headers.get(header)) if header in headers else None
+        if seconds is not None and seconds >= 0:
+            retry_after = max(retry_after or 0.0, seconds)
+
+    return True, retry_after
+
+
+class ProviderLimiter:
+    """
+    Request, token and concurrency limits for one provider+model
+
+    - requests and tokens per minute are token buckets
+    - a 429 halves the concurrency limit and pauses all calls for the
+      provider's retry-after (or an exponential backoff)
+    - every `settings.llm_concurrency_increase_after` successes the
+      concurrency limit grows by one, up to its configured maximum
+    """
+
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+
+        rpm = _quota(settings.llm_requests_per_minute, provider, model,
+                     settings.llm_default_requests_per_minute)
+        tpm = _quota(settings.llm_tokens_per_minute, provider, model,
+                     settings.llm_default_tokens_per_minute)
+        self.max_concurrency = _quota(settings.llm_max_concurrency, provider, model,
+                                      settings.llm_default_max_concurrency)
+
+        # Allow short bursts of up to 1/6 of the per-minute quota
+        self.requests = TokenBucket(rate=rpm / 60.0, capacity=max(1.0, rpm / 6.0))
+        self.tokens = TokenBucket(rate=tpm / 60.0, capacity=max(1.0, tpm / 6.0))
+
+        self.concurrency = self.max_concurrency
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.consecutive_rate_limits = 0
+        self.successes_since_increase = 0
+        self.rate_limited_count = 0
+
+        self._condition = threading.Condition()
+
+    def _wait_time(self, tokens: float) -> float:
+        """Seconds until a call may start (0 = slot taken); caller holds the condition"""
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.in_flight >= self.concurrency:
+            return 0.05
+
+        wait = self.requests.try_acquire(1)
+        if wait > 0:
+            return wait
+        wait = self.tokens.try_acquire(min(tokens, self.tokens.capacity))
+        if wait > 0:
+            self.requests.adjust(-1)  # Give the request token back
+            return wait
+
+        self.in_flight += 1
+        return 0.0
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a call may start
+
+        Args:
+            tokens: Estimated tokens of the call (prompt + max_tokens)
+            timeout: Give up after this many seconds
+
+        Returns:
+            True if a slot was taken (call release() afterwards), False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                wait = self._wait_time(tokens)
+                if wait <= 0:
+                    return True
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait = min(wait, remaining)
+                self._condition.wait(wait)
+
+    async def aacquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Async acquire (polls without blocking the event loop)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._condition:
+                wait = self._wait_time(tokens)
+            if wait <= 0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            await asyncio.sleep(wait)
+
+    def release(self, estimated_tokens: float = 0, used_tokens: Optional[float] = None,
+                rate_limited: bool = False, retry_after: Optional[float] = None):
+        """
+        Finish a call started with acquire()
+
+        Args:
+            estimated_tokens: Tokens taken at acquire()
+            used_tokens: Actual (estimated) usage; unused tokens are returned
+            rate_limited: The provider answered with a rate limit error
+            retry_after: Provider's retry hint in seconds
+        """
+        with self._condition:
+            self.in_flight = max(0, self.in_flight - 1)
+
+            if used_tokens is not None and estimated_tokens:
+                self.tokens.adjust(used_tokens - min(estimated_tokens, self.tokens.capacity))
+
+            if rate_limited:
+                self.rate_limited_count += 1
+                self.consecutive_rate_limits += 1
+                self.successes_since_increase = 0
+                self.concurrency = max(1, self.concurrency // 2)
+                backoff = min(
+                    settings.llm_backoff_max_seconds,
+                    settings.llm_backoff_base_seconds * 2 ** (self.consecutive_rate_limits - 1)
+                )
+                pause = retry_after if retry_after is not None else backoff
+                self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+                logger.warning(f"⏳ {self.provider}/{self.model} rate limited: pausing {pause:.1f}s, "
+                               f"concurrency -> {self.concurrency}")
+            else:
+                self.consecutive_rate_limits = 0
+                self.successes_since_increase += 1
+                if (self.concurrency < self.max_concurrency
+                        and self.successes_since_increase >= settings.llm_concurrency_increase_after):
+                    self.concurrency += 1
+                    self.successes_since_increase = 0
+
+            self._condition.notify_all()
+
+    def stats(self) -> Dict:
+        """Current limiter state"""
+        with self._condition:
+            return {
+                "provider": self.provider,
+                "model": self.model,
+                "concurrency": self.concurrency,
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self.in_flight,
+                "rate_limited": self.rate_limited_count,
+                "paused_for": round(max(0.0, self.blocked_until - time.monotonic()), 1),
+            }
+
+
+_limiters: Dict[Tuple[str, str], ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str, model: str) -> ProviderLimiter:
+    """
+    Get the shared limiter of a provider+model
+
+    Args:
+        provider: deepseek, perplexity, openai, gemini or claude
+        model: Model name sent to the provider
+
+    Returns:
+        ProviderLimiter
+    """
+    key = (provider, model)
+    limiter = _limiters.get(key)
+
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                limiter = ProviderLimiter(provider, model)
+                _limiters[key] = limiter
+
+    return limiter
+
+
+def limiter_stats() -> list:
+    """State of every limiter created so far"""
+    return [limiter.stats() for limiter in list(_limiters.values())]
@@ -4,12 +4,30 @@ Uses actual ATS algorithms: keyword matching, density, format checks
 NO AI - pure rules-based scoring like Workday, Greenhouse, Taleo
 """
 import re
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 from collections import Counter
+from utils.keyword_matcher import KeywordMatcher
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Common technical terms patterns (manual keyword extraction)
+TECH_PATTERNS = [
+    r'\b(?:Python|Java|JavaScript|C\+\+|SQL|R|Ruby|PHP|Swift|Kotlin)\b',
+    r'\b(?:Machine Learning|ML|Deep Learning|AI|Data Science|NLP|Computer Vision)\b',
+    r'\b(?:AWS|Azure|GCP|Docker|Kubernetes|Git|CI/CD)\b',
+    r'\b(?:React|Angular|Vue|Node\.js|Django|Flask|Spring)\b',
+    r'\b(?:TensorFlow|PyTorch|Scikit-learn|Pandas|NumPy)\b',
+]
+
+# All technical terms in one pass (no two terms can match overlapping text,
+# so this finds the same terms as running each pattern separately)
+_TECH_RE = re.compile('|'.join(TECH_PATTERNS), re.IGNORECASE)
+_PHRASE_RE = re.compile(r'\b(?:[A-Z][a-z]+(?: [A-Z][a-z]+)*)\b')
+_JD_DEGREE_RE = re.compile(r"(?:master|phd|doctorate|msc|ma)", re.IGNORECASE)
+_RESUME_DEGREE_RE = re.compile(r"(?:master|phd|doctorate|msc|ma|m\.s\.|bachelor)", re.IGNORECASE)
+_YEARS_RE = re.compile(r"(\d+)\+?\s*(?:years?|yrs?)", re.IGNORECASE)
+
 
 class RealATSScorer:
     """
@@ -43,29 +61,88 @@ class RealATSScorer:
         """
         # Step 1: Extract keywords from JD
         jd_keyword_list = self._extract_jd_keywords(job_description, jd_keywords)
+        logger.info(f"📊 Extracted {len(jd_keyword_list)} unique keywords from JD")
         
         # Step 2: Count exact matches in resume
         exact_matches = self._count_exact_matches(resume_text, jd_keyword_list)
         
+        # Steps 3-6: Density, format, hard filters, final score
+        result = self._score_matches(
+            resume_text, job_description, jd_keyword_list, exact_matches,
+            self._resume_profile(resume_text)
+        )
+        
+        if not result['hard_filters']['all_passed']:
+            # In real ATS, failing hard filters = auto-reject
+            logger.warning(f"⚠️ Hard filters failed - applying 40% penalty")
+        
+        logger.info(f"✅ Real ATS Score: {result['ats_score']}% (Keywords: {result['keyword_score']}%, Format: {result['format_score']}%)")
+        logger.info(f"   Exact matches: {exact_matches['total_matched']}/{len(jd_keyword_list)} keywords")
+        
+        return result
+    
+    def score_many(self, resume_text: str, job_descriptions: List[str],
+                   jd_keywords: Optional[List[Optional[Dict]]] = None) -> List[Dict]:
+        """
+        Score one resume against many job descriptions
+        
+        The keywords of all JDs go into one matcher, so the resume is scanned
+        once for the whole batch; the resume-side checks (format, stats,
+        degree and years of experience) are also computed once.
+        
+        Args:
+            resume_text: Resume text
+            job_descriptions: Job descriptions to score against
+            jd_keywords: AI-extracted keywords per JD (same order, None = manual extraction)
+            
+        Returns:
+            One score() result per job description, in the same order
+        """
+        jd_keywords = jd_keywords or [None] * len(job_descriptions)
+        keyword_lists = [
+            self._extract_jd_keywords(job_description, keywords)
+            for job_description, keywords in zip(job_descriptions, jd_keywords)
+        ]
+        
+        counts = KeywordMatcher(kw for keywords in keyword_lists for kw in keywords).count(resume_text)
+        resume_profile = self._resume_profile(resume_text)
+        
+        results = [
+            self._score_matches(
+                resume_text, job_description, keyword_list,
+                self._exact_matches(keyword_list, counts), resume_profile
+            )
+            for job_description, keyword_list in zip(job_descriptions, keyword_lists)
+        ]
+        
+        logger.info(f"✅ Real ATS scored {len(results)} jobs ({len(counts)} distinct keywords found in resume)")
+        
+        return results
+    
+    def _resume_profile(self, resume_text: str) -> Dict:
+        """Resume-side checks that don't depend on the job description"""
+        return {
+            "format_score": self._check_format_quality(resume_text),
+            "resume_stats": self._get_resume_stats(resume_text),
+            "filter_facts": self._resume_filter_facts(resume_text),
+        }
+    
+    def _score_matches(self, resume_text: str, job_description: str, jd_keyword_list: List[str],
+                       exact_matches: Dict, resume_profile: Dict) -> Dict:
+        """Build the score() result from the keyword matches"""
+        format_score = resume_profile['format_score']
+        resume_stats = resume_profile['resume_stats']
+        
         # Step 3: Calculate keyword density
         keyword_density = self._calculate_keyword_density(resume_text, exact_matches)
         
-        # Step 4: Check format quality
-        format_score = self._check_format_quality(resume_text)
-        
-        # Step 5: Apply hard filters
-        hard_filters = self._apply_hard_filters(resume_text, job_description)
+        # Step 4: Apply hard filters
+        hard_filters = self._apply_hard_filters(resume_text, job_description, resume_profile['filter_facts'])
         
-        # Step 6: Calculate final score
+        # Step 5: Calculate final score
         keyword_score = self._calculate_keyword_score(exact_matches, jd_keyword_list)
         final_score = self._calculate_final_score(keyword_score, format_score, hard_filters)
         
-        # Get resume stats
-        resume_stats = self._get_resume_stats(resume_text)
-        
-        logger.info(f"✅ Real ATS Score: {final_score}% (Keywords: {keyword_score}%, Format: {format_score}%)")
-        logger.info(f"   Exact matches: {exact_matches['total_matched']}/{len(jd_keyword_list)} keywords")
-        
         return {
             "ats_score": final_score,
             "keyword_score": keyword_score,
@@ -110,46 +187,33 @@ class RealATSScorer:
         # Remove duplicates and clean
         keywords = list(set([kw.strip().lower() for kw in keywords if kw.strip()]))
         
-        logger.info(f"📊 Extracted {len(keywords)} unique keywords from JD")
-        
         return keywords
     
     def _manual_keyword_extraction(self, job_description: str) -> List[str]:
         """Manual keyword extraction (fallback)"""
-        keywords = []
-        
-        # Common technical terms patterns
-        tech_patterns = [
-            r'\b(?:Python|Java|JavaScript|C\+\+|SQL|R|Ruby|PHP|Swift|Kotlin)\b',
-            r'\b(?:Machine Learning|ML|Deep Learning|AI|Data Science|NLP|Computer Vision)\b',
-            r'\b(?:AWS|Azure|GCP|Docker|Kubernetes|Git|CI/CD)\b',
-            r'\b(?:React|Angular|Vue|Node\.js|Django|Flask|Spring)\b',
-            r'\b(?:TensorFlow|PyTorch|Scikit-learn|Pandas|NumPy)\b',
-        ]
-        
-        for pattern in tech_patterns:
-            matches = re.finditer(pattern, job_description, re.IGNORECASE)
-            keywords.extend([m.group() for m in matches])
+        # Common technical terms
+        keywords = _TECH_RE.findall(job_description)
         
         # Extract multi-word phrases (important skills)
-        phrases = re.findall(r'\b(?:[A-Z][a-z]+(?: [A-Z][a-z]+)*)\b', job_description)
+        phrases = _PHRASE_RE.findall(job_description)
         keywords.extend([p for p in phrases if len(p.split()) >= 2 and len(p.split()) <= 4])
         
         return keywords
     
     def _count_exact_matches(self, resume_text: str, keywords: List[str]) -> Dict:
-        """Count exact keyword matches (case-insensitive)"""
-        resume_lower = resume_text.lower()
-        
+        """Count exact keyword matches (case-insensitive, one pass over the resume)"""
+        counts = KeywordMatcher(keywords).count(resume_text)
+        return self._exact_matches(keywords, counts)
+    
+    @staticmethod
+    def _exact_matches(keywords: List[str], counts: Dict[str, int]) -> Dict:
+        """Split keywords into matched/missing using per-keyword occurrence counts"""
         matched = []
         missing = []
         keyword_counts = {}
         
         for keyword in keywords:
-            keyword_lower = keyword.lower()
-            
-            # Count occurrences
-            count = len(re.findall(r'\b' + re.escape(keyword_lower) + r'\b', resume_lower))
+            count = counts.get(keyword.lower(), 0)
             
             if count > 0:
                 matched.append(keyword)
@@ -222,16 +286,26 @@ class RealATSScorer:
         
         return max(0, score)
     
-    def _apply_hard_filters(self, resume_text: str, job_description: str) -> Dict:
+    def _resume_filter_facts(self, resume_text: str) -> Dict:
+        """Degree and years of experience found in the resume (for the hard filters)"""
+        resume_years = _YEARS_RE.findall(resume_text)
+        
+        return {
+            "has_degree": bool(_RESUME_DEGREE_RE.search(resume_text)),
+            "max_years": max([int(y) for y in resume_years], default=0)
+        }
+    
+    def _apply_hard_filters(self, resume_text: str, job_description: str, resume_facts: Dict = None) -> Dict:
         """Apply hard requirement filters (pass/fail checks)"""
+        resume_facts = resume_facts or self._resume_filter_facts(resume_text)
         filters = {
             "all_passed": True,
             "checks": []
         }
         
         # Check 1: Degree requirement
-        if re.search(r"(?:master|phd|doctorate|msc|ma)", job_description, re.IGNORECASE):
-            has_degree = bool(re.search(r"(?:master|phd|doctorate|msc|ma|m\.s\.|bachelor)", resume_text, re.IGNORECASE))
+        if _JD_DEGREE_RE.search(job_description):
+            has_degree = resume_facts['has_degree']
             filters["checks"].append({
                 "filter": "Degree Requirement",
                 "required": "Master's or PhD mentioned in JD",
@@ -242,11 +316,10 @@ class RealATSScorer:
                 filters["all_passed"] = False
         
         # Check 2: Years of experience
-        exp_match = re.search(r"(\d+)\+?\s*(?:years?|yrs?)", job_description, re.IGNORECASE)
+        exp_match = _YEARS_RE.search(job_description)
         if exp_match:
             required_years = int(exp_match.group(1))
-            resume_years = re.findall(r"(\d+)\+?\s*(?:years?|yrs?)", resume_text, re.IGNORECASE)
-            max_years = max([int(y) for y in resume_years], default=0)
+            max_years = resume_facts['max_years']
             
             passed = max_years >= required_years
             filters["checks"].append({
@@ -291,7 +364,6 @@ class RealATSScorer:
             # In real ATS, failing hard filters = auto-reject
             # We'll reduce score significantly but not zero
             final_score = final_score * 0.6  # 40% penalty
-            logger.warning(f"⚠️ Hard filters failed - applying 40% penalty")
         
         return round(final_score)
     
@@ -2,14 +2,26 @@
 Company Researcher Agent
 Researches companies and provides comprehensive interview preparation with Q&A
 """
-from typing import Dict, List
+import contextvars
+import json
+from typing import Dict, Iterator, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from ai_agents.base_agent import BaseAgent
+from ai_agents.company_knowledge import get_company_knowledge, store_company_knowledge
 from ai_agents.model_config import get_model_config
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
 
 
 class CompanyResearcher(BaseAgent):
     """Researches companies and generates comprehensive interview prep with Q&A"""
     
+    SECTIONS = ("company_info", "technical_qa", "behavioral_qa", "hr_qa")
+    
+    # Parts of company_info that don't depend on the job (shared per company)
+    COMPANY_LEVEL_FIELDS = ("overview", "recent_news", "culture", "questions_to_ask")
+    
     def __init__(self, preferred_provider: str = "openai"):
         config = get_model_config("CompanyResearcher")
         super().__init__(preferred_provider=config["provider"], model=config["model"])
@@ -28,22 +40,76 @@ class CompanyResearcher(BaseAgent):
         Returns:
             Dictionary with company insights, technical Q&A, behavioral Q&A, and HR Q&A
         """
-        # Generate all sections using GPT-5-mini
-        company_info = self._generate_company_info(company_name, job_title, job_description)
-        technical_qa = self._generate_technical_qa(company_name, job_title, job_description, resume_text)
-        behavioral_qa = self._generate_behavioral_qa(company_name, job_title, job_description)
-        hr_qa = self._generate_hr_qa(company_name, job_title, job_description)
+        # Sections are independent LLM calls, so generate them concurrently
+        results = dict(self.iter_sections(company_name, job_title, job_description, resume_text))
+        return {name: results[name] for name in self.SECTIONS}
+    
+    def iter_sections(self, company_name: str, job_title: str = None,
+                      job_description: str = None, resume_text: str = None) -> Iterator[Tuple[str, object]]:
+        """
+        Generate all interview prep sections concurrently
         
-        return {
-            "company_info": company_info,
-            "technical_qa": technical_qa,
-            "behavioral_qa": behavioral_qa,
-            "hr_qa": hr_qa
+        Sections are yielded as soon as they complete. A section that raises
+        is replaced by its default content so the others are kept.
+        
+        Args:
+            company_name: Name of company
+            job_title: Job title (optional)
+            job_description: Job description (optional)
+            resume_text: User's resume/CV text (optional)
+            
+        Yields:
+            (section name, section content) in completion order
+        """
+        sections = {
+            "company_info": (
+                lambda: self._generate_company_info(company_name, job_title, job_description),
+                lambda: self._get_default_company_info(company_name),
+            ),
+            "technical_qa": (
+                lambda: self._generate_technical_qa(company_name, job_title, job_description, resume_text),
+                lambda: self._get_default_technical_qa(job_title),
+            ),
+            "behavioral_qa": (
+                lambda: self._generate_behavioral_qa(company_name, job_title, job_description),
+                self._get_default_behavioral_qa,
+            ),
+            "hr_qa": (
+                lambda: self._generate_hr_qa(company_name, job_title, job_description),
+                self._get_default_hr_qa,
+            ),
         }
+        
+        with ThreadPoolExecutor(max_workers=len(sections), thread_name_prefix="research") as executor:
+            # Each worker runs in a copy of the caller's context (keeps refresh_cache() scope)
+            futures = {
+                executor.submit(contextvars.copy_context().run, generate): name
+                for name, (generate, _) in sections.items()
+            }
+            
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    yield name, future.result()
+                except Exception as e:
+                    logger.error(f"Error generating {name} for {company_name}: {e}")
+                    yield name, sections[name][1]()
     
     def _generate_company_info(self, company_name: str, job_title: str = None, 
                                job_description: str = None) -> Dict:
-        """Generate comprehensive company information with company-specific Q&A"""
+        """
+        Generate comprehensive company information with company-specific Q&A
+        
+        Overview, news, culture and questions to ask are cached per company;
+        when they are fresh only the role-specific company Q&A is generated.
+        """
+        cached = get_company_knowledge(company_name, "company_info")
+        if cached:
+            return {
+                **cached,
+                "company_qa": self._generate_company_qa(company_name, cached, job_title, job_description)
+            }
+        
         job_context = f"\nJob Title: {job_title}" if job_title else ""
         jd_context = f"\nJob Description: {job_description[:1000]}" if job_description else ""
         
@@ -119,12 +185,60 @@ Return ONLY valid JSON with this exact structure:
 Use current, real information about {company_name}. Be specific and accurate.
 """
         
-        response = self.generate(prompt, temperature=0.6, max_tokens=3000)
+        response = self.generate(prompt, temperature=0.6, max_tokens=3000,
+                                 validate=self.is_json_response)
         parsed = self.parse_json_response(response)
         
         if not parsed:
             return self._get_default_company_info(company_name)
         
+        store_company_knowledge(
+            company_name,
+            "company_info",
+            {field: parsed[field] for field in self.COMPANY_LEVEL_FIELDS if field in parsed}
+        )
+        
+        return parsed
+    
+    def _generate_company_qa(self, company_name: str, company_info: Dict, job_title: str = None,
+                             job_description: str = None) -> List[Dict]:
+        """Generate role-specific company Q&A from cached company research"""
+        job_context = f"\nJob Title: {job_title}" if job_title else ""
+        jd_context = f"\nJob Description: {job_description[:1000]}" if job_description else ""
+        research = json.dumps(
+            {field: company_info.get(field) for field in ("overview", "recent_news", "culture")},
+            ensure_ascii=False
+        )
+        
+        prompt = f"""
+Prepare company-specific interview questions and answers for this role at {company_name}.
+
+Company: {company_name}{job_context}{jd_context}
+
+Known company research:
+{research[:3000]}
+
+Return ONLY a valid JSON array with 5 questions:
+[
+    {{
+        "question": "Why do you want to work at {company_name}?",
+        "answer": "Personalized answer mentioning specific products, values, and recent achievements. 3-4 sentences.",
+        "talking_points": ["Point 1", "Point 2", "Point 3"],
+        "reference": "Mention specific news or company initiative"
+    }}
+]
+
+Cover: motivation for {company_name}, its products/services, contributing to its mission,
+current challenges it faces, and what excites the candidate about this specific role.
+"""
+        
+        response = self.generate(prompt, temperature=0.6, max_tokens=1500,
+                                 validate=self.is_json_response)
+        parsed = self.parse_json_response(response) if response else None
+        
+        if not parsed or not isinstance(parsed, list):
+            return self._get_default_company_info(company_name)["company_qa"]
+        
         return parsed
     
     def _generate_technical_qa(self, company_name: str, job_title: str = None, 
@@ -207,7 +321,8 @@ For RESUME PROJECT questions (CRITICAL):
 Make ALL answers detailed, practical, and demonstrate expertise. Focus on helping candidate explain their work impressively.
 """
         
-        response = self.generate(prompt, temperature=0.6, max_tokens=8000)
+        response = self.generate(prompt, temperature=0.6, max_tokens=8000,
+                                 validate=self.is_json_response)
         parsed = self.parse_json_response(response)
         
         if not parsed or not isinstance(parsed, list):
@@ -255,7 +370,8 @@ Include questions about:
 Make answers realistic, detailed, and impressive. Use specific examples with measurable results.
 """
         
-        response = self.generate(prompt, temperature=0.6, max_tokens=4000)
+        response = self.generate(prompt, temperature=0.6, max_tokens=4000,
+                                 validate=self.is_json_response)
         parsed = self.parse_json_response(response)
         
         if not parsed or not isinstance(parsed, list):
@@ -300,7 +416,8 @@ Include questions about:
 Provide honest but strategic answers that position the candidate positively.
 """
         
-        response = self.generate(prompt, temperature=0.6, max_tokens=3000)
+        response = self.generate(prompt, temperature=0.6, max_tokens=3000,
+                                 validate=self.is_json_response)
         parsed = self.parse_json_response(response)
         
         if not parsed or not isinstance(parsed, list):
@@ -416,7 +533,7 @@ Include:
 - 2 situational/problem-solving questions
 """
         
-        response = self.generate(prompt, temperature=0.6)
+        response = self.generate(prompt, temperature=0.6, validate=self.is_json_response)
         
         if not response:
             return self._get_default_questions()
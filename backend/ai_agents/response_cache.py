@@ -0,0 +1,340 @@
+"""
+Content-addressed LLM response cache
+Identical requests (provider, model, temperature, max_tokens, prompt) are
+answered from a local store instead of a paid API call
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from config import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Set while regenerating content: skip cache reads, but store the fresh responses
+_refresh: ContextVar[bool] = ContextVar("llm_cache_refresh", default=False)
+
+
+@contextmanager
+def refresh_cache():
+    """Force fresh LLM calls inside the block (results still replace cached ones)"""
+    token = _refresh.set(True)
+    try:
+        yield
+    finally:
+        _refresh.reset(token)
+
+
+def is_refreshing() -> bool:
+    """Whether the current context is inside refresh_cache()"""
+    return _refresh.get()
+
+
+def make_cache_key(provider: str, model: str, temperature: float,
+                   max_tokens: int, prompt: str) -> str:
+    """
+    Build the content address of an LLM request
+
+    Args:
+        provider: Provider name (deepseek, openai, ...)
+        model: Model name actually sent to the provider
+        temperature: Sampling temperature
+        max_tokens: Maximum tokens in response
+        prompt: Full prompt text
+
+    Returns:
+        SHA-256 hex digest
+    """
+    payload = json.dumps(
+        [provider, model, round(float(temperature), 4), int(max_tokens), prompt],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CacheBackend(ABC):
+    """Storage interface for the response cache"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored response, or None if missing/expired"""
+
+    @abstractmethod
+    def set(self, key: str, value: str, provider: str = "", model: str = ""):
+        """Store a response"""
+
+    @abstractmethod
+    def clear(self) -> int:
+        """Remove all entries, returning the number removed"""
+
+    @abstractmethod
+    def size(self) -> int:
+        """Number of stored entries"""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU cache (lost on restart)"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if self.ttl_seconds and time.time() - created_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, provider: str = "", model: str = ""):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while self.max_entries and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Persistent cache in a local SQLite file
+
+    Entries older than the TTL are ignored and purged; once the cache grows
+    past max_entries the least recently used entries are evicted.
+    """
+
+    EVICT_EVERY = 50
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                provider TEXT,
+                model TEXT,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_llm_responses_last_used ON llm_responses (last_used_at)"
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute(
+                "UPDATE llm_responses SET last_used_at = ? WHERE key = ?", (now, key)
+            )
+            return response
+
+    def set(self, key: str, value: str, provider: str = "", model: str = ""):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO llm_responses (key, provider, model, response, created_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    response = excluded.response,
+                    created_at = excluded.created_at,
+                    last_used_at = excluded.last_used_at
+                """,
+                (key, provider, model, value, now, now),
+            )
+            self._writes += 1
+            # Evicting on every write would cost a COUNT(*) per call, so the
+            # size limit is enforced every EVICT_EVERY writes
+            if self._writes % self.EVICT_EVERY == 1:
+                self._evict(now)
+
+    def _evict(self, now: float):
+        """Drop expired entries, then the least recently used beyond max_entries"""
+        if self.ttl_seconds:
+            self._conn.execute(
+                "DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+        if self.max_entries:
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    """
+                    DELETE FROM llm_responses WHERE key IN (
+                        SELECT key FROM llm_responses ORDER BY last_used_at ASC LIMIT ?
+                    )
+                    """,
+                    (overflow,),
+                )
+
+    def clear(self) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM llm_responses").rowcount
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+
+class ResponseCache:
+    """Response cache with hit/miss accounting on top of a storage backend"""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def get(self, *keys: str) -> Optional[str]:
+        """
+        Look up a response; counts one hit or one miss
+
+        Args:
+            *keys: Cache keys in order of preference (e.g. one per provider)
+
+        Returns:
+            First cached response found, or None
+        """
+        if _refresh.get():
+            return None
+
+        value = None
+        for key in keys:
+            try:
+                value = self.backend.get(key)
+            except Exception as e:
+                logger.error(f"LLM cache read failed: {e}")
+                with self._lock:
+                    self.errors += 1
+            if value is not None:
+                break
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str, provider: str = "", model: str = ""):
+        """Store a response (failures are logged, never raised)"""
+        if not value:
+            return
+        try:
+            self.backend.set(key, value, provider, model)
+        except Exception as e:
+            logger.error(f"LLM cache write failed: {e}")
+            with self._lock:
+                self.errors += 1
+
+    def clear(self) -> int:
+        """Remove all cached responses and reset counters"""
+        removed = self.backend.clear()
+        with self._lock:
+            self.hits = self.misses = self.errors = 0
+        return removed
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            hits, misses, errors = self.hits, self.misses, self.errors
+        total = hits + misses
+        try:
+            entries = self.backend.size()
+        except Exception:
+            entries = None
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": hits,
+            "misses": misses,
+            "errors": errors,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+            "entries": entries,
+        }
+
+
+_cache_instance: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def _create_backend() -> CacheBackend:
+    ttl_seconds = settings.llm_cache_ttl_hours * 3600
+    if settings.llm_cache_backend == "memory":
+        return MemoryCacheBackend(ttl_seconds, settings.llm_cache_max_entries)
+    return SQLiteCacheBackend(settings.llm_cache_path, ttl_seconds, settings.llm_cache_max_entries)
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get singleton response cache (None when caching is disabled)"""
+    global _cache_instance
+    if not settings.llm_cache_enabled:
+        return None
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                try:
+                    _cache_instance = ResponseCache(_create_backend())
+                except Exception as e:
+                    logger.error(f"Failed to initialize LLM cache, using memory backend: {e}")
+                    _cache_instance = ResponseCache(MemoryCacheBackend(
+                        settings.llm_cache_ttl_hours * 3600, settings.llm_cache_max_entries
+                    ))
+    return _cache_instance
+
+
+def set_response_cache_backend(backend: CacheBackend) -> ResponseCache:
+    """Replace the cache backend (e.g. with a Redis-backed implementation)"""
+    global _cache_instance
+    with _cache_lock:
+        _cache_instance = ResponseCache(backend)
+    return _cache_instance
@@ -107,7 +107,7 @@ Extract:
 Extract ALL companies, roles, and quantified achievements. Include specific metrics (%, numbers, time saved, etc.).
 """
         
-        response = self.generate(prompt, temperature=0.3)
+        response = self.generate(prompt, temperature=0.3, validate=self.is_json_response)
         
         if not response:
             logger.error("❌ Failed to extract CV structure")
@@ -172,7 +172,7 @@ REQUIREMENTS:
 5. Balance qualifications with achievements
 """
         
-        response = self.generate(prompt, temperature=0.4)
+        response = self.generate(prompt, temperature=0.4, validate=self.is_json_response)
         
         if not response:
             logger.error("❌ Failed to generate summary")
@@ -255,7 +255,7 @@ CRITICAL RULES:
 6. Use action verbs: Implemented, Developed, Optimized, Led
 """
         
-        response = self.generate(prompt, temperature=0.4)
+        response = self.generate(prompt, temperature=0.4, validate=self.is_json_response)
         
         if not response:
             logger.error("❌ Failed to generate experience bullets")
@@ -314,7 +314,7 @@ Focus on:
 4. Skills candidate likely has but didn't list
 """
         
-        response = self.generate(prompt, temperature=0.3)
+        response = self.generate(prompt, temperature=0.3, validate=self.is_json_response)
         
         if not response:
             logger.error("❌ Failed to generate skills suggestions")
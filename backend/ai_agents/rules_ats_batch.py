@@ -0,0 +1,235 @@
+"""
+Batch rules-based ATS scoring
+Scores the resume against every active job with RealATSScorer (no AI) and
+stores the result as JobAnalysis.rules_ats_score, so the whole job inventory
+can be sorted and filtered by it
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import time
+from sqlalchemy.orm import Session
+from ai_agents.real_ats_scorer import RealATSScorer
+from config import settings
+from models.job import Job, JobAnalysis, ParsedJobDescription
+from models.user import UserProfile
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# IN (...) lists are kept below SQLite's bound parameter limit
+QUERY_BATCH_SIZE = 500
+
+# Stats of the most recent batch run (see last_rules_ats_stats)
+_last_stats: Dict = {}
+
+
+def _score_chunk(resume_text: str, jobs: List[Tuple[int, str, Optional[Dict]]]) -> Dict[int, float]:
+    """
+    Score a chunk of jobs (process pool worker)
+
+    Args:
+        resume_text: Resume text
+        jobs: (job_id, description, AI-extracted ATS keywords or None) tuples
+
+    Returns:
+        Dict mapping job_id to rules-based ATS score
+    """
+    results = RealATSScorer().score_many(
+        resume_text,
+        [description for _, description, _ in jobs],
+        [keywords for _, _, keywords in jobs]
+    )
+    return {job[0]: result['ats_score'] for job, result in zip(jobs, results)}
+
+
+class RulesATSBatch:
+    """
+    Rules-based ATS score for every active job
+
+    Jobs are scored in chunks (in worker processes when configured). Within a
+    chunk the resume is scanned once for the keywords of all its jobs and
+    the resume-side checks are computed once, so a full re-run after a
+    resume update only costs one pass per chunk plus the per-JD checks.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize the batch scorer
+
+        Args:
+            db: Database session
+        """
+        self.db = db
+
+    def run(self, job_ids: Optional[List[int]] = None,
+            processes: Optional[int] = None,
+            chunk_size: Optional[int] = None) -> Dict:
+        """
+        Score active jobs and store their rules_ats_score
+
+        Args:
+            job_ids: Restrict scoring to these jobs (default: all active jobs)
+            processes: Worker processes (default: settings.rules_ats_processes, 0/1 = in-process)
+            chunk_size: Jobs per chunk (default: settings.rules_ats_chunk_size)
+
+        Returns:
+            Dictionary with job counts, per-step timings and elapsed time
+        """
+        processes = settings.rules_ats_processes if processes is None else processes
+        chunk_size = chunk_size or settings.rules_ats_chunk_size
+
+        started_at = time.perf_counter()
+        stats = {
+            'jobs': 0,
+            'scored': 0,
+            'with_ai_keywords': 0,
+            'created': 0,
+            'updated': 0,
+            'chunks': 0,
+            'processes': processes,
+            'seconds': {},
+            'elapsed_seconds': 0.0,
+        }
+
+        user = self.db.query(UserProfile).filter(UserProfile.id == 1).first()
+        if not user or not user.resume_text:
+            logger.error("User profile or resume not found")
+            stats['error'] = "No resume found"
+            return stats
+        resume_text = user.resume_text
+
+        # Load jobs and their memoized AI keyword extraction
+        step_started = time.perf_counter()
+        query = self.db.query(Job.id, Job.description)\
+            .filter(Job.is_active == True)\
+            .filter(Job.description != None)
+        if job_ids:
+            query = query.filter(Job.id.in_(job_ids))
+        jobs = [(job_id, description) for job_id, description in query if description.strip()]
+
+        hashes = {job_id: ParsedJobDescription.hash_description(description) for job_id, description in jobs}
+        ai_keywords = self._memoized_keywords(set(hashes.values()))
+        items = [(job_id, description, ai_keywords.get(hashes[job_id])) for job_id, description in jobs]
+
+        stats['jobs'] = len(items)
+        stats['with_ai_keywords'] = sum(1 for item in items if item[2])
+        stats['seconds']['load'] = round(time.perf_counter() - step_started, 2)
+        logger.info(f"📐 Rules-based ATS batch: {len(items)} active jobs "
+                    f"({stats['with_ai_keywords']} with AI-extracted keywords)")
+
+        # Score in chunks
+        step_started = time.perf_counter()
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        stats['chunks'] = len(chunks)
+        scores = self._score_chunks(resume_text, chunks, processes)
+        stats['scored'] = len(scores)
+        stats['seconds']['score'] = round(time.perf_counter() - step_started, 2)
+
+        # Store
+        step_started = time.perf_counter()
+        stats['created'], stats['updated'] = self._store_scores(scores)
+        stats['seconds']['store'] = round(time.perf_counter() - step_started, 2)
+
+        stats['elapsed_seconds'] = round(time.perf_counter() - started_at, 2)
+
+        _last_stats.clear()
+        _last_stats.update(stats)
+
+        logger.info(f"✅ Rules-based ATS batch: {stats['scored']} jobs scored in {stats['elapsed_seconds']}s "
+                    f"({stats['updated']} updated, {stats['created']} new analyses)")
+
+        return stats
+
+    def _memoized_keywords(self, description_hashes: set) -> Dict[str, Dict]:
+        """AI-extracted ATS keywords by description hash (see ai_agents/jd_cache.py)"""
+        keywords = {}
+        hashes = list(description_hashes)
+
+        try:
+            for i in range(0, len(hashes), QUERY_BATCH_SIZE):
+                parsed_jds = self.db.query(ParsedJobDescription).filter(
+                    ParsedJobDescription.kind == "ats_keywords",
+                    ParsedJobDescription.description_hash.in_(hashes[i:i + QUERY_BATCH_SIZE])
+                )
+                for parsed in parsed_jds:
+                    data = parsed.get_data()
+                    if data:
+                        keywords[parsed.description_hash] = data
+        except Exception as e:
+            logger.error(f"Error loading memoized ATS keywords: {e}")
+
+        return keywords
+
+    def _score_chunks(self, resume_text: str, chunks: List[List[Tuple]], processes: int) -> Dict[int, float]:
+        """Score all chunks, in a process pool when processes > 1"""
+        scores = {}
+
+        if processes and processes > 1 and len(chunks) > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=min(processes, len(chunks))) as executor:
+                    for chunk_scores in executor.map(_score_chunk, [resume_text] * len(chunks), chunks):
+                        scores.update(chunk_scores)
+                return scores
+            except Exception as e:
+                logger.error(f"Process pool rules-based scoring failed, scoring in-process: {e}")
+                scores = {}
+
+        for chunk in chunks:
+            try:
+                scores.update(_score_chunk(resume_text, chunk))
+            except Exception as e:
+                logger.error(f"Error in rules-based scoring of {len(chunk)} jobs: {e}")
+
+        return scores
+
+    def _store_scores(self, scores: Dict[int, float]) -> Tuple[int, int]:
+        """
+        Save rules_ats_score (creating lightweight analyses for unanalyzed jobs)
+
+        Returns:
+            (created, updated) analysis counts
+        """
+        job_ids = list(scores)
+
+        try:
+            existing = {}
+            for i in range(0, len(job_ids), QUERY_BATCH_SIZE):
+                rows = self.db.query(JobAnalysis.id, JobAnalysis.job_id)\
+                    .filter(JobAnalysis.job_id.in_(job_ids[i:i + QUERY_BATCH_SIZE]))
+                existing.update({job_id: analysis_id for analysis_id, job_id in rows})
+
+            self.db.bulk_update_mappings(JobAnalysis, [
+                {'id': analysis_id, 'rules_ats_score': scores[job_id]}
+                for job_id, analysis_id in existing.items()
+            ])
+
+            # Match/ATS scores stay 0 (unscored) until the quick match and
+            # the full analysis run
+            now = datetime.now()
+            new_analyses = [
+                {
+                    'job_id': job_id,
+                    'rules_ats_score': score,
+                    'match_score': 0,
+                    'ats_score': 0,
+                    'matching_skills': "[]",
+                    'missing_skills': "[]",
+                    'recommendations': "{}",
+                    'analyzed_at': now,
+                }
+                for job_id, score in scores.items() if job_id not in existing
+            ]
+            self.db.bulk_insert_mappings(JobAnalysis, new_analyses)
+
+            self.db.commit()
+            return len(new_analyses), len(existing)
+        except Exception as e:
+            logger.error(f"Error saving rules-based ATS scores: {e}")
+            self.db.rollback()
+            return 0, 0
+
+
+def last_rules_ats_stats() -> Dict:
+    """Stats of the most recent rules-based ATS batch in this process"""
+    return dict(_last_stats)
@@ -0,0 +1,251 @@
+"""
+Tiered scoring funnel
+Every candidate job is scored locally (QuickMatcher), the best slice is
+re-ranked by the rules-based RealATSScorer and only the top-K jobs go to
+the full LLM analysis, so LLM budget is spent where it changes decisions
+"""
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import time
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from ai_agents.quick_matcher import QuickMatcher
+from ai_agents.real_ats_scorer import RealATSScorer
+from config import settings
+from database import SessionLocal
+from models.job import Job, JobAnalysis
+from models.user import UserProfile
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Stats of the most recent funnel run (see last_funnel_stats)
+_last_stats: Dict = {}
+
+
+class ScoringFunnel:
+    """
+    Quick match -> rules-based ATS -> LLM analysis
+
+    Candidates are active jobs without a full (LLM) analysis yet. Each stage
+    only passes on the jobs that clear its threshold, ranked best first.
+    """
+
+    def __init__(self, db: Session, db_factory: Callable[[], Session] = SessionLocal,
+                 ats_policy: str = "full", speculative_ats: bool = False):
+        """
+        Initialize the funnel
+
+        Args:
+            db: Database session
+            db_factory: Session factory handed to the AgentManager batch workers
+            ats_policy: Multi-layer ATS Layer 3 policy for the LLM stage
+            speculative_ats: Run ATS Layer 2 in parallel with Layer 1 in the LLM stage
+        """
+        self.db = db
+        self.db_factory = db_factory
+        self.ats_policy = ats_policy
+        self.speculative_ats = speculative_ats
+        self.agent_manager = None
+        self.quick_matcher = QuickMatcher()
+        self.rules_scorer = RealATSScorer()
+
+    def run(self, job_ids: Optional[List[int]] = None,
+            quick_threshold: Optional[float] = None,
+            rules_slice: Optional[int] = None,
+            rules_threshold: Optional[float] = None,
+            llm_top_k: Optional[int] = None,
+            max_candidates: Optional[int] = None,
+            generate_materials: bool = True) -> Dict:
+        """
+        Run the funnel once
+
+        Every threshold defaults to its funnel_* setting.
+
+        Args:
+            job_ids: Restrict candidates to these jobs (default: all candidates)
+            quick_threshold: Minimum quick match score (0-100)
+            rules_slice: How many of the best quick matches get rules-based scoring
+            rules_threshold: Minimum rules-based ATS score (0-100)
+            llm_top_k: How many of the best rules-based scores get the LLM analysis
+            max_candidates: Maximum candidate jobs per run
+            generate_materials: Generate tailored resume/cover letter in the LLM stage
+
+        Returns:
+            Dictionary with per-stage input/passed/pruned counts, the jobs
+            selected for LLM analysis and the LLM batch results
+        """
+        quick_threshold = settings.funnel_quick_threshold if quick_threshold is None else quick_threshold
+        rules_slice = settings.funnel_rules_slice if rules_slice is None else rules_slice
+        rules_threshold = settings.funnel_rules_threshold if rules_threshold is None else rules_threshold
+        llm_top_k = settings.funnel_llm_top_k if llm_top_k is None else llm_top_k
+        max_candidates = settings.funnel_max_candidates if max_candidates is None else max_candidates
+
+        started_at = time.perf_counter()
+        stats = {
+            'candidates': 0,
+            'stages': {},
+            'selected': [],
+            'llm_batch': None,
+            'elapsed_seconds': 0.0,
+        }
+
+        user = self.db.query(UserProfile).filter(UserProfile.id == 1).first()
+        if not user or not user.resume_text:
+            logger.error("User profile or resume not found")
+            stats['error'] = "No resume found"
+            return stats
+        resume_text = user.resume_text
+
+        candidates = self._candidates(job_ids, max_candidates)
+        stats['candidates'] = len(candidates)
+        logger.info(f"🔻 Scoring funnel: {len(candidates)} candidate jobs")
+
+        # Stage 1: local quick match for every candidate
+        stage_started = time.perf_counter()
+        quick_scores = self.quick_matcher.batch_calculate(resume_text, [
+            {'id': job.id, 'description': job.description, 'title': job.title}
+            for job in candidates
+        ], processes=settings.quick_match_processes)
+        self._store_quick_scores(candidates, quick_scores)
+
+        jobs_by_id = {job.id: job for job in candidates}
+        quick_passed = sorted(
+            (job_id for job_id, score in quick_scores.items() if score >= quick_threshold),
+            key=lambda job_id: quick_scores[job_id],
+            reverse=True
+        )
+        stats['stages']['quick_match'] = self._stage_stats(
+            len(candidates), len(quick_passed), stage_started, threshold=quick_threshold
+        )
+
+        # Stage 2: rules-based ATS re-ranking of the best slice
+        stage_started = time.perf_counter()
+        rules_input = quick_passed[:rules_slice]
+        rules_scores = {}
+        for job_id in rules_input:
+            try:
+                result = self.rules_scorer.score(resume_text, jobs_by_id[job_id].description or "")
+                rules_scores[job_id] = result['ats_score']
+            except Exception as e:
+                logger.error(f"Error in rules-based scoring for job {job_id}: {e}")
+
+        rules_passed = sorted(
+            (job_id for job_id, score in rules_scores.items() if score >= rules_threshold),
+            key=lambda job_id: (rules_scores[job_id], quick_scores[job_id]),
+            reverse=True
+        )
+        stats['stages']['rules_ats'] = self._stage_stats(
+            len(quick_passed), len(rules_passed), stage_started,
+            threshold=rules_threshold, slice=rules_slice,
+            not_scored=len(quick_passed) - len(rules_input)
+        )
+
+        # Stage 3: full LLM analysis of the top-K only
+        stage_started = time.perf_counter()
+        selected = rules_passed[:llm_top_k]
+        stats['selected'] = [
+            {
+                'job_id': job_id,
+                'title': jobs_by_id[job_id].title,
+                'company': jobs_by_id[job_id].company,
+                'quick_score': round(quick_scores[job_id], 1),
+                'rules_score': rules_scores[job_id],
+            }
+            for job_id in selected
+        ]
+
+        if selected:
+            stats['llm_batch'] = self._get_agent_manager().batch_analyze(
+                selected, generate_materials=generate_materials
+            )
+        stats['stages']['llm_analysis'] = self._stage_stats(
+            len(rules_passed), len(selected), stage_started, top_k=llm_top_k
+        )
+
+        stats['elapsed_seconds'] = round(time.perf_counter() - started_at, 1)
+
+        _last_stats.clear()
+        _last_stats.update(stats)
+
+        pruned = ", ".join(f"{name} -{stage['pruned']}" for name, stage in stats['stages'].items())
+        logger.info(f"✅ Scoring funnel: {len(candidates)} jobs -> {len(selected)} LLM analyses "
+                    f"({pruned}) in {stats['elapsed_seconds']}s")
+
+        return stats
+
+    def _candidates(self, job_ids: Optional[List[int]], max_candidates: int) -> List[Job]:
+        """Active jobs that have no full (LLM) analysis yet"""
+        query = self.db.query(Job)\
+            .outerjoin(JobAnalysis)\
+            .filter(Job.is_active == True)\
+            .filter(or_(
+                JobAnalysis.id == None,
+                JobAnalysis.ats_score == None,
+                JobAnalysis.ats_score == 0
+            ))
+
+        if job_ids:
+            query = query.filter(Job.id.in_(job_ids))
+
+        return query.order_by(Job.posted_date.desc()).limit(max_candidates).all()
+
+    def _store_quick_scores(self, jobs: List[Job], scores: Dict[int, float]):
+        """Save quick match scores (creating lightweight analyses for new jobs)"""
+        job_ids = [job.id for job in jobs if job.id in scores]
+        if not job_ids:
+            return
+
+        try:
+            existing = {
+                analysis.job_id: analysis
+                for analysis in self.db.query(JobAnalysis).filter(JobAnalysis.job_id.in_(job_ids))
+            }
+
+            for job_id in job_ids:
+                analysis = existing.get(job_id)
+                if analysis:
+                    analysis.match_score = scores[job_id]
+                else:
+                    # ATS score stays 0 until the job gets a full analysis
+                    self.db.add(JobAnalysis(
+                        job_id=job_id,
+                        match_score=scores[job_id],
+                        ats_score=0,
+                        matching_skills="[]",
+                        missing_skills="[]",
+                        recommendations="{}",
+                        analyzed_at=datetime.now()
+                    ))
+
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"Error saving quick match scores: {e}")
+            self.db.rollback()
+
+    def _get_agent_manager(self):
+        """AgentManager for the LLM stage (agents are only set up when needed)"""
+        if self.agent_manager is None:
+            from ai_agents.agent_manager import AgentManager
+            self.agent_manager = AgentManager(
+                self.db,
+                db_factory=self.db_factory,
+                ats_policy=self.ats_policy,
+                speculative_ats=self.speculative_ats
+            )
+        return self.agent_manager
+
+    @staticmethod
+    def _stage_stats(input_count: int, passed: int, started_at: float, **details) -> Dict:
+        return {
+            'input': input_count,
+            'passed': passed,
+            'pruned': input_count - passed,
+            **details,
+            'seconds': round(time.perf_counter() - started_at, 2),
+        }
+
+
+def last_funnel_stats() -> Dict:
+    """Stats of the most recent funnel run in this process"""
+    return dict(_last_stats)
@@ -14,6 +14,8 @@ from routers import jobs, applications, analysis, scrapers, user, analytics, dev
 from routers import seed_real_jobs
 from utils.logger import setup_logger
 from utils.scheduler import setup_scheduler
+from scrapers.http_client import close_async_clients
+from ai_agents.llm_clients import close_async_clients as close_llm_clients
 
 logger = setup_logger(__name__)
 
@@ -53,6 +55,9 @@ async def lifespan(app: FastAPI):
         scheduler.stop()
         logger.info("✅ Scheduler stopped")
     
+    await close_async_clients()
+    await close_llm_clients()
+    
     logger.info("✅ Shutdown complete")
 
 
@@ -3,7 +3,7 @@ Configuration management for SmartJobHunter Pro
 Loads settings from environment variables
 """
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -25,12 +25,100 @@ class Settings(BaseSettings):
     deepseek_api_key: Optional[str] = None
     rovodev_api_key: Optional[str] = None
     
+    # LLM response cache (identical prompts are answered without an API call)
+    llm_cache_enabled: bool = True
+    llm_cache_backend: str = "sqlite"  # sqlite or memory
+    llm_cache_path: str = "data/llm_cache.db"
+    llm_cache_ttl_hours: int = 168  # Responses older than this are refetched
+    llm_cache_max_entries: int = 20000  # Least recently used entries evicted beyond this
+    
+    # LLM provider quotas, shared by all agents. Keys are "provider" or
+    # "provider:model" (model-specific entries win)
+    llm_requests_per_minute: Dict[str, int] = {
+        "deepseek": 120,
+        "openai": 500,
+        "gemini": 15,
+        "claude": 50,
+        "perplexity": 50,
+    }
+    llm_default_requests_per_minute: int = 60
+    llm_tokens_per_minute: Dict[str, int] = {
+        "deepseek": 1000000,
+        "openai": 200000,
+        "gemini": 1000000,
+        "claude": 40000,
+        "perplexity": 100000,
+    }
+    llm_default_tokens_per_minute: int = 100000
+    llm_max_concurrency: Dict[str, int] = {"gemini": 4, "claude": 4}
+    llm_default_max_concurrency: int = 8  # Upper bound for adaptive concurrency
+    llm_concurrency_increase_after: int = 10  # Successes before concurrency grows by one
+    llm_backoff_base_seconds: float = 2.0  # First pause after a 429 without retry-after
+    llm_backoff_max_seconds: float = 60.0
+    llm_limiter_max_wait: float = 30.0  # Fall back to the next provider after waiting this long
+    
+    # LLM provider health (circuit breaker, latency routing, hedging)
+    llm_circuit_failure_threshold: int = 3  # Consecutive failures that open the circuit
+    llm_circuit_error_rate: float = 0.5  # Error-rate EWMA that opens the circuit
+    llm_circuit_cooldown_seconds: float = 60.0  # Skip an open provider this long before probing
+    llm_latency_ewma_alpha: float = 0.2
+    llm_hedging_enabled: bool = True  # Send a backup request when a provider exceeds its p95
+    llm_hedge_min_samples: int = 20  # Latency samples (same provider+model, at least the request's max_tokens) before hedging
+    llm_hedge_min_delay_seconds: float = 2.0
+    
     # Scraping Configuration
     user_agent: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
     scrape_delay_min: int = 2
     scrape_delay_max: int = 5
     max_jobs_per_source: int = 500
     max_total_jobs: int = 5000  # Maximum jobs to store in database
+    scrape_concurrent: bool = True  # Scrape all sources in parallel
+    scrape_max_workers: int = 6  # Max sources scraped at the same time
+    scrape_source_timeout: int = 300  # Per-source timeout (seconds) in concurrent mode
+    scrape_incremental: bool = True  # Only fetch jobs posted since the last run
+    scrape_full_refresh_hours: int = 24  # Force a full scrape this often per search
+    scrape_seen_ids_limit: int = 2000  # Seen job IDs kept per watermark
+    
+    # Deduplication
+    dedup_incremental: bool = True  # After scraping, only check newly inserted jobs
+    dedup_full_sweep_hours: int = 24  # Full deduplication sweep interval (0 = never)
+    
+    # Shared HTTP client (connection pooling / keep-alive)
+    http_timeout: float = 30.0
+    http_max_connections: int = 100  # Total pooled connections
+    http_max_connections_per_host: int = 8  # Concurrent requests per host (sync pool and async limit)
+    http_max_hosts: int = 20  # Hosts kept in the blocking session pool
+    http_keepalive_expiry: float = 30.0  # Seconds an idle connection stays open
+    
+    # Arbeitsagentur API pacing
+    arbeitsagentur_requests_per_second: float = 2.0
+    arbeitsagentur_burst: int = 4
+    arbeitsagentur_page_workers: int = 4  # Parallel page fetches
+    arbeitsagentur_enrich_details: bool = True  # Fetch full details for new jobs
+    arbeitsagentur_detail_workers: int = 8  # Parallel detail fetches
+    arbeitsagentur_details_cache_ttl_hours: int = 24
+    arbeitsagentur_details_cache_max_entries: int = 5000  # Least recently used details evicted beyond this
+    
+    # AI analysis
+    analysis_concurrent: bool = True  # Run independent analysis stages in parallel
+    analysis_batch_concurrency: int = 4  # Jobs analyzed at the same time in batch_analyze
+    company_research_ttl_hours: int = 336  # Reuse company-level research for 14 days
+    ats_agreement_threshold: int = 5  # Layer 1/2 score gap that lets Layer 3 be skipped or deferred
+    scheduled_ats_policy: str = "defer"  # Layer 3 policy for scheduled analysis: full, skip or defer
+    scheduled_ats_speculative: bool = True  # Run Layer 2 alongside Layer 1 in scheduled analysis
+    
+    # Scoring funnel (scheduled analysis): QuickMatcher -> RealATSScorer -> LLM analysis
+    funnel_quick_threshold: float = 60.0  # Minimum quick match score
+    funnel_rules_slice: int = 100  # Best quick matches re-ranked by the rules-based scorer
+    funnel_rules_threshold: float = 50.0  # Minimum rules-based ATS score
+    funnel_llm_top_k: int = 20  # Jobs per run sent to the full LLM analysis
+    funnel_max_candidates: int = 2000  # Candidate jobs considered per run
+    quick_match_processes: int = 0  # Worker processes for large quick match batches (0 = in-process)
+    
+    # Rules-based ATS batch (RealATSScorer against every active job, no AI)
+    rules_ats_processes: int = 0  # Worker processes (0/1 = in-process)
+    rules_ats_chunk_size: int = 250  # Jobs per chunk (resume is scanned once per chunk)
+    rules_ats_on_resume_upload: bool = True  # Re-score all jobs after a resume upload
     
     # Scheduler
     scrape_interval_hours: int = 2  # Auto-scrape every 2 hours
@@ -2,7 +2,7 @@
 Database setup and session management
 SQLAlchemy configuration with SQLite (easy PostgreSQL migration)
 """
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import settings
@@ -46,9 +46,40 @@ def init_db():
     """Initialize database - create all tables"""
     from models import job, application, user, company, scraping_log, manual_prep
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
     print("✅ Database initialized successfully!")
 
 
+def add_missing_columns():
+    """
+    Add columns that were added to a model after its table was created
+    
+    create_all() only creates missing tables, so new (nullable) columns on
+    existing tables are added here with ALTER TABLE, together with their indexes.
+    """
+    inspector = inspect(engine)
+    
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            added = set()
+            
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                added.add(column.name)
+                print(f"✅ Added column {table.name}.{column.name}")
+            
+            for index in table.indexes:
+                if any(column.name in added for column in index.columns):
+                    index.create(conn, checkfirst=True)
+
+
 def drop_all():
     """Drop all tables - use with caution!"""
     Base.metadata.drop_all(bind=engine)
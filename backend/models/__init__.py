@@ -1,21 +1,24 @@
 """
 Database models package
 """
-from models.job import Job, JobAnalysis
+from models.job import Job, JobAnalysis, ParsedJobDescription
 from models.application import Application
 from models.user import UserProfile, ResumeVersion, CoverLetterTemplate
-from models.company import Company
-from models.scraping_log import ScrapingLog
+from models.company import Company, CompanyResearch
+from models.scraping_log import ScrapingLog, ScrapeWatermark
 from models.manual_prep import ManualPrep
 
 __all__ = [
     "Job",
     "JobAnalysis",
+    "ParsedJobDescription",
     "Application",
     "UserProfile",
     "ResumeVersion",
     "CoverLetterTemplate",
     "Company",
+    "CompanyResearch",
     "ScrapingLog",
+    "ScrapeWatermark",
     "ManualPrep",
 ]
@@ -1,11 +1,36 @@
 """
 Company model - tracks companies for career page scraping
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, Index
+import json
+import re
+from datetime import datetime, timedelta
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from database import Base
 
 
+_NON_WORD_RE = re.compile(r"[^\w]+")
+
+# Legal forms ignored when comparing company names
+COMPANY_LEGAL_FORMS = {
+    "gmbh", "mbh", "ag", "se", "kg", "kgaa", "co", "ug", "ohg", "ev", "e", "v",
+    "inc", "ltd", "llc", "plc", "corp", "corporation", "company", "group", "holding",
+    "the", "und", "and",
+}
+
+
+def normalize_company_name(name: str) -> str:
+    """
+    Normalize a company name for matching
+    
+    Lowercases, drops punctuation and legal forms: "SAP SE" -> "sap",
+    "Siemens Healthineers AG" -> "siemens healthineers".
+    """
+    company = _NON_WORD_RE.sub(" ", (name or "").lower())
+    tokens = [t for t in company.split() if t not in COMPANY_LEGAL_FORMS]
+    return " ".join(tokens) if tokens else company.strip()
+
+
 class Company(Base):
     """Company database for career page scraping"""
     __tablename__ = "companies"
@@ -51,3 +76,49 @@ class Company(Base):
 # Create indexes
 Index('idx_companies_name', Company.name)
 Index('idx_companies_industry', Company.industry)
+
+
+class CompanyResearch(Base):
+    """
+    Company-level AI research shared by all jobs of a company
+    
+    One row per (normalized company name, kind); kind identifies the agent
+    schema (e.g. "company_info" from CompanyResearcher, "manual_prep" from
+    ManualPrepAgent).
+    """
+    __tablename__ = "company_research"
+    __table_args__ = (UniqueConstraint('company_key', 'kind', name='uq_company_research_kind'),)
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    company_key = Column(String, nullable=False, index=True)  # normalize_company_name()
+    company_name = Column(String, nullable=False)  # Name as first researched
+    kind = Column(String, nullable=False)
+    data = Column(Text, nullable=False)  # JSON
+    generated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<CompanyResearch(company_key='{self.company_key}', kind='{self.kind}')>"
+    
+    def get_data(self) -> dict:
+        """Stored research, or {} if unreadable"""
+        try:
+            return json.loads(self.data) if self.data else {}
+        except (json.JSONDecodeError, TypeError):
+            return {}
+    
+    def is_fresh(self, ttl_hours: float) -> bool:
+        """Whether the research is younger than ttl_hours"""
+        if not self.generated_at:
+            return False
+        return datetime.utcnow() - self.generated_at < timedelta(hours=ttl_hours)
+    
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            "id": self.id,
+            "company_key": self.company_key,
+            "company_name": self.company_name,
+            "kind": self.kind,
+            "data": self.get_data(),
+            "generated_at": self.generated_at.isoformat() if self.generated_at else None,
+        }
@@ -2,7 +2,11 @@
 Job and JobAnalysis models
 Core tables for storing scraped jobs and AI analysis results
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, Index
+import hashlib
+import json
+import re
+import unicodedata
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -29,6 +33,8 @@ class Job(Base):
     benefits = Column(Text)
     url = Column(String, nullable=False, unique=True, index=True)
     source = Column(String, nullable=False, index=True)  # LinkedIn, BMW Careers, Kimeta, etc.
+    external_id = Column(String, index=True)  # Source-specific ID (e.g. Arbeitsagentur refnr)
+    details_fetched_at = Column(DateTime)  # When full details were fetched from the source
     is_active = Column(Boolean, default=True, index=True)
     is_duplicate = Column(Boolean, default=False)
     duplicate_of = Column(Integer, ForeignKey('jobs.id'))
@@ -95,6 +101,7 @@ class Job(Base):
             "benefits": self.benefits,
             "url": self.url,
             "source": self.source,
+            "external_id": self.external_id,
             "is_active": self.is_active,
             "is_duplicate": self.is_duplicate,
             "duplicate_of": self.duplicate_of,
@@ -112,6 +119,7 @@ class JobAnalysis(Base):
     job_id = Column(Integer, ForeignKey('jobs.id', ondelete='CASCADE'), nullable=False, index=True)
     match_score = Column(Float)  # 0-100
     ats_score = Column(Float)  # 0-100
+    rules_ats_score = Column(Float)  # 0-100, rules-based RealATSScorer (no AI)
     matching_skills = Column(Text)  # JSON array: ["Python", "SQL", "AWS"]
     missing_skills = Column(Text)  # JSON array: ["Kubernetes", "Terraform"]
     experience_match = Column(String)  # "Perfect", "Close", "Gap"
@@ -153,6 +161,7 @@ class JobAnalysis(Base):
             "job_id": self.job_id,
             "match_score": self.match_score,
             "ats_score": self.ats_score,
+            "rules_ats_score": self.rules_ats_score,
             "matching_skills": safe_json_parse(self.matching_skills, []),
             "missing_skills": safe_json_parse(self.missing_skills, []),
             "experience_match": self.experience_match,
@@ -166,6 +175,42 @@ class JobAnalysis(Base):
         }
 
 
+class ParsedJobDescription(Base):
+    """
+    Memoized LLM parse of a job description
+    
+    Keyed by the hash of the normalized description text, so duplicate
+    postings (same description on several sources) share a single parse.
+    kind identifies the parser and its prompt/schema version:
+    "jd_analysis:v1" (JDAnalyzer) or "ats_keywords:v1" (ATSKeywordAnalyzer).
+    """
+    __tablename__ = "parsed_job_descriptions"
+    __table_args__ = (UniqueConstraint('description_hash', 'kind', name='uq_parsed_jd_kind'),)
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    description_hash = Column(String(64), nullable=False, index=True)
+    kind = Column(String, nullable=False)
+    data = Column(Text, nullable=False)  # JSON
+    created_at = Column(DateTime, default=func.now())
+    
+    def __repr__(self):
+        return f"<ParsedJobDescription(hash='{self.description_hash[:12]}', kind='{self.kind}')>"
+    
+    @staticmethod
+    def hash_description(description: str) -> str:
+        """SHA-256 of the description with unicode forms and whitespace normalized"""
+        text = unicodedata.normalize("NFKC", description or "")
+        text = re.sub(r"\s+", " ", text).strip()
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+    
+    def get_data(self) -> dict:
+        """Stored parse, or {} if unreadable"""
+        try:
+            return json.loads(self.data) if self.data else {}
+        except (json.JSONDecodeError, TypeError):
+            return {}
+
+
 # Create indexes
 Index('idx_jobs_company', Job.company)
 Index('idx_jobs_posted_date', Job.posted_date.desc())
@@ -173,3 +218,4 @@ Index('idx_jobs_source', Job.source)
 Index('idx_jobs_active', Job.is_active)
 Index('idx_analysis_job', JobAnalysis.job_id)
 Index('idx_analysis_match_score', JobAnalysis.match_score.desc())
+Index('idx_analysis_rules_ats_score', JobAnalysis.rules_ats_score.desc())
@@ -1,7 +1,8 @@
 """
 Scraping log model - tracks scraping sessions
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Index
+import json
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from database import Base
 
@@ -40,6 +41,44 @@ class ScrapingLog(Base):
         }
 
 
+class ScrapeWatermark(Base):
+    """High-water mark per (source, keyword, location) for incremental scraping"""
+    __tablename__ = "scrape_watermarks"
+    __table_args__ = (UniqueConstraint('source', 'keyword', 'location', name='uq_watermark_search'),)
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    source = Column(String, nullable=False, index=True)  # Scraper key: jobspy, arbeitsagentur
+    keyword = Column(String, nullable=False)
+    location = Column(String, nullable=False)
+    newest_posted_date = Column(DateTime)  # Newest posted_date seen so far
+    seen_ids = Column(Text)  # JSON array of recently seen job IDs (external_id or URL)
+    last_run_at = Column(DateTime)  # Last successful scrape
+    last_full_run_at = Column(DateTime)  # Last scrape without incremental filters
+    
+    def __repr__(self):
+        return f"<ScrapeWatermark(source='{self.source}', keyword='{self.keyword}', location='{self.location}')>"
+    
+    def get_seen_ids(self) -> list:
+        """Seen job IDs, oldest first"""
+        try:
+            return json.loads(self.seen_ids) if self.seen_ids else []
+        except (json.JSONDecodeError, TypeError):
+            return []
+    
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            "id": self.id,
+            "source": self.source,
+            "keyword": self.keyword,
+            "location": self.location,
+            "newest_posted_date": self.newest_posted_date.isoformat() if self.newest_posted_date else None,
+            "seen_count": len(self.get_seen_ids()),
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_full_run_at": self.last_full_run_at.isoformat() if self.last_full_run_at else None,
+        }
+
+
 # Create indexes
 Index('idx_logs_source', ScrapingLog.source)
 Index('idx_logs_date', ScrapingLog.started_at.desc())
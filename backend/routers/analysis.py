@@ -2,16 +2,23 @@
 AI analysis endpoints - Enhanced with industry-standard ATS scoring
 """
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+import json
+from typing import List, Optional
 from pydantic import BaseModel
-from database import get_db
+from database import SessionLocal, get_db
 from models.job import Job, JobAnalysis
 from models.user import UserProfile
 from schemas.analysis import AnalysisRequest, AnalysisResponse
 from ai_agents.agent_manager import AgentManager
 from ai_agents.enhanced_ats_scorer import EnhancedATSScorer
 from ai_agents.multi_layer_ats import MultiLayerATSScorer
+from ai_agents.provider_health import health_stats
+from ai_agents.rate_limits import limiter_stats
+from ai_agents.response_cache import get_response_cache
+from ai_agents.rules_ats_batch import RulesATSBatch, last_rules_ats_stats
+from ai_agents.scoring_funnel import ScoringFunnel, last_funnel_stats
 from utils.logger import setup_logger
 from utils.pdf_parser import PDFParser
 
@@ -104,6 +111,115 @@ def batch_analyze_jobs(
     return {"message": f"Batch analysis started for {len(job_ids)} jobs"}
 
 
+@router.post("/scoring-funnel")
+def run_scoring_funnel(
+    background_tasks: BackgroundTasks,
+    quick_threshold: Optional[float] = None,
+    rules_slice: Optional[int] = None,
+    rules_threshold: Optional[float] = None,
+    llm_top_k: Optional[int] = None,
+    generate_materials: bool = True
+):
+    """
+    Score all unanalyzed jobs through the tiered funnel
+    
+    Quick match (local) -> rules-based ATS (local) -> full AI analysis of the
+    top-K only. Omitted parameters use the funnel_* settings.
+    
+    - **quick_threshold**: Minimum quick match score (0-100)
+    - **rules_slice**: Best quick matches re-ranked by the rules-based scorer
+    - **rules_threshold**: Minimum rules-based ATS score (0-100)
+    - **llm_top_k**: Jobs sent to the full AI analysis
+    """
+    def run_funnel():
+        funnel_db = SessionLocal()
+        try:
+            ScoringFunnel(funnel_db).run(
+                quick_threshold=quick_threshold,
+                rules_slice=rules_slice,
+                rules_threshold=rules_threshold,
+                llm_top_k=llm_top_k,
+                generate_materials=generate_materials
+            )
+        except Exception as e:
+            logger.error(f"❌ Error in scoring funnel: {e}")
+        finally:
+            funnel_db.close()
+    
+    background_tasks.add_task(run_funnel)
+    
+    return {"message": "Scoring funnel started", "stats_url": "/api/analysis/scoring-funnel/stats"}
+
+
+@router.get("/scoring-funnel/stats")
+def get_scoring_funnel_stats():
+    """Per-stage pruning stats of the last scoring funnel run"""
+    return last_funnel_stats()
+
+
+@router.post("/rules-ats-scan")
+def run_rules_ats_scan(
+    background_tasks: BackgroundTasks,
+    job_ids: Optional[List[int]] = None
+):
+    """
+    Score the resume against all active jobs with the rules-based ATS scorer
+    
+    No AI calls - results are stored as rules_ats_score on each job's
+    analysis (sort/filter with /api/jobs?sort_by=rules_ats_score).
+    
+    - **job_ids**: Only score these jobs (default: all active jobs)
+    """
+    def run_scan():
+        scan_db = SessionLocal()
+        try:
+            RulesATSBatch(scan_db).run(job_ids=job_ids)
+        except Exception as e:
+            logger.error(f"❌ Error in rules-based ATS scan: {e}")
+        finally:
+            scan_db.close()
+    
+    background_tasks.add_task(run_scan)
+    
+    return {"message": "Rules-based ATS scan started", "stats_url": "/api/analysis/rules-ats-scan/stats"}
+
+
+@router.get("/rules-ats-scan/stats")
+def get_rules_ats_scan_stats():
+    """Counts and timings of the last rules-based ATS scan"""
+    return last_rules_ats_stats()
+
+
+@router.get("/llm-cache/stats")
+def get_llm_cache_stats():
+    """LLM response cache hit/miss counters"""
+    cache = get_response_cache()
+    if not cache:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.delete("/llm-cache")
+def clear_llm_cache():
+    """Drop all cached LLM responses"""
+    cache = get_response_cache()
+    if not cache:
+        return {"enabled": False, "removed": 0}
+    return {"enabled": True, "removed": cache.clear()}
+
+
+@router.get("/llm-limits/stats")
+def get_llm_limit_stats():
+    """Per provider+model rate limiter state (adaptive concurrency, pauses)"""
+    return {"limiters": limiter_stats()}
+
+
+@router.get("/llm-health/stats")
+def get_llm_health_stats():
+    """Per provider+model latency, error rate and circuit breaker state"""
+    return {"providers": health_stats()}
+
+
 @router.get("/{job_id}", response_model=AnalysisResponse)
 def get_analysis(job_id: int, db: Session = Depends(get_db)):
     """Get analysis for job"""
@@ -116,8 +232,12 @@ def get_analysis(job_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/generate-resume/{job_id}")
-def generate_resume(job_id: int, db: Session = Depends(get_db)):
-    """Generate tailored resume for job"""
+def generate_resume(job_id: int, stream: bool = False, db: Session = Depends(get_db)):
+    """
+    Generate tailored resume for job
+    
+    - **stream**: Send the resume as server-sent events while it is generated
+    """
     job = db.query(Job).get(job_id)
     
     if not job:
@@ -125,6 +245,9 @@ def generate_resume(job_id: int, db: Session = Depends(get_db)):
     
     agent_manager = AgentManager(db)
     
+    if stream:
+        return _stream_material(agent_manager, job_id, 'tailored_resume')
+    
     # Get or create analysis
     analysis = agent_manager.get_analysis(job_id)
     
@@ -139,8 +262,12 @@ def generate_resume(job_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/generate-cover-letter/{job_id}")
-def generate_cover_letter(job_id: int, db: Session = Depends(get_db)):
-    """Generate tailored cover letter for job"""
+def generate_cover_letter(job_id: int, stream: bool = False, db: Session = Depends(get_db)):
+    """
+    Generate tailored cover letter for job
+    
+    - **stream**: Send the cover letter as server-sent events while it is generated
+    """
     job = db.query(Job).get(job_id)
     
     if not job:
@@ -148,6 +275,9 @@ def generate_cover_letter(job_id: int, db: Session = Depends(get_db)):
     
     agent_manager = AgentManager(db)
     
+    if stream:
+        return _stream_material(agent_manager, job_id, 'tailored_cover_letter')
+    
     # Get or create analysis
     analysis = agent_manager.get_analysis(job_id)
     
@@ -161,10 +291,12 @@ def generate_cover_letter(job_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/interview-prep/{job_id}")
-def get_interview_prep(job_id: int, db: Session = Depends(get_db)):
+def get_interview_prep(job_id: int, stream: bool = False, db: Session = Depends(get_db)):
     """
     Get comprehensive interview preparation materials with Q&A
     Includes: Company Info, Technical Q&A (with Glassdoor insights), Behavioral Q&A, HR Q&A
+    
+    - **stream**: Send each section as a server-sent event as soon as it is ready
     """
     job = db.query(Job).get(job_id)
     
@@ -178,8 +310,35 @@ def get_interview_prep(job_id: int, db: Session = Depends(get_db)):
     # Use CompanyResearcher with GPT-4o-mini for comprehensive interview prep
     from ai_agents.researcher import CompanyResearcher
     
+    job_info = {
+        "job_id": job_id,
+        "job_title": job.title,
+        "company": job.company,
+    }
+    
     try:
         researcher = CompanyResearcher(preferred_provider="openai")
+        
+        if stream:
+            sections = researcher.iter_sections(
+                company_name=job.company,
+                job_title=job.title,
+                job_description=job.description,
+                resume_text=resume_text
+            )
+            
+            def event_stream():
+                yield _sse_event("job", job_info)
+                try:
+                    for name, content in sections:
+                        yield _sse_event("section", {"section": name, "data": content})
+                except Exception as e:
+                    logger.error(f"Error streaming interview prep for job {job_id}: {e}")
+                    yield _sse_event("error", {"detail": str(e)})
+                yield _sse_event("done", {})
+            
+            return StreamingResponse(event_stream(), media_type="text/event-stream")
+        
         result = researcher.process(
             company_name=job.company,
             job_title=job.title,
@@ -188,9 +347,7 @@ def get_interview_prep(job_id: int, db: Session = Depends(get_db)):
         )
         
         return {
-            "job_id": job_id,
-            "job_title": job.title,
-            "company": job.company,
+            **job_info,
             "company_info": result.get('company_info', {}),
             "technical_qa": result.get('technical_qa', []),
             "behavioral_qa": result.get('behavioral_qa', []),
@@ -201,11 +358,47 @@ def get_interview_prep(job_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Failed to generate interview prep: {str(e)}")
 
 
+def _sse_event(event: str, data) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _stream_material(agent_manager: AgentManager, job_id: int, material: str) -> StreamingResponse:
+    """
+    Server-sent events for a generated material
+    
+    Events: chunk ({"text"}) while generating, then done ({material: full text})
+    or error if nothing could be generated
+    """
+    chunks = agent_manager.stream_material(job_id, material)
+    if chunks is None:
+        raise HTTPException(status_code=400, detail="No resume found. Upload resume in Profile first.")
+    
+    def event_stream():
+        parts = []
+        try:
+            for chunk in chunks:
+                parts.append(chunk)
+                yield _sse_event("chunk", {"text": chunk})
+        except Exception as e:
+            logger.error(f"Error streaming {material} for job {job_id}: {e}")
+            yield _sse_event("error", {"detail": str(e)})
+            return
+        
+        if parts:
+            yield _sse_event("done", {material: "".join(parts)})
+        else:
+            yield _sse_event("error", {"detail": "Generation failed"})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @router.post("/enhanced-ats-scan/{job_id}")
 def enhanced_ats_scan(
     job_id: int, 
     use_multi_layer: bool = False,
     tier: str = 'standard',
+    stream: bool = False,
     db: Session = Depends(get_db)
 ):
     """
@@ -215,6 +408,9 @@ def enhanced_ats_scan(
         job_id: Job to analyze
         use_multi_layer: Enable 3-layer AI scoring (DeepSeek + GPT-5-mini)
         tier: 'basic' (score only), 'standard' (score + insights), 'premium' (full feedback)
+        stream: Multi-layer mode only - send server-sent events: each layer
+                score as it finishes, Layer 3 feedback text while it is
+                generated, then the full result
     
     Returns:
         Legacy mode: Keywords, Font, Layout, Page Setup (30+ checks)
@@ -229,29 +425,42 @@ def enhanced_ats_scan(
     if not user or not user.resume_text:
         raise HTTPException(status_code=400, detail="No resume found. Upload resume in Profile first.")
     
+    response = {
+        "job_id": job_id,
+        "job_title": job.title,
+        "company": job.company,
+        "scoring_mode": "multi_layer" if use_multi_layer else "legacy",
+        "tier": tier if use_multi_layer else "legacy"
+    }
+    
+    if stream and use_multi_layer:
+        events = MultiLayerATSScorer().iter_assessment(
+            user.resume_text, job.description, tier=tier, stream_feedback=True
+        )
+        
+        def event_stream():
+            yield _sse_event("job", response)
+            try:
+                for event, data in events:
+                    if event == 'result':
+                        yield _sse_event("result", {**response, **_multi_layer_response(data)})
+                    else:
+                        yield _sse_event(event, data)
+            except Exception as e:
+                logger.error(f"Enhanced ATS scan stream failed: {e}")
+                yield _sse_event("error", {"detail": str(e)})
+            yield _sse_event("done", {})
+        
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+    
     # Run enhanced ATS analysis
     try:
         ats_scorer = EnhancedATSScorer(use_multi_layer=use_multi_layer)
         result = ats_scorer.process(user.resume_text, job.description, tier=tier)
         
-        response = {
-            "job_id": job_id,
-            "job_title": job.title,
-            "company": job.company,
-            "scoring_mode": "multi_layer" if use_multi_layer else "legacy",
-            "tier": tier if use_multi_layer else "legacy"
-        }
-        
         if use_multi_layer:
             # Multi-layer response format
-            response.update({
-                "final_score": result['final_score'],
-                "confidence": result['confidence'],
-                "layer_scores": result['layer_scores'],
-                "detailed_feedback": result.get('detailed_feedback'),
-                "cost_breakdown": result.get('cost_breakdown'),
-                "processing_time": result.get('processing_time')
-            })
+            response.update(_multi_layer_response(result))
         else:
             # Legacy response format
             response.update({
@@ -270,6 +479,19 @@ def enhanced_ats_scan(
         raise HTTPException(status_code=500, detail=f"ATS scan failed: {str(e)}")
 
 
+def _multi_layer_response(result: dict) -> dict:
+    """Multi-layer fields of the enhanced ATS scan response"""
+    return {
+        "final_score": result['final_score'],
+        "confidence": result['confidence'],
+        "layer_scores": result['layer_scores'],
+        "layers_run": result.get('layers_run'),
+        "detailed_feedback": result.get('detailed_feedback'),
+        "cost_breakdown": result.get('cost_breakdown'),
+        "processing_time": result.get('processing_time')
+    }
+
+
 @router.post("/compare-custom")
 def compare_custom_cv_jd(
     request: CustomCompareRequest,
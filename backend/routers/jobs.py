@@ -24,10 +24,12 @@ def list_jobs(
     remote_type: Optional[str] = None,
     experience_level: Optional[str] = None,
     min_match_score: Optional[float] = None,
+    min_rules_ats_score: Optional[float] = None,
     hide_unscored: bool = False,
     posted_after: Optional[str] = None,
     search: Optional[str] = None,
     include_duplicates: bool = False,
+    sort_by: str = Query("posted_date", pattern="^(posted_date|rules_ats_score)$"),
     db: Session = Depends(get_db)
 ):
     """
@@ -40,9 +42,11 @@ def list_jobs(
     - **remote_type**: Filter by remote type (remote, hybrid, on-site)
     - **experience_level**: Filter by experience level (entry, mid, senior, lead)
     - **min_match_score**: Minimum match score (0-100)
+    - **min_rules_ats_score**: Minimum rules-based ATS score (0-100, hides unscored jobs)
     - **posted_after**: ISO date string (e.g., "2024-01-01")
     - **search**: Search in title, company, location
     - **include_duplicates**: Include duplicate jobs
+    - **sort_by**: posted_date (newest first) or rules_ats_score (best first)
     """
     query = db.query(Job).filter(Job.is_active == True)
     
@@ -77,8 +81,12 @@ def list_jobs(
             (Job.location.ilike(search_term))
         )
     
+    # Analysis is joined at most once (score filters and sorting share it)
+    analysis_joined = False
+    
     # Filter by match score if provided
     if min_match_score is not None:
+        analysis_joined = True
         if hide_unscored:
             # STRICT MODE: Only show jobs with scores >= threshold
             # Hide jobs without analysis (unscored) - prevents irrelevant jobs from showing
@@ -96,13 +104,28 @@ def list_jobs(
                 )
             )
     
+    # Filter by rules-based ATS score (see /api/analysis/rules-ats-scan)
+    if min_rules_ats_score is not None:
+        if not analysis_joined:
+            query = query.join(JobAnalysis)
+            analysis_joined = True
+        query = query.filter(JobAnalysis.rules_ats_score >= min_rules_ats_score)
+    
+    if sort_by == "rules_ats_score":
+        if not analysis_joined:
+            query = query.outerjoin(JobAnalysis)
+        # Unscored jobs last
+        order = (JobAnalysis.rules_ats_score.is_(None), JobAnalysis.rules_ats_score.desc(), Job.posted_date.desc())
+    else:
+        order = (Job.posted_date.desc(),)
+    
     # Get total count BEFORE adding eager load options
     total = query.count()
     logger.info(f"📊 Found {total} jobs in database (page {page}, size {page_size})")
     
     # Apply pagination, sorting, and eager load analysis
     jobs = query.options(joinedload(Job.analysis))\
-        .order_by(Job.posted_date.desc())\
+        .order_by(*order)\
         .offset((page - 1) * page_size)\
         .limit(page_size)\
         .all()
@@ -116,6 +139,7 @@ def list_jobs(
             logger.debug(f"Job {job.id} has analysis: {job.analysis.match_score}")
             job_dict['match_score'] = job.analysis.match_score
             job_dict['ats_score'] = job.analysis.ats_score
+            job_dict['rules_ats_score'] = job.analysis.rules_ats_score
         else:
             logger.debug(f"Job {job.id} has NO analysis - setting score to 0")
             # Jobs without scores show 0 (being calculated in background)
@@ -11,6 +11,7 @@ from database import get_db
 from models.manual_prep import ManualPrep
 from models.user import UserProfile
 from ai_agents.manual_prep_agent import ManualPrepAgent
+from ai_agents.response_cache import refresh_cache
 from utils.logger import setup_logger
 from utils.pdf_export import generate_prep_pdf
 import json
@@ -44,7 +45,7 @@ async def create_manual_prep(
         
         # Generate AI content using DeepSeek models
         logger.info("🤖 Generating AI content...")
-        ai_results = prep_agent.process(
+        ai_results = await prep_agent.aprocess(
             company_name=company_name,
             job_title=job_title,
             job_description=job_description,
@@ -310,13 +311,14 @@ async def regenerate_prep_content(
         # Regenerate content
         logger.info(f"🔄 Regenerating content for prep {prep_id}, section: {section or 'all'}")
         
-        ai_results = prep_agent.process(
-            company_name=prep.company_name,
-            job_title=prep.job_title,
-            job_description=prep.job_description,
-            job_url=prep.job_url,
-            resume_text=resume_text
-        )
+        with refresh_cache():
+            ai_results = await prep_agent.aprocess(
+                company_name=prep.company_name,
+                job_title=prep.job_title,
+                job_description=prep.job_description,
+                job_url=prep.job_url,
+                resume_text=resume_text
+            )
         
         # Update specified section or all
         if not section or section == 'all':
@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, BackgroundTasks
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from datetime import datetime
+from config import settings
 from database import get_db
 from scrapers.scraper_manager import ScraperManager
 from utils.logger import setup_logger
@@ -52,14 +53,18 @@ def trigger_scraping(
             if unmatched_jobs:
                 logger.info(f"🎯 Calculating match scores for {len(unmatched_jobs)} new jobs...")
                 
+                # Resume is tokenized once for the whole batch
+                scores = quick_matcher.batch_calculate(user.resume_text, [
+                    {'id': job.id, 'description': job.description or "", 'title': job.title}
+                    for job in unmatched_jobs
+                ], processes=settings.quick_match_processes)
+                
                 for job in unmatched_jobs:
                     try:
-                        # Quick match score (for filtering only)
-                        score = quick_matcher.calculate_quick_match(
-                            user.resume_text,
-                            job.description or "",
-                            job.title
-                        )
+                        # batch_calculate skips jobs without a description
+                        score = scores.get(job.id)
+                        if score is None:
+                            score = quick_matcher.calculate_quick_match(user.resume_text, "", job.title)
                         
                         # Create lightweight analysis with ONLY match_score
                         # ATS score requires full AI analysis (user clicks "Run AI Analysis")
@@ -1,13 +1,14 @@
 """
 User profile endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
 from sqlalchemy.orm import Session
 from typing import Optional
 import os
 import json
 from datetime import datetime
-from database import get_db
+from config import settings
+from database import SessionLocal, get_db
 from models.user import UserProfile, ResumeVersion, CoverLetterTemplate
 from schemas.user import UserProfileUpdate, UserProfileResponse
 from utils.parser import ResumeParser
@@ -95,6 +96,7 @@ def update_profile(
 
 @router.post("/resume")
 async def upload_resume(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
@@ -152,6 +154,10 @@ async def upload_resume(
     
     db.commit()
     
+    # Rules-based ATS scores depend on the resume - re-score all active jobs
+    if settings.rules_ats_on_resume_upload:
+        background_tasks.add_task(_rescore_rules_ats)
+    
     return {
         "message": "Resume uploaded and parsed successfully",
         "file_path": file_path,
@@ -160,6 +166,19 @@ async def upload_resume(
     }
 
 
+def _rescore_rules_ats():
+    """Background task: rules-based ATS scan with the new resume"""
+    from ai_agents.rules_ats_batch import RulesATSBatch
+    
+    scan_db = SessionLocal()
+    try:
+        RulesATSBatch(scan_db).run()
+    except Exception as e:
+        logger.error(f"❌ Error re-scoring jobs after resume upload: {e}")
+    finally:
+        scan_db.close()
+
+
 @router.get("/resumes")
 def list_resume_versions(db: Session = Depends(get_db)):
     """List all resume versions"""
@@ -16,6 +16,7 @@ class AnalysisResponse(BaseModel):
     job_id: int
     match_score: Optional[float] = None
     ats_score: Optional[float] = None
+    rules_ats_score: Optional[float] = None
     matching_skills: List[str] = []
     missing_skills: List[str] = []
     experience_match: Optional[str] = None
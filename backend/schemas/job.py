@@ -43,6 +43,7 @@ class JobResponse(JobBase):
     updated_at: datetime
     match_score: Optional[float] = None  # Match score from JobAnalysis
     ats_score: Optional[float] = None    # ATS score from JobAnalysis
+    rules_ats_score: Optional[float] = None  # Rules-based ATS score from JobAnalysis
     
     class Config:
         from_attributes = True
@@ -2,16 +2,34 @@
 Arbeitsagentur API scraper - German Federal Employment Agency
 Official job board API - no API key required
 """
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 import requests
 from typing import List, Dict, Optional
 from datetime import datetime
 from scrapers.base_scraper import BaseScraper
+from scrapers.http_client import get_session, aget
+from utils.rate_limiter import TokenBucket
+from config import settings
 
 
 class ArbeitsagenturScraper(BaseScraper):
     """Scraper for Arbeitsagentur job board (official German API)"""
     
     BASE_URL = "https://rest.arbeitsagentur.de/jobboerse/jobsuche-service/pc/v4/jobs"
+    DETAILS_URL = "https://rest.arbeitsagentur.de/jobboerse/jobsuche-service/pc/v2/jobdetails/{refnr}"
+    PAGE_SIZE = 50  # API limit per page
+    MAX_PUBLISHED_SINCE_DAYS = 100  # API limit for veroeffentlichtseit
+    
+    # refnr -> (fetched_at, details), least recently used first; shared by
+    # all instances in the process
+    _details_cache: "OrderedDict[str, tuple]" = OrderedDict()
+    _details_cache_lock = threading.Lock()
     
     def __init__(self):
         super().__init__()
@@ -20,74 +38,180 @@ class ArbeitsagenturScraper(BaseScraper):
             "User-Agent": "SmartJobHunter/1.0",
             "Accept": "application/json",
         }
+        # Paces page requests (replaces the fixed random_delay between pages)
+        self.rate_limiter = TokenBucket(settings.arbeitsagentur_requests_per_second,
+                                        settings.arbeitsagentur_burst)
+        self.page_workers = settings.arbeitsagentur_page_workers
     
     def scrape(self, keyword: str, location: str = "Germany", radius: int = 50, 
-               max_results: int = 500, **kwargs) -> List[Dict]:
+               max_results: int = 500,
+               published_since_days: Optional[int] = None, **kwargs) -> List[Dict]:
         """
         Scrape jobs from Arbeitsagentur API
         
+        Page 1 tells us maxErgebnisse; the remaining pages are then fetched in
+        parallel, paced by a token bucket instead of fixed sleeps.
+        
         Args:
             keyword: Search keyword (e.g., "Data Scientist")
             location: Location to search (city or region)
             radius: Search radius in km
             max_results: Maximum number of jobs to retrieve
+            published_since_days: Only jobs published in the last N days (None = all)
             
         Returns:
             List of normalized job dictionaries
         """
         self.logger.info(f"🔍 Scraping Arbeitsagentur for '{keyword}' in '{location}'...")
         
-        jobs = []
-        page = 1  # API uses 1-based indexing
-        page_size = 50  # API limit per page
+        session = get_session()
         
-        try:
-            while len(jobs) < max_results:
-                params = {
-                    "was": keyword,
-                    "wo": location,
-                    "umkreis": radius,
-                    "page": page,
-                    "size": page_size,
-                    "angebotsart": "1",  # 1=employment, 2=self-employment, 4=training
-                }
-                
-                self.logger.debug(f"Fetching page {page}...")
-                response = requests.get(self.BASE_URL, params=params, headers=self.headers, timeout=30)
+        def fetch(page: int) -> Optional[Dict]:
+            if self.is_cancelled():
+                return None
+            self.rate_limiter.acquire()
+            self.logger.debug(f"Fetching page {page}...")
+            params = self._search_params(keyword, location, radius, page, published_since_days)
+            try:
+                response = session.get(self.BASE_URL, params=params, headers=self.headers, timeout=30)
                 response.raise_for_status()
-                
-                data = response.json()
-                
-                # Check if we have results
-                stellenangebote = data.get("stellenangebote", [])
-                if not stellenangebote:
-                    self.logger.info("No more jobs found")
-                    break
-                
-                # Parse jobs
-                for job_data in stellenangebote:
-                    try:
-                        job = self._parse_job(job_data)
-                        if job and self.validate_job(job):
-                            jobs.append(job)
-                    except Exception as e:
-                        self.logger.error(f"Error parsing job: {e}")
-                        continue
-                
-                # Check if we've reached the end
-                total_jobs = data.get("maxErgebnisse", 0)
-                if len(jobs) >= total_jobs or len(stellenangebote) < page_size:
-                    break
-                
-                page += 1
-                self.random_delay()
-        
-        except requests.RequestException as e:
-            self.logger.error(f"❌ Error scraping Arbeitsagentur: {e}")
+                return response.json()
+            except (requests.RequestException, ValueError) as e:
+                self.logger.error(f"❌ Error fetching Arbeitsagentur page {page}: {e}")
+                self.report_error(f"page {page}: {e}")
+                return None
+        
+        first = fetch(1)
+        if first is None:
+            return []
+        
+        pages = {1: first}
+        remaining = self._remaining_pages(first, max_results)
+        if remaining:
+            self.logger.debug(f"Fetching {len(remaining)} more pages in parallel...")
+            with ThreadPoolExecutor(max_workers=min(self.page_workers, len(remaining))) as executor:
+                pages.update(zip(remaining, executor.map(fetch, remaining)))
+        
+        jobs = self._collect_pages(pages, max_results)
+        self.log_scraping_stats(jobs)
+        return jobs
+    
+    async def ascrape(self, keyword: str, location: str = "Germany", radius: int = 50,
+                      max_results: int = 500,
+                      published_since_days: Optional[int] = None, **kwargs) -> List[Dict]:
+        """
+        Async version of scrape() using the shared pooled HTTP client
+        
+        Args:
+            keyword: Search keyword (e.g., "Data Scientist")
+            location: Location to search (city or region)
+            radius: Search radius in km
+            max_results: Maximum number of jobs to retrieve
+            published_since_days: Only jobs published in the last N days (None = all)
+            
+        Returns:
+            List of normalized job dictionaries
+        """
+        self.logger.info(f"🔍 Scraping Arbeitsagentur for '{keyword}' in '{location}'...")
+        
+        async def fetch(page: int) -> Optional[Dict]:
+            await self.rate_limiter.aacquire()
+            self.logger.debug(f"Fetching page {page}...")
+            params = self._search_params(keyword, location, radius, page, published_since_days)
+            try:
+                response = await aget(self.BASE_URL, params=params, headers=self.headers)
+                response.raise_for_status()
+                return response.json()
+            except (httpx.HTTPError, ValueError) as e:
+                self.logger.error(f"❌ Error fetching Arbeitsagentur page {page}: {e}")
+                self.report_error(f"page {page}: {e}")
+                return None
+        
+        first = await fetch(1)
+        if first is None:
+            return []
+        
+        pages = {1: first}
+        remaining = self._remaining_pages(first, max_results)
+        if remaining:
+            self.logger.debug(f"Fetching {len(remaining)} more pages in parallel...")
+            pages.update(zip(remaining, await asyncio.gather(*(fetch(page) for page in remaining))))
         
+        jobs = self._collect_pages(pages, max_results)
         self.log_scraping_stats(jobs)
         return jobs
     
+    def _remaining_pages(self, first_page: Dict, max_results: int) -> List[int]:
+        """Page numbers still to fetch after page 1, based on maxErgebnisse"""
+        if len(first_page.get("stellenangebote", [])) < self.PAGE_SIZE:
+            return []
+        
+        wanted = min(first_page.get("maxErgebnisse", 0), max_results)
+        last_page = math.ceil(wanted / self.PAGE_SIZE)
+        return list(range(2, last_page + 1))
+    
+    def _collect_pages(self, pages: Dict[int, Optional[Dict]], max_results: int) -> List[Dict]:
+        """Parse pages in page order, dropping repeated refnr across pages"""
+        seen_refnrs = set()
+        stellenangebote = []
+        
+        for page in sorted(pages):
+            data = pages[page]
+            if not data:
+                continue
+            for job_data in data.get("stellenangebote", []):
+                refnr = job_data.get("refnr")
+                if refnr:
+                    if refnr in seen_refnrs:
+                        continue
+                    seen_refnrs.add(refnr)
+                stellenangebote.append(job_data)
+        
+        if not stellenangebote:
+            self.logger.info("No more jobs found")
+        
+        return self._parse_page(stellenangebote)[:max_results]
+    
+    def incremental_params(self, newest_posted_date: Optional[datetime],
+                           last_run_at: Optional[datetime]) -> Dict:
+        """Use the API's veroeffentlichtseit filter (days) from the newest posting seen"""
+        if not newest_posted_date:
+            return {}
+        
+        # Publication dates are day-granular - include the watermark day itself
+        days = (datetime.now().date() - newest_posted_date.date()).days + 1
+        if days > self.MAX_PUBLISHED_SINCE_DAYS:
+            return {}
+        return {"published_since_days": max(1, days)}
+    
+    def _search_params(self, keyword: str, location: str, radius: int, page: int,
+                       published_since_days: Optional[int] = None) -> Dict:
+        """Build query parameters for one search result page"""
+        params = {
+            "was": keyword,
+            "wo": location,
+            "umkreis": radius,
+            "page": page,
+            "size": self.PAGE_SIZE,
+            "angebotsart": "1",  # 1=employment, 2=self-employment, 4=training
+        }
+        if published_since_days is not None:
+            params["veroeffentlichtseit"] = published_since_days
+        return params
+    
+    def _parse_page(self, stellenangebote: List[Dict]) -> List[Dict]:
+        """Parse and validate all jobs of one search result page"""
+        jobs = []
+        for job_data in stellenangebote:
+            try:
+                job = self._parse_job(job_data)
+                if job and self.validate_job(job):
+                    jobs.append(job)
+            except Exception as e:
+                self.logger.error(f"Error parsing job: {e}")
+                continue
+        return jobs
+    
     def _parse_job(self, job_data: Dict) -> Optional[Dict]:
         """Parse raw Arbeitsagentur job data to normalized format"""
         try:
@@ -157,6 +281,7 @@ class ArbeitsagenturScraper(BaseScraper):
                 "salary": None,  # Not available in list view
                 "requirements": None,  # Not available in list view
                 "benefits": None,  # Not available in list view
+                "external_id": refnr or None,
             }
             
             return self.normalize_job(raw_job)
@@ -185,24 +310,146 @@ class ArbeitsagenturScraper(BaseScraper):
             Detailed job dictionary
         """
         try:
-            url = f"https://rest.arbeitsagentur.de/jobboerse/jobsuche-service/pc/v2/jobdetails/{refnr}"
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = get_session().get(self.DETAILS_URL.format(refnr=refnr),
+                                         headers=self.headers, timeout=30)
             response.raise_for_status()
             
-            data = response.json()
-            
-            # Parse detailed information
-            job_data = {
-                "title": data.get("titel", ""),
-                "company": data.get("arbeitgeber", ""),
-                "description": data.get("stellenbeschreibung", ""),
-                "requirements": data.get("anforderungen", ""),
-                "benefits": data.get("arbeitgeberdarstellung", ""),
-                # Add more fields as needed
-            }
+            return self._parse_details(response.json())
+        
+        except Exception as e:
+            self.logger.error(f"Error fetching job details for {refnr}: {e}")
+            return None
+    
+    async def aget_job_details(self, refnr: str) -> Optional[Dict]:
+        """Async version of get_job_details() using the shared pooled HTTP client"""
+        try:
+            response = await aget(self.DETAILS_URL.format(refnr=refnr), headers=self.headers)
+            response.raise_for_status()
             
-            return job_data
+            return self._parse_details(response.json())
         
         except Exception as e:
             self.logger.error(f"Error fetching job details for {refnr}: {e}")
             return None
+    
+    def get_job_details_batch(self, refnrs: List[str], max_workers: int = None) -> Dict[str, Dict]:
+        """
+        Fetch details for many jobs with bounded concurrency
+        
+        Results are cached by refnr for settings.arbeitsagentur_details_cache_ttl_hours,
+        so a refnr seen again within the TTL costs no request. Requests share
+        the page-fetch token bucket.
+        
+        Args:
+            refnrs: Job reference numbers
+            max_workers: Parallel requests (default: settings.arbeitsagentur_detail_workers)
+            
+        Returns:
+            Dictionary of refnr -> detailed job dictionary (failed fetches omitted)
+        """
+        results, to_fetch = self._cached_details(refnrs)
+        if not to_fetch:
+            return results
+        
+        def fetch(refnr: str) -> Optional[Dict]:
+            self.rate_limiter.acquire()
+            return self.get_job_details(refnr)
+        
+        workers = max(1, min(max_workers or settings.arbeitsagentur_detail_workers, len(to_fetch)))
+        self.logger.info(f"📄 Fetching details for {len(to_fetch)} Arbeitsagentur jobs "
+                         f"({len(results)} cached, {workers} workers)...")
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for refnr, details in zip(to_fetch, executor.map(fetch, to_fetch)):
+                if details is not None:
+                    self._details_cache_put(refnr, details)
+                    results[refnr] = details
+        
+        return results
+    
+    async def aget_job_details_batch(self, refnrs: List[str]) -> Dict[str, Dict]:
+        """
+        Async version of get_job_details_batch()
+        
+        Requests go through the shared async client, which caps in-flight
+        requests per host; they share the page-fetch token bucket.
+        
+        Args:
+            refnrs: Job reference numbers
+            
+        Returns:
+            Dictionary of refnr -> detailed job dictionary (failed fetches omitted)
+        """
+        results, to_fetch = self._cached_details(refnrs)
+        if not to_fetch:
+            return results
+        
+        async def fetch(refnr: str) -> Optional[Dict]:
+            await self.rate_limiter.aacquire()
+            return await self.aget_job_details(refnr)
+        
+        self.logger.info(f"📄 Fetching details for {len(to_fetch)} Arbeitsagentur jobs "
+                         f"({len(results)} cached, async)...")
+        
+        fetched = await asyncio.gather(*(fetch(refnr) for refnr in to_fetch))
+        for refnr, details in zip(to_fetch, fetched):
+            if details is not None:
+                self._details_cache_put(refnr, details)
+                results[refnr] = details
+        
+        return results
+    
+    def _cached_details(self, refnrs: List[str]) -> tuple:
+        """Split refnrs into (cached refnr -> details, refnrs still to fetch)"""
+        results = {}
+        to_fetch = []
+        
+        for refnr in dict.fromkeys(refnrs):
+            cached = self._details_cache_get(refnr)
+            if cached is not None:
+                results[refnr] = cached
+            else:
+                to_fetch.append(refnr)
+        
+        return results, to_fetch
+    
+    def _details_cache_get(self, refnr: str) -> Optional[Dict]:
+        """Cached details for refnr, or None if missing or expired"""
+        with self._details_cache_lock:
+            entry = self._details_cache.get(refnr)
+            if entry is None:
+                return None
+            fetched_at, details = entry
+            if time.monotonic() - fetched_at > settings.arbeitsagentur_details_cache_ttl_hours * 3600:
+                del self._details_cache[refnr]
+                return None
+            self._details_cache.move_to_end(refnr)
+            return details
+    
+    def _details_cache_put(self, refnr: str, details: Dict):
+        """
+        Cache details for refnr
+        
+        The cache holds at most settings.arbeitsagentur_details_cache_max_entries
+        refnrs; least recently used ones are evicted beyond that.
+        
+        Args:
+            refnr: Job reference number
+            details: Parsed job details
+        """
+        with self._details_cache_lock:
+            self._details_cache[refnr] = (time.monotonic(), details)
+            self._details_cache.move_to_end(refnr)
+            while len(self._details_cache) > settings.arbeitsagentur_details_cache_max_entries:
+                self._details_cache.popitem(last=False)
+    
+    def _parse_details(self, data: Dict) -> Dict:
+        """Parse detailed job information"""
+        return {
+            "title": data.get("titel", ""),
+            "company": data.get("arbeitgeber", ""),
+            "description": data.get("stellenbeschreibung", ""),
+            "requirements": data.get("anforderungen", ""),
+            "benefits": data.get("arbeitgeberdarstellung", ""),
+            # Add more fields as needed
+        }
@@ -3,7 +3,8 @@ Base scraper class - abstract interface for all scrapers
 """
 from abc import ABC, abstractmethod
 from typing import List, Dict, Optional
-import time
+import asyncio
+import threading
 import random
 from datetime import datetime
 from utils.logger import setup_logger
@@ -26,6 +27,8 @@ class BaseScraper(ABC):
         self.delay_max = delay_max
         self.source_name = self.__class__.__name__.replace("Scraper", "")
         self.logger = logger
+        self.errors: List[str] = []  # Errors swallowed by the current scrape() call
+        self._cancelled = threading.Event()
     
     @abstractmethod
     def scrape(self, keyword: str, location: str = "Germany", **kwargs) -> List[Dict]:
@@ -42,11 +45,70 @@ class BaseScraper(ABC):
         """
         pass
     
+    async def ascrape(self, keyword: str, location: str = "Germany", **kwargs) -> List[Dict]:
+        """
+        Async counterpart of scrape()
+        
+        The default runs the blocking scrape() in a worker thread. Scrapers that
+        talk HTTP directly override this with a native implementation on the
+        shared pooled client (see scrapers.http_client).
+        
+        Args:
+            keyword: Job search keyword
+            location: Location to search in
+            **kwargs: Additional scraper-specific parameters
+            
+        Returns:
+            List of job dictionaries with standardized fields
+        """
+        return await asyncio.to_thread(self.scrape, keyword, location, **kwargs)
+    
+    def incremental_params(self, newest_posted_date: Optional[datetime],
+                           last_run_at: Optional[datetime]) -> Dict:
+        """
+        Extra scrape() kwargs that limit results to jobs posted since the last run
+        
+        Scrapers whose source supports a "posted since" filter override this.
+        
+        Args:
+            newest_posted_date: Newest posted_date seen in previous runs
+            last_run_at: When this search last ran successfully
+            
+        Returns:
+            Keyword arguments for scrape() (empty = full scrape)
+        """
+        return {}
+    
+    def report_error(self, message: str):
+        """
+        Record an error that scrape() logged and recovered from
+        
+        A scrape that reported errors may have returned only part of the
+        results, so the manager does not advance its watermark.
+        
+        Args:
+            message: Error description
+        """
+        self.errors.append(message)
+    
+    def cancel(self):
+        """
+        Ask a running scrape() to stop (e.g. after its source timed out)
+        
+        Scrapers check is_cancelled() between requests; random_delay()
+        returns as soon as the scraper is cancelled.
+        """
+        self._cancelled.set()
+    
+    def is_cancelled(self) -> bool:
+        """Whether cancel() was called"""
+        return self._cancelled.is_set()
+    
     def random_delay(self):
         """Add random delay between requests to avoid rate limiting"""
         delay = random.uniform(self.delay_min, self.delay_max)
         self.logger.debug(f"Waiting {delay:.2f} seconds before next request...")
-        time.sleep(delay)
+        self._cancelled.wait(delay)
     
     def normalize_job(self, raw_job: Dict) -> Dict:
         """
@@ -66,6 +128,7 @@ class BaseScraper(ABC):
         - experience_level (optional)
         - requirements (optional)
         - benefits (optional)
+        - external_id (optional, source-specific job ID)
         """
         normalized = {
             "title": raw_job.get("title", "").strip(),
@@ -81,6 +144,7 @@ class BaseScraper(ABC):
             "experience_level": raw_job.get("experience_level"),
             "requirements": raw_job.get("requirements"),
             "benefits": raw_job.get("benefits"),
+            "external_id": raw_job.get("external_id"),
             "source": self.source_name,
             "scraped_date": datetime.now(),
         }
@@ -6,7 +6,7 @@ Supports common ATS platforms: Greenhouse, Workday, Lever, custom HTML
 from typing import List, Dict, Optional
 from datetime import datetime
 from scrapers.base_scraper import BaseScraper
-import requests
+from scrapers.http_client import get_session
 
 try:
     from selenium import webdriver
@@ -95,7 +95,7 @@ class CompanyScraper(BaseScraper):
             else:
                 api_url = url
             
-            response = requests.get(api_url, timeout=30)
+            response = get_session().get(api_url, timeout=30)
             response.raise_for_status()
             
             data = response.json()
@@ -197,7 +197,7 @@ class CompanyScraper(BaseScraper):
             else:
                 return []
             
-            response = requests.get(api_url, timeout=30)
+            response = get_session().get(api_url, timeout=30)
             response.raise_for_status()
             
             job_list = response.json()
@@ -231,7 +231,7 @@ class CompanyScraper(BaseScraper):
         jobs = []
         
         try:
-            response = requests.get(url, timeout=30)
+            response = get_session().get(url, timeout=30)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -274,7 +274,7 @@ class CompanyScraper(BaseScraper):
         jobs = []
         
         try:
-            response = requests.get(url, timeout=30)
+            response = get_session().get(url, timeout=30)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -3,11 +3,11 @@ German Job Board Scrapers - Major platforms
 Covers 10+ major German job sites
 """
 from typing import List, Dict
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 import time
 from utils.logger import setup_logger
+from scrapers.http_client import get_session
 
 logger = setup_logger(__name__)
 
@@ -31,7 +31,7 @@ class StepStoneScraper:
             url = f"{self.base_url}/jobs/{keyword_encoded}/in-{location_encoded}"
             logger.info(f"Scraping StepStone: {url}")
             
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = get_session().get(url, headers=self.headers, timeout=15)
             if response.status_code == 200:
                 soup = BeautifulSoup(response.text, 'html.parser')
                 
@@ -93,7 +93,7 @@ class XINGJobsScraper:
             url = self.base_url
             logger.info(f"Scraping XING Jobs: {keyword} in {location}")
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=15)
+            response = get_session().get(url, params=params, headers=self.headers, timeout=15)
             if response.status_code == 200:
                 soup = BeautifulSoup(response.text, 'html.parser')
                 
@@ -140,7 +140,7 @@ class MonsterDeScraper:
             }
             
             logger.info(f"Scraping Monster.de: {keyword} in {location}")
-            response = requests.get(self.base_url, params=params, headers=self.headers, timeout=15)
+            response = get_session().get(self.base_url, params=params, headers=self.headers, timeout=15)
             
             if response.status_code == 200:
                 soup = BeautifulSoup(response.text, 'html.parser')
@@ -0,0 +1,146 @@
+"""
+Shared HTTP clients for scrapers
+One pooled, keep-alive client per process instead of a new connection per request
+"""
+import asyncio
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import settings
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+# httpx.AsyncClient and asyncio.Semaphore are bound to the event loop that
+# created them, so keep one client (and one set of host limits) per loop
+_async_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+_host_semaphores: Dict[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]] = {}
+
+
+def get_session() -> requests.Session:
+    """
+    Get the shared blocking session (connection pool with keep-alive)
+
+    At most settings.http_max_connections_per_host connections are open per
+    host; further requests (e.g. from parallel page/detail workers) wait for
+    a free connection instead of opening and discarding extra ones.
+
+    Returns:
+        Process-wide requests.Session
+    """
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=settings.http_max_hosts,
+                    pool_maxsize=settings.http_max_connections_per_host,
+                    pool_block=True,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["User-Agent"] = settings.user_agent
+                _session = session
+
+    return _session
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Get the shared async client for the running event loop
+
+    HTTP/2 is used when the h2 package is installed; requests to the same
+    host are multiplexed over a few warm connections.
+
+    Returns:
+        httpx.AsyncClient bound to the current event loop
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+
+    if client is None or client.is_closed:
+        # Drop clients of loops that are gone (e.g. previous asyncio.run calls)
+        for old_loop in [l for l in _async_clients if l.is_closed()]:
+            _async_clients.pop(old_loop, None)
+            _host_semaphores.pop(old_loop, None)
+
+        client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=settings.http_timeout,
+            follow_redirects=True,
+            headers={"User-Agent": settings.user_agent},
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_connections,
+                keepalive_expiry=settings.http_keepalive_expiry,
+            ),
+        )
+        _async_clients[loop] = client
+        _host_semaphores[loop] = {}
+        logger.debug(f"Created shared async HTTP client (http2={HTTP2_AVAILABLE})")
+
+    return client
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    """Per-host concurrency limit for the current event loop"""
+    loop = asyncio.get_running_loop()
+    semaphores = _host_semaphores.setdefault(loop, {})
+    host = urlsplit(url).netloc
+
+    if host not in semaphores:
+        semaphores[host] = asyncio.Semaphore(settings.http_max_connections_per_host)
+
+    return semaphores[host]
+
+
+async def fetch(method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    Send a request through the shared async client
+
+    At most settings.http_max_connections_per_host requests are in flight
+    per host at any time.
+
+    Args:
+        method: HTTP method
+        url: Request URL
+        **kwargs: Passed to httpx.AsyncClient.request (params, headers, ...)
+
+    Returns:
+        httpx.Response
+    """
+    client = get_async_client()
+    async with _host_semaphore(url):
+        return await client.request(method, url, **kwargs)
+
+
+async def aget(url: str, **kwargs) -> httpx.Response:
+    """GET through the shared async client"""
+    return await fetch("GET", url, **kwargs)
+
+
+async def close_async_clients():
+    """Close the async client of the running loop (call on shutdown)"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.pop(loop, None)
+    _host_semaphores.pop(loop, None)
+
+    if client is not None and not client.is_closed:
+        await client.aclose()
@@ -2,11 +2,13 @@
 JobSpy integration scraper - supports LinkedIn, Indeed, StepStone, Glassdoor
 Uses python-jobspy library for multi-portal scraping
 """
+import math
 from typing import List, Dict, Optional
 from datetime import datetime
 from scrapers.base_scraper import BaseScraper
 
 try:
+    import pandas as pd
     from jobspy import scrape_jobs
     JOBSPY_AVAILABLE = True
 except ImportError:
@@ -18,6 +20,7 @@ class JobSpyScraper(BaseScraper):
     
     # JobSpy v1.1.37 only reliably supports LinkedIn (Indeed/Glassdoor blocked by 403)
     SUPPORTED_SITES = ["linkedin"]
+    HOURS_OLD_MARGIN = 2  # Extra hours of overlap for incremental scrapes
     
     def __init__(self):
         super().__init__()
@@ -25,7 +28,7 @@ class JobSpyScraper(BaseScraper):
             self.logger.warning("⚠️  python-jobspy not installed. Install with: pip install python-jobspy")
     
     def scrape(self, keyword: str, location: str = "Germany", sites: List[str] = None,
-               results_wanted: int = 100, **kwargs) -> List[Dict]:
+               results_wanted: int = 100, hours_old: Optional[int] = None, **kwargs) -> List[Dict]:
         """
         Scrape jobs using JobSpy from multiple sites
         
@@ -34,12 +37,14 @@ class JobSpyScraper(BaseScraper):
             location: Location to search
             sites: List of sites to scrape (default: all supported)
             results_wanted: Number of results per site
+            hours_old: Only jobs posted in the last N hours (None = all)
             
         Returns:
             List of normalized job dictionaries
         """
         if not JOBSPY_AVAILABLE:
             self.logger.error("❌ JobSpy not available")
+            self.report_error("python-jobspy not installed")
             return []
         
         if sites is None:
@@ -50,6 +55,8 @@ class JobSpyScraper(BaseScraper):
         all_jobs = []
         
         for site in sites:
+            if self.is_cancelled():
+                break
             try:
                 self.logger.info(f"  Scraping {site}...")
                 
@@ -61,18 +68,11 @@ class JobSpyScraper(BaseScraper):
                     results_wanted=results_wanted,
                     country_indeed="Germany" if site == "indeed" else "usa",
                     full_description=True,  # Get full job descriptions
+                    hours_old=hours_old,
                 )
                 
                 if jobs_df is not None and not jobs_df.empty:
-                    # Convert DataFrame to list of dicts
-                    for _, row in jobs_df.iterrows():
-                        try:
-                            job = self._parse_jobspy_row(row, site)
-                            if job and self.validate_job(job):
-                                all_jobs.append(job)
-                        except Exception as e:
-                            self.logger.error(f"Error parsing {site} job: {e}")
-                            continue
+                    all_jobs.extend(self._normalize_jobs_df(jobs_df, site))
                     
                     self.logger.info(f"  ✅ {site}: {len(jobs_df)} jobs scraped")
                 else:
@@ -82,70 +82,101 @@ class JobSpyScraper(BaseScraper):
             
             except Exception as e:
                 self.logger.error(f"  ❌ {site}: Error - {e}")
+                self.report_error(f"{site}: {e}")
                 continue
         
         self.log_scraping_stats(all_jobs)
         return all_jobs
     
-    def _parse_jobspy_row(self, row, site: str) -> Optional[Dict]:
-        """Parse JobSpy DataFrame row to normalized format"""
-        try:
-            # JobSpy standard columns
-            title = str(row.get("title", ""))
-            company = str(row.get("company", ""))
-            location = str(row.get("location", ""))
-            description = str(row.get("description", ""))
-            url = str(row.get("job_url", ""))
-            
-            # Date posted
-            date_posted = row.get("date_posted")
-            if isinstance(date_posted, str):
-                try:
-                    posted_date = datetime.fromisoformat(date_posted)
-                except:
-                    posted_date = datetime.now()
-            else:
-                posted_date = datetime.now()
-            
-            # Salary
-            salary_min = row.get("min_amount")
-            salary_max = row.get("max_amount")
-            salary = None
-            if salary_min and salary_max:
-                salary = f"€{salary_min:,.0f} - €{salary_max:,.0f}"
-            elif salary_min:
-                salary = f"€{salary_min:,.0f}+"
-            
-            # Job type
-            job_type = row.get("job_type")
-            if job_type:
-                job_type = str(job_type).lower()
-            
-            raw_job = {
-                "title": title,
-                "company": company,
-                "location": location,
-                "url": url,
-                "description": description,
-                "posted_date": posted_date,
-                "salary": salary,
-                "job_type": job_type,
-                "contract_type": None,
-                "remote_type": None,
-                "experience_level": None,
-                "requirements": None,
-                "benefits": None,
-            }
-            
-            # Set source to specific site
-            normalized = self.normalize_job(raw_job)
-            normalized["source"] = site.title()
+    def incremental_params(self, newest_posted_date: Optional[datetime],
+                           last_run_at: Optional[datetime]) -> Dict:
+        """Use JobSpy's hours_old filter from the last successful run"""
+        if not last_run_at:
+            return {}
+        
+        hours = math.ceil((datetime.now() - last_run_at).total_seconds() / 3600) + self.HOURS_OLD_MARGIN
+        return {"hours_old": max(1, hours)}
+    
+    def _normalize_jobs_df(self, jobs_df: "pd.DataFrame", site: str) -> List[Dict]:
+        """
+        Normalize a JobSpy DataFrame column-wise
+        
+        Dates, salaries, job types and required-field validation are computed
+        over whole columns instead of row by row.
+        
+        Args:
+            jobs_df: DataFrame returned by jobspy.scrape_jobs
+            site: Site the DataFrame was scraped from
             
-            return normalized
+        Returns:
+            List of normalized, valid job dictionaries (same shape as normalize_job)
+        """
+        now = datetime.now()
+        index = jobs_df.index
+        
+        def text_column(name: str) -> pd.Series:
+            if name not in jobs_df:
+                return pd.Series("", index=index, dtype=object)
+            return jobs_df[name].fillna("").astype(str).str.strip()
+        
+        def numeric_column(name: str) -> pd.Series:
+            if name not in jobs_df:
+                return pd.Series(float("nan"), index=index)
+            return pd.to_numeric(jobs_df[name], errors="coerce")
+        
+        df = pd.DataFrame({
+            "title": text_column("title"),
+            "company": text_column("company"),
+            "location": text_column("location"),
+            "description": text_column("description"),
+            "url": text_column("job_url"),
+        })
+        
+        # Date posted (strings, dates or datetimes; unparseable -> now)
+        if "date_posted" in jobs_df:
+            posted = pd.to_datetime(jobs_df["date_posted"], errors="coerce")
+            df["posted_date"] = posted.astype(object).where(posted.notna(), now)
+        else:
+            df["posted_date"] = now
+        
+        # Salary
+        salary_min = numeric_column("min_amount")
+        salary_max = numeric_column("max_amount")
+        has_min = salary_min.fillna(0) != 0
+        has_range = has_min & (salary_max.fillna(0) != 0)
+        salary = pd.Series(None, index=index, dtype=object)
+        salary[has_min] = "€" + salary_min[has_min].map("{:,.0f}".format) + "+"
+        salary[has_range] = ("€" + salary_min[has_range].map("{:,.0f}".format)
+                             + " - €" + salary_max[has_range].map("{:,.0f}".format))
+        df["salary"] = salary
+        
+        # Job type
+        if "job_type" in jobs_df:
+            job_type = jobs_df["job_type"]
+            df["job_type"] = job_type.astype(str).str.lower().where(job_type.notna() & (job_type != ""), None)
+        else:
+            df["job_type"] = None
+        
+        # Validate required fields
+        valid = (df[["title", "company", "location", "description", "url"]] != "").all(axis=1)
+        dropped = int((~valid).sum())
+        if dropped:
+            self.logger.warning(f"  {site}: {dropped} jobs missing required fields")
+        
+        df = df[valid].astype(object)
+        records = df.where(df.notna(), None).to_dict("records")
         
-        except Exception as e:
-            self.logger.error(f"Error parsing JobSpy row: {e}")
-            return None
+        constants = {
+            "contract_type": None,
+            "remote_type": None,
+            "experience_level": None,
+            "requirements": None,
+            "benefits": None,
+            "external_id": None,
+            "source": site.title(),
+            "scraped_date": now,
+        }
+        return [{**record, **constants} for record in records]
     
     def scrape_linkedin(self, keyword: str, location: str = "Germany", **kwargs) -> List[Dict]:
         """Convenience method to scrape LinkedIn only"""
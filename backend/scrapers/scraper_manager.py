@@ -3,21 +3,28 @@ Scraper Manager - orchestrates all scrapers and handles concurrent scraping
 """
 from typing import List, Dict, Optional
 import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from datetime import datetime
+from sqlalchemy import case, or_
 from sqlalchemy.orm import Session
 from models.job import Job
-from models.scraping_log import ScrapingLog
+from models.scraping_log import ScrapingLog, ScrapeWatermark
 from models.company import Company
 from models.user import UserProfile
+from scrapers.base_scraper import BaseScraper
 from scrapers.arbeitsagentur import ArbeitsagenturScraper
 from scrapers.jobspy_scraper import JobSpyScraper
 from scrapers.aggregators import KimetaScraper, JobliftScraper, JoobleScraper
 from scrapers.company_scraper import CompanyScraper
+from scrapers.http_client import close_async_clients
 from scrapers.german_job_boards import StepStoneScraper, XINGJobsScraper, MonsterDeScraper, FinestJobsScraper
 from scrapers.ai_scraper import AIIndeedScraper, AIStepStoneScraper, AIGlassdoorScraper, AIMonsterScraper
 from ai_agents.model_config import get_model_config
-from utils.deduplicator import Deduplicator
+from utils.deduplicator import Deduplicator, get_similarity_index
 from utils.logger import setup_logger
+from config import settings
 
 logger = setup_logger(__name__)
 
@@ -25,6 +32,17 @@ logger = setup_logger(__name__)
 class ScraperManager:
     """Manages and orchestrates all job scrapers"""
     
+    BULK_CHUNK_SIZE = 500  # Rows per IN (...) query / bulk write
+    DETAIL_FIELDS = ['description', 'requirements', 'benefits']  # Filled by detail enrichment
+    JOB_COLUMNS = frozenset(column.name for column in Job.__table__.columns)
+    GERMAN_REQUIRED_PATTERNS = [
+        'fluent german', 'fließend deutsch', 'fliessend deutsch',
+        'german fluency', 'deutsch fließend', 'deutsch fliessend',
+        'native german', 'muttersprachler deutsch',
+        'verhandlungssicher deutsch', 'verhandlungssichere deutschkenntnisse',
+        'c1 deutsch', 'c2 deutsch'
+    ]
+    
     def __init__(self, db: Session):
         """
         Initialize scraper manager
@@ -34,35 +52,44 @@ class ScraperManager:
         """
         self.db = db
         self.deduplicator = Deduplicator(db)
+        self.new_job_ids = []  # IDs inserted by the current run
         
         # Get model config for scrapers (now using GPT-5-mini for web intelligence)
         scraper_config = get_model_config('AIJobScraper')
         
+        ai_scraper_config = {'provider': scraper_config['provider'], 'model': scraper_config['model']}
+        
         # Initialize ONLY scrapers with real, valid URLs
-        self.scrapers = {
+        # (factories are kept so a timed-out scraper can be replaced by a fresh instance)
+        self._scraper_factories = {
             # JobSpy - LinkedIn (real job URLs)
-            'jobspy': JobSpyScraper(),
+            'jobspy': JobSpyScraper,
             
             # Arbeitsagentur - German Federal Employment Agency (Official API with real URLs)
-            'arbeitsagentur': ArbeitsagenturScraper(),
+            'arbeitsagentur': ArbeitsagenturScraper,
             
             # AI-powered scrapers (using GPT-5-mini for web intelligence and reliability)
-            'indeed': AIIndeedScraper(provider=scraper_config['provider'], model=scraper_config['model']),
-            'stepstone': AIStepStoneScraper(provider=scraper_config['provider'], model=scraper_config['model']),
-            'glassdoor': AIGlassdoorScraper(provider=scraper_config['provider'], model=scraper_config['model']),
-            'monster': AIMonsterScraper(provider=scraper_config['provider'], model=scraper_config['model']),
+            'indeed': partial(AIIndeedScraper, **ai_scraper_config),
+            'stepstone': partial(AIStepStoneScraper, **ai_scraper_config),
+            'glassdoor': partial(AIGlassdoorScraper, **ai_scraper_config),
+            'monster': partial(AIMonsterScraper, **ai_scraper_config),
             
             # Aggregators (disabled - template scrapers with fake URLs)
-            # 'kimeta': KimetaScraper(),
-            # 'joblift': JobliftScraper(),
-            # 'jooble': JoobleScraper(),
+            # 'kimeta': KimetaScraper,
+            # 'joblift': JobliftScraper,
+            # 'jooble': JoobleScraper,
             
             # Company scraper (disabled until company list available)
-            # 'company': CompanyScraper(),
+            # 'company': CompanyScraper,
         }
+        self.scrapers = {source: factory() for source, factory in self._scraper_factories.items()}
     
     def scrape_all(self, keyword: str, location: str = "Germany", 
-                   sources: Optional[List[str]] = None) -> Dict:
+                   sources: Optional[List[str]] = None,
+                   concurrent: Optional[bool] = None,
+                   max_workers: Optional[int] = None,
+                   source_timeout: Optional[float] = None,
+                   incremental: Optional[bool] = None) -> Dict:
         """
         Scrape jobs from all sources
         
@@ -70,6 +97,12 @@ class ScraperManager:
             keyword: Search keyword
             location: Search location
             sources: List of sources to scrape (None = all)
+            concurrent: Scrape sources in parallel (None = settings.scrape_concurrent)
+            max_workers: Max sources scraped at once (None = settings.scrape_max_workers)
+            source_timeout: Per-source timeout in seconds for concurrent mode
+                            (None = settings.scrape_source_timeout)
+            incremental: Only fetch jobs posted since the last run, for sources
+                         that support it (None = settings.scrape_incremental)
             
         Returns:
             Dictionary with scraping statistics
@@ -87,68 +120,57 @@ class ScraperManager:
                 'monster',        # Monster via AI (20 jobs, real URLs)
             ]
         
-        all_jobs = []
+        if concurrent is None:
+            concurrent = settings.scrape_concurrent
+        if incremental is None:
+            incremental = settings.scrape_incremental
+        
         stats = {
             'total_found': 0,
             'total_new': 0,
             'total_updated': 0,
             'sources': {}
         }
+        self.new_job_ids = []
         
-        # Scrape from each source
+        known_sources = []
         for source in sources:
             if source not in self.scrapers:
                 logger.warning(f"Unknown source: {source}")
                 continue
-            
-            try:
-                scraper = self.scrapers[source]
+            known_sources.append(source)
+        
+        # High-water marks per source for this search (incremental scraping)
+        watermarks = self._load_watermarks(known_sources, keyword, location) if incremental else {}
+        scrape_kwargs = {
+            source: self._incremental_params(source, watermarks[source]) if source in watermarks else {}
+            for source in known_sources
+        }
+        
+        if concurrent and len(known_sources) > 1:
+            self._scrape_sources_concurrent(
+                known_sources, keyword, location, stats,
+                max_workers or settings.scrape_max_workers,
+                source_timeout if source_timeout is not None else settings.scrape_source_timeout,
+                scrape_kwargs, watermarks
+            )
+        else:
+            for source in known_sources:
                 started_at = datetime.now()
-                
-                logger.info(f"📡 Scraping {source}...")
-                
-                # Handle JobSpy separately - LinkedIn only (Indeed/Glassdoor blocked by 403, StepStone unsupported)
-                if source == 'jobspy':
-                    jobs = scraper.scrape(keyword, location, 
-                                         sites=['linkedin'],
-                                         results_wanted=100)
-                else:
-                    jobs = scraper.scrape(keyword, location)
-                
-                completed_at = datetime.now()
-                duration = (completed_at - started_at).total_seconds()
-                
-                # Save jobs to database with deduplication
-                new_count, updated_count = self._save_jobs(jobs)
-                
-                # Cleanup old jobs if we exceed max limit
-                self._cleanup_old_jobs()
-                
-                # Log scraping session
-                self._log_scraping(source, len(jobs), new_count, updated_count, 
-                                  'success', None, duration, started_at, completed_at)
-                
-                stats['total_found'] += len(jobs)
-                stats['total_new'] += new_count
-                stats['total_updated'] += updated_count
-                stats['sources'][source] = {
-                    'found': len(jobs),
-                    'new': new_count,
-                    'updated': updated_count,
-                    'duration': duration
-                }
-                
-                all_jobs.extend(jobs)
-                
-            except Exception as e:
-                logger.error(f"❌ Error scraping {source}: {e}")
-                self._log_scraping(source, 0, 0, 0, 'failed', str(e), 
-                                  0, datetime.now(), datetime.now())
-                stats['sources'][source] = {'error': str(e)}
+                try:
+                    logger.info(f"📡 Scraping {source}...")
+                    jobs = self._scrape_source(source, keyword, location, **scrape_kwargs[source])
+                    self._record_source_result(source, jobs, started_at, datetime.now(), stats,
+                                               watermarks.get(source), bool(scrape_kwargs[source]))
+                except Exception as e:
+                    self._record_source_error(source, e, stats)
         
-        # Run deduplication
+        # Run deduplication (new jobs only; the full sweep runs as a scheduled job)
         logger.info("🔍 Running deduplication...")
-        duplicates = self.deduplicator.deduplicate_all()
+        if settings.dedup_incremental:
+            duplicates = self.deduplicator.deduplicate_new(self.new_job_ids)
+        else:
+            duplicates = self.deduplicator.deduplicate_all()
         stats['duplicates_found'] = len(duplicates)
         
         logger.info(f"✅ Scraping complete: {stats['total_new']} new jobs, "
@@ -156,6 +178,173 @@ class ScraperManager:
         
         return stats
     
+    def _scrape_source(self, source: str, keyword: str, location: str, **kwargs) -> List[Dict]:
+        """
+        Run a single scraper (network only - no database access)
+        
+        Safe to call from worker threads: each source has its own scraper instance.
+        """
+        scraper = self.scrapers[source]
+        scraper.errors = []
+        return scraper.scrape(keyword, location, **self._source_kwargs(source, kwargs))
+    
+    async def _ascrape_source(self, source: str, keyword: str, location: str, **kwargs) -> List[Dict]:
+        """Async version of _scrape_source() (see BaseScraper.ascrape)"""
+        scraper = self.scrapers[source]
+        scraper.errors = []
+        return await scraper.ascrape(keyword, location, **self._source_kwargs(source, kwargs))
+    
+    @staticmethod
+    def _source_kwargs(source: str, kwargs: Dict) -> Dict:
+        """Per-source scrape() arguments on top of the incremental ones"""
+        # Handle JobSpy separately - LinkedIn only (Indeed/Glassdoor blocked by 403, StepStone unsupported)
+        if source == 'jobspy':
+            return {'sites': ['linkedin'], 'results_wanted': 100, **kwargs}
+        return kwargs
+    
+    def _scrape_sources_concurrent(self, sources: List[str], keyword: str, location: str,
+                                   stats: Dict, max_workers: int, source_timeout: float,
+                                   scrape_kwargs: Dict[str, Dict], watermarks: Dict):
+        """
+        Scrape sources concurrently on one event loop
+        
+        Each source runs through its scraper's ascrape(): native async scrapers
+        (Arbeitsagentur) share the pooled client of scrapers.http_client, the
+        others run their blocking scrape() on the loop's worker threads.
+        Results are saved on the calling thread as each source finishes, since
+        the SQLAlchemy session is not thread-safe. A source still running after
+        source_timeout seconds is logged as failed, its result is discarded and
+        its scraper is cancelled and replaced (see _abandon_scraper).
+        """
+        workers = max(1, min(max_workers, len(sources)))
+        logger.info(f"⚡ Scraping {len(sources)} sources concurrently ({workers} workers)")
+        
+        loop = asyncio.new_event_loop()
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scraper")
+        loop.set_default_executor(executor)
+        try:
+            loop.run_until_complete(self._ascrape_sources(
+                sources, keyword, location, stats, workers, source_timeout, scrape_kwargs, watermarks
+            ))
+        finally:
+            loop.run_until_complete(close_async_clients())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            # Don't block on timed-out scrapers - their threads finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+            loop.close()
+        
+        # Keep per-source stats in request order, same as sequential mode
+        stats['sources'] = {s: stats['sources'][s] for s in sources if s in stats['sources']}
+    
+    async def _ascrape_sources(self, sources: List[str], keyword: str, location: str,
+                               stats: Dict, workers: int, source_timeout: float,
+                               scrape_kwargs: Dict[str, Dict], watermarks: Dict):
+        """Run at most `workers` sources at once and record each one as it finishes"""
+        semaphore = asyncio.Semaphore(workers)
+        
+        async def run(source: str):
+            async with semaphore:
+                started_at = datetime.now()
+                logger.info(f"📡 Scraping {source}...")
+                try:
+                    jobs = await asyncio.wait_for(
+                        self._ascrape_source(source, keyword, location, **scrape_kwargs[source]),
+                        timeout=source_timeout or None
+                    )
+                    return source, started_at, jobs, None
+                except asyncio.TimeoutError:
+                    self._abandon_scraper(source)
+                    return source, started_at, None, TimeoutError(f"timed out after {source_timeout}s")
+                except Exception as e:
+                    return source, started_at, None, e
+        
+        for finished in asyncio.as_completed([run(source) for source in sources]):
+            source, started_at, jobs, error = await finished
+            if error is not None:
+                self._record_source_error(source, error, stats)
+                continue
+            try:
+                self._record_source_result(source, jobs, started_at, datetime.now(), stats,
+                                           watermarks.get(source), bool(scrape_kwargs[source]),
+                                           enrich=False)
+                if source == 'arbeitsagentur' and settings.arbeitsagentur_enrich_details:
+                    stats['sources'][source]['enriched'] = await self._aenrich_arbeitsagentur_jobs(jobs)
+            except Exception as e:
+                self._record_source_error(source, e, stats)
+    
+    def _abandon_scraper(self, source: str):
+        """
+        Cancel a timed-out scraper and give the source a fresh instance
+        
+        A scrape() running in a worker thread can't be interrupted; cancel()
+        makes it stop at its next request, and the swap ensures anything it
+        still writes (e.g. errors) lands on an instance this and later runs
+        no longer use.
+        """
+        self.scrapers[source].cancel()
+        self.scrapers[source] = self._scraper_factories[source]()
+    
+    def _record_source_result(self, source: str, jobs: List[Dict], started_at: datetime,
+                              completed_at: datetime, stats: Dict,
+                              watermark: Optional[ScrapeWatermark] = None,
+                              incremental: bool = False, enrich: bool = True):
+        """
+        Save one source's jobs and add its numbers to the run statistics
+        
+        enrich=False leaves the Arbeitsagentur detail enrichment to the caller
+        (the async path fetches details on its event loop).
+        """
+        duration = (completed_at - started_at).total_seconds()
+        
+        # Incremental runs overlap the previous window a little - skip jobs already seen
+        to_save = self._drop_seen_jobs(jobs, watermark) if incremental else jobs
+        
+        # Save jobs to database with deduplication
+        failed_urls = set()
+        new_count, updated_count = self._save_jobs(to_save, failed_urls)
+        
+        # A scraper that swallowed errors may have returned a partial result -
+        # leave its watermark alone so the next run covers the same window
+        scrape_errors = self.scrapers[source].errors if source in self.scrapers else []
+        if watermark is not None:
+            if scrape_errors:
+                logger.warning(f"⚠️ {source}: {len(scrape_errors)} scrape errors, watermark not advanced")
+            else:
+                self._update_watermark(watermark, jobs, completed_at, incremental, failed_urls)
+        
+        # Cleanup old jobs if we exceed max limit
+        self._cleanup_old_jobs()
+        
+        # Log scraping session
+        self._log_scraping(source, len(jobs), new_count, updated_count, 
+                          'success', None, duration, started_at, completed_at)
+        
+        stats['total_found'] += len(jobs)
+        stats['total_new'] += new_count
+        stats['total_updated'] += updated_count
+        stats['sources'][source] = {
+            'found': len(jobs),
+            'new': new_count,
+            'updated': updated_count,
+            'duration': duration
+        }
+        if scrape_errors:
+            stats['sources'][source]['errors'] = list(scrape_errors)
+        if watermark is not None:
+            stats['sources'][source]['incremental'] = incremental
+            stats['sources'][source]['skipped_seen'] = len(jobs) - len(to_save)
+        
+        # List view only has title/occupation - fetch full text for jobs not enriched yet
+        if enrich and source == 'arbeitsagentur' and settings.arbeitsagentur_enrich_details:
+            stats['sources'][source]['enriched'] = self._enrich_arbeitsagentur_jobs(jobs)
+    
+    def _record_source_error(self, source: str, error: Exception, stats: Dict):
+        """Log a failed source and record the error in the run statistics"""
+        logger.error(f"❌ Error scraping {source}: {error}")
+        self._log_scraping(source, 0, 0, 0, 'failed', str(error), 
+                          0, datetime.now(), datetime.now())
+        stats['sources'][source] = {'error': str(error)}
+    
     def scrape_companies(self, keywords: List[str] = None) -> Dict:
         """
         Scrape jobs from company career pages
@@ -226,79 +415,399 @@ class ScraperManager:
         
         return stats
     
-    def _save_jobs(self, jobs: List[Dict]) -> tuple:
+    def _save_jobs(self, jobs: List[Dict], failed_urls: Optional[set] = None) -> tuple:
         """
-        Save jobs to database with filtering and immediate match score calculation
+        Save jobs to database with filtering (bulk upsert by URL)
+        
+        Existing URLs are prefetched with one IN query per chunk, then each chunk
+        is written with a single INSERT ... ON CONFLICT(url) DO UPDATE
+        (SQLite and PostgreSQL; other databases fall back to bulk ORM mappings).
         
         Args:
             jobs: List of job dictionaries
+            failed_urls: If given, receives the URLs of rows whose chunk was rolled back
             
         Returns:
             Tuple of (new_count, updated_count)
         """
+        # Filter, keep one row per URL (last one wins)
+        rows_by_url = {}
+        for job_data in jobs:
+            try:
+                if self._should_skip_job(job_data):
+                    continue
+                row = {key: value for key, value in job_data.items() if key in self.JOB_COLUMNS}
+                if row.get('url'):
+                    rows_by_url[row['url']] = row
+            except Exception as e:
+                logger.error(f"Error saving job: {e}")
+                continue
+        
+        rows = list(rows_by_url.values())
         new_count = 0
         updated_count = 0
-        new_job_ids = []  # Track new jobs for match score calculation
         
-        for job_data in jobs:
+        for i in range(0, len(rows), self.BULK_CHUNK_SIZE):
+            chunk = rows[i:i + self.BULK_CHUNK_SIZE]
             try:
-                # FILTER 1: Skip internships
-                title = (job_data.get('title') or '').lower()
-                job_type = (job_data.get('job_type') or '').lower()
-                if 'intern' in title or 'praktikum' in title or 'internship' in job_type:
-                    logger.debug(f"Skipping internship: {job_data.get('title')}")
-                    continue
-                
-                # FILTER 2: Skip jobs requiring fluent German
-                description = (job_data.get('description') or '').lower()
-                requirements = (job_data.get('requirements') or '').lower()
-                combined_text = f"{description} {requirements}"
-                
-                german_required_patterns = [
-                    'fluent german', 'fließend deutsch', 'fliessend deutsch',
-                    'german fluency', 'deutsch fließend', 'deutsch fliessend',
-                    'native german', 'muttersprachler deutsch',
-                    'verhandlungssicher deutsch', 'verhandlungssichere deutschkenntnisse',
-                    'c1 deutsch', 'c2 deutsch'
-                ]
-                
-                if any(pattern in combined_text for pattern in german_required_patterns):
-                    logger.debug(f"Skipping job requiring fluent German: {job_data.get('title')}")
-                    continue
+                existing = self._existing_job_ids([row['url'] for row in chunk])
+                self._upsert_jobs(chunk, existing)
+                self.db.commit()
+                new_urls = [row['url'] for row in chunk if row['url'] not in existing]
+                updated_count += len(chunk) - len(new_urls)
+                new_count += len(new_urls)
                 
-                # FILTER 3: Only full-time jobs
-                if job_type and job_type not in ['full-time', 'full time', 'fulltime', 'vollzeit', '']:
-                    logger.debug(f"Skipping non-fulltime job: {job_data.get('title')}")
-                    continue
+                # Remember inserted IDs for incremental deduplication
+                if new_urls:
+                    self.new_job_ids.extend(
+                        job_id for (job_id,) in self.db.query(Job.id).filter(Job.url.in_(new_urls))
+                    )
+            except Exception as e:
+                logger.error(f"Error committing jobs: {e}")
+                self.db.rollback()
+                if failed_urls is not None:
+                    failed_urls.update(row['url'] for row in chunk)
+        
+        return new_count, updated_count
+    
+    def _should_skip_job(self, job_data: Dict) -> bool:
+        """Apply the scraping filters (internships, fluent German, non-fulltime)"""
+        # FILTER 1: Skip internships
+        title = (job_data.get('title') or '').lower()
+        job_type = (job_data.get('job_type') or '').lower()
+        if 'intern' in title or 'praktikum' in title or 'internship' in job_type:
+            logger.debug(f"Skipping internship: {job_data.get('title')}")
+            return True
+        
+        # FILTER 2: Skip jobs requiring fluent German
+        description = (job_data.get('description') or '').lower()
+        requirements = (job_data.get('requirements') or '').lower()
+        combined_text = f"{description} {requirements}"
+        
+        if any(pattern in combined_text for pattern in self.GERMAN_REQUIRED_PATTERNS):
+            logger.debug(f"Skipping job requiring fluent German: {job_data.get('title')}")
+            return True
+        
+        # FILTER 3: Only full-time jobs
+        if job_type and job_type not in ['full-time', 'full time', 'fulltime', 'vollzeit', '']:
+            logger.debug(f"Skipping non-fulltime job: {job_data.get('title')}")
+            return True
+        
+        return False
+    
+    def _existing_job_ids(self, urls: List[str]) -> Dict[str, int]:
+        """Map URL -> job ID for the given URLs that are already stored"""
+        return dict(self.db.query(Job.url, Job.id).filter(Job.url.in_(urls)).all())
+    
+    def _upsert_jobs(self, rows: List[Dict], existing: Dict[str, int]):
+        """Insert new jobs and update existing ones (matched by URL) in bulk"""
+        # executemany needs the same keys in every row, and an update must only
+        # overwrite the columns a row actually has - so rows are written per key set
+        groups = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        
+        for keys, group in groups.items():
+            self._upsert_job_group(group, list(keys), existing)
+    
+    def _upsert_job_group(self, rows: List[Dict], keys: List[str], existing: Dict[str, int]):
+        """Bulk upsert of rows that all have exactly the given keys"""
+        now = datetime.now()
+        
+        update_keys = [key for key in keys if key not in ('id', 'url', 'created_at', 'scraped_date')]
+        defaults = {'is_active': True, 'is_duplicate': False, 'view_count': 0, 'created_at': now}
+        params = [
+            {**defaults, **row,
+             'scraped_date': now, 'updated_at': now}
+            for row in rows
+        ]
+        
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            if dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            
+            table = Job.__table__
+            stmt = insert(table)
+            set_ = {}
+            for key in update_keys:
+                if key in self.DETAIL_FIELDS:
+                    # Keep full details fetched by enrichment
+                    set_[key] = case((table.c.details_fetched_at.is_(None), stmt.excluded[key]),
+                                     else_=table.c[key])
+                else:
+                    set_[key] = stmt.excluded[key]
+            set_['scraped_date'] = stmt.excluded.scraped_date
+            set_['updated_at'] = stmt.excluded.updated_at
+            
+            self.db.execute(stmt.on_conflict_do_update(index_elements=['url'], set_=set_), params)
+            return
+        
+        # Generic fallback: bulk ORM mappings
+        enriched_ids = set()
+        if existing:
+            enriched_ids = {
+                job_id for (job_id,) in self.db.query(Job.id)
+                .filter(Job.id.in_(list(existing.values())))
+                .filter(Job.details_fetched_at.isnot(None))
+            }
+        
+        inserts = [row for row in params if row['url'] not in existing]
+        updates = []
+        for row in params:
+            job_id = existing.get(row['url'])
+            if job_id is None:
+                continue
+            update = {key: row[key] for key in update_keys + ['scraped_date', 'updated_at']}
+            if job_id in enriched_ids:
+                for key in self.DETAIL_FIELDS:
+                    update.pop(key, None)
+            update['id'] = job_id
+            updates.append(update)
+        
+        if inserts:
+            self.db.bulk_insert_mappings(Job, inserts)
+        if updates:
+            self.db.bulk_update_mappings(Job, updates)
+    
+    def _load_watermarks(self, sources: List[str], keyword: str,
+                         location: str) -> Dict[str, ScrapeWatermark]:
+        """Get (or create) the watermark of each source that supports incremental scraping"""
+        watermarks = {}
+        
+        try:
+            for source in sources:
+                scraper = self.scrapers[source]
+                if type(scraper).incremental_params is BaseScraper.incremental_params:
+                    continue  # Source has no "posted since" filter
                 
-                # Check if job already exists by URL
-                existing = self.db.query(Job).filter(Job.url == job_data['url']).first()
+                watermark = self.db.query(ScrapeWatermark).filter(
+                    ScrapeWatermark.source == source,
+                    ScrapeWatermark.keyword == keyword,
+                    ScrapeWatermark.location == location
+                ).first()
                 
-                if existing:
-                    # Update existing job
-                    for key, value in job_data.items():
-                        if hasattr(existing, key) and key not in ['id', 'created_at', 'scraped_date']:
-                            setattr(existing, key, value)
-                    existing.updated_at = datetime.now()
-                    existing.scraped_date = datetime.now()
-                    updated_count += 1
-                else:
-                    # Create new job
-                    job = Job(**job_data)
-                    self.db.add(job)
-                    new_count += 1
+                if not watermark:
+                    watermark = ScrapeWatermark(source=source, keyword=keyword, location=location)
+                    self.db.add(watermark)
                 
-            except Exception as e:
-                logger.error(f"Error saving job: {e}")
-                continue
+                watermarks[source] = watermark
+            
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"Error loading scrape watermarks: {e}")
+            self.db.rollback()
+            return {}
+        
+        return watermarks
+    
+    def _incremental_params(self, source: str, watermark: ScrapeWatermark) -> Dict:
+        """Scraper kwargs for a delta scrape, or {} when a full scrape is due"""
+        if not watermark.last_run_at or not watermark.last_full_run_at:
+            return {}
         
+        hours_since_full = (datetime.now() - watermark.last_full_run_at).total_seconds() / 3600
+        if hours_since_full >= settings.scrape_full_refresh_hours:
+            return {}
+        
+        params = self.scrapers[source].incremental_params(watermark.newest_posted_date,
+                                                          watermark.last_run_at)
+        if params:
+            logger.info(f"⏩ {source}: incremental scrape {params}")
+        return params
+    
+    @staticmethod
+    def _job_key(job: Dict) -> str:
+        """Stable ID of a scraped job for watermark bookkeeping"""
+        return job.get('external_id') or job.get('url', '')
+    
+    def _drop_seen_jobs(self, jobs: List[Dict], watermark: ScrapeWatermark) -> List[Dict]:
+        """
+        Remove jobs already seen by a previous run of the same search
+        
+        The dropped jobs are still live on the source, so their rows get the
+        scraped_date/is_active refresh a full save would have given them.
+        """
+        seen = set(watermark.get_seen_ids())
+        unseen, already_seen = [], []
+        for job in jobs:
+            (already_seen if self._job_key(job) in seen else unseen).append(job)
+        self._touch_seen_jobs(already_seen)
+        return unseen
+    
+    def _touch_seen_jobs(self, jobs: List[Dict]):
+        """Mark stored jobs as scraped now and active, matched by external_id or URL"""
+        external_ids = list({job['external_id'] for job in jobs if job.get('external_id')})
+        urls = list({job['url'] for job in jobs if job.get('url')})
+        if not external_ids and not urls:
+            return
+        
+        now = datetime.now()
         try:
+            touched = 0
+            for i in range(0, max(len(external_ids), len(urls)), self.BULK_CHUNK_SIZE):
+                touched += self.db.query(Job).filter(or_(
+                    Job.external_id.in_(external_ids[i:i + self.BULK_CHUNK_SIZE]),
+                    Job.url.in_(urls[i:i + self.BULK_CHUNK_SIZE])
+                )).update({Job.scraped_date: now, Job.is_active: True}, synchronize_session=False)
             self.db.commit()
+            logger.info(f"🔄 Refreshed {touched} already seen jobs")
         except Exception as e:
-            logger.error(f"Error committing jobs: {e}")
+            logger.error(f"Error refreshing already seen jobs: {e}")
             self.db.rollback()
+    
+    def _update_watermark(self, watermark: ScrapeWatermark, jobs: List[Dict],
+                          completed_at: datetime, incremental: bool,
+                          failed_urls: Optional[set] = None):
+        """
+        Advance a watermark after a successful scrape
         
-        return new_count, updated_count
+        Jobs whose save was rolled back are not marked as seen, and while any
+        were lost the time window (newest_posted_date/last_run_at) stays put
+        so the next run fetches them again.
+        """
+        failed_urls = failed_urls or set()
+        if failed_urls:
+            logger.warning(f"⚠️ {len(failed_urls)} jobs not saved, watermark window not advanced")
+            jobs = [job for job in jobs if job.get('url') not in failed_urls]
+        
+        try:
+            posted_dates = [
+                job['posted_date'].replace(tzinfo=None)
+                for job in jobs if isinstance(job.get('posted_date'), datetime)
+            ]
+            if posted_dates and not failed_urls:
+                newest = max(posted_dates)
+                if not watermark.newest_posted_date or newest > watermark.newest_posted_date:
+                    watermark.newest_posted_date = newest
+            
+            # Keep the most recently seen IDs, oldest first
+            seen = watermark.get_seen_ids()
+            seen_set = set(seen)
+            for job in jobs:
+                key = self._job_key(job)
+                if key and key not in seen_set:
+                    seen.append(key)
+                    seen_set.add(key)
+            watermark.seen_ids = json.dumps(seen[-settings.scrape_seen_ids_limit:])
+            
+            if not failed_urls:
+                watermark.last_run_at = completed_at
+                if not incremental:
+                    watermark.last_full_run_at = completed_at
+            
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"Error updating scrape watermark: {e}")
+            self.db.rollback()
+    
+    def _enrich_arbeitsagentur_jobs(self, jobs: List[Dict]) -> int:
+        """
+        Fill in description/requirements/benefits from the Arbeitsagentur details API
+        
+        Only jobs whose details were never fetched are enriched; details are
+        fetched in parallel and written back in bulk. The scraping filters are
+        re-applied to the full text, and jobs that fail them are deactivated.
+        
+        Args:
+            jobs: Jobs returned by ArbeitsagenturScraper.scrape
+            
+        Returns:
+            Number of jobs enriched
+        """
+        pending = self._pending_arbeitsagentur_details(jobs)
+        if not pending:
+            return 0
+        
+        try:
+            details = self.scrapers['arbeitsagentur'].get_job_details_batch(list(pending))
+        except Exception as e:
+            logger.error(f"Error enriching Arbeitsagentur jobs: {e}")
+            return 0
+        return self._store_arbeitsagentur_details(pending, details)
+    
+    async def _aenrich_arbeitsagentur_jobs(self, jobs: List[Dict]) -> int:
+        """Async version of _enrich_arbeitsagentur_jobs() (details fetched on the event loop)"""
+        pending = self._pending_arbeitsagentur_details(jobs)
+        if not pending:
+            return 0
+        
+        try:
+            details = await self.scrapers['arbeitsagentur'].aget_job_details_batch(list(pending))
+        except Exception as e:
+            logger.error(f"Error enriching Arbeitsagentur jobs: {e}")
+            return 0
+        return self._store_arbeitsagentur_details(pending, details)
+    
+    def _pending_arbeitsagentur_details(self, jobs: List[Dict]) -> Dict[str, List[tuple]]:
+        """refnr -> [(job_id, current description, title, job_type)] for stored jobs still missing details"""
+        refnrs = list(dict.fromkeys(job['external_id'] for job in jobs if job.get('external_id')))
+        pending = {}
+        
+        try:
+            for i in range(0, len(refnrs), self.BULK_CHUNK_SIZE):
+                chunk = refnrs[i:i + self.BULK_CHUNK_SIZE]
+                rows = self.db.query(Job.id, Job.external_id, Job.description, Job.title, Job.job_type)\
+                    .filter(Job.source == 'Arbeitsagentur')\
+                    .filter(Job.external_id.in_(chunk))\
+                    .filter(Job.details_fetched_at.is_(None))\
+                    .all()
+                for job_id, refnr, description, title, job_type in rows:
+                    pending.setdefault(refnr, []).append((job_id, description, title, job_type))
+        except Exception as e:
+            logger.error(f"Error enriching Arbeitsagentur jobs: {e}")
+            self.db.rollback()
+            return {}
+        
+        return pending
+    
+    def _store_arbeitsagentur_details(self, pending: Dict[str, List[tuple]], details: Dict[str, Dict]) -> int:
+        """
+        Write fetched details back in bulk
+        
+        The list view only has a short text, so the scraping filters (e.g.
+        fluent German required) run again on the full details; jobs that fail
+        them are deactivated.
+        
+        Returns:
+            Number of jobs enriched
+        """
+        try:
+            now = datetime.now()
+            mappings = []
+            rejected = []
+            for refnr, job_details in details.items():
+                for job_id, description, title, job_type in pending.get(refnr, []):
+                    mapping = {
+                        'id': job_id,
+                        'description': job_details.get('description') or description,
+                        'requirements': job_details.get('requirements') or None,
+                        'benefits': job_details.get('benefits') or None,
+                        'details_fetched_at': now,
+                    }
+                    if self._should_skip_job({**mapping, 'title': title, 'job_type': job_type}):
+                        mapping['is_active'] = False
+                        rejected.append(job_id)
+                    mappings.append(mapping)
+            
+            for i in range(0, len(mappings), self.BULK_CHUNK_SIZE):
+                self.db.bulk_update_mappings(Job, mappings[i:i + self.BULK_CHUNK_SIZE])
+            self.db.commit()
+            
+            similarity_index = get_similarity_index()
+            for job_id in rejected:
+                similarity_index.remove(job_id)
+            
+            logger.info(f"📄 Enriched {len(mappings)} Arbeitsagentur jobs with full details"
+                        + (f" ({len(rejected)} deactivated by filters)" if rejected else ""))
+            return len(mappings)
+        
+        except Exception as e:
+            logger.error(f"Error enriching Arbeitsagentur jobs: {e}")
+            self.db.rollback()
+            return 0
     
     def _calculate_match_scores_for_jobs(self, job_ids: List[int]):
         """Calculate match scores immediately for specific jobs"""
@@ -353,8 +862,6 @@ class ScraperManager:
     
     def _cleanup_old_jobs(self):
         """Clean up old jobs if database exceeds max limit"""
-        from config import settings
-        
         try:
             # Count total active jobs
             total_jobs = self.db.query(Job).filter(Job.is_active == True).count()
@@ -377,6 +884,10 @@ class ScraperManager:
                     job.is_active = False  # Soft delete
                 
                 self.db.commit()
+                
+                similarity_index = get_similarity_index()
+                for job in old_jobs:
+                    similarity_index.remove(job.id)
                 logger.info(f"✅ Deactivated {to_delete} old jobs")
         except Exception as e:
             logger.error(f"Error cleaning up old jobs: {e}")
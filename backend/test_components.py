@@ -0,0 +1,444 @@
+"""
+Tests for self-contained backend components (no network, no LLM calls)
+
+Run with: python -m pytest test_components.py
+"""
+import sys
+import os
+import re
+import random
+import threading
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from config import settings
+from database import Base
+import models  # noqa: F401 - registers all tables
+from models.job import Job, JobAnalysis
+from models.scraping_log import ScrapeWatermark
+from ai_agents import provider_health
+from ai_agents.provider_health import ProviderHealth, CLOSED, OPEN, HALF_OPEN
+from ai_agents.agent_manager import AgentManager
+from scrapers.base_scraper import BaseScraper
+from scrapers.scraper_manager import ScraperManager
+from utils.deduplicator import Deduplicator, get_similarity_index
+from utils.keyword_matcher import KeywordMatcher
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _job_row(url, **fields):
+    row = {
+        'title': 'ML Engineer',
+        'company': 'Acme',
+        'location': 'Berlin',
+        'posted_date': datetime(2026, 1, 1),
+        'description': 'Python and SQL',
+        'url': url,
+        'source': 'test',
+    }
+    row.update(fields)
+    return row
+
+
+# ---------------------------------------------------------------------------
+# ScraperManager bulk upsert
+# ---------------------------------------------------------------------------
+
+def test_upsert_keeps_columns_missing_from_row(db):
+    """A re-saved job without a salary key must keep its stored salary"""
+    manager = ScraperManager.__new__(ScraperManager)
+    manager.db = db
+
+    manager._upsert_jobs([_job_row('u1', salary='50k')], {})
+    db.commit()
+
+    # Same chunk: u1 without salary next to a row that has one
+    existing = manager._existing_job_ids(['u1', 'u2'])
+    manager._upsert_jobs([_job_row('u1', title='Senior ML Engineer'), _job_row('u2', salary='60k')], existing)
+    db.commit()
+    db.expire_all()
+
+    jobs = {job.url: job for job in db.query(Job)}
+    assert jobs['u1'].salary == '50k'
+    assert jobs['u1'].title == 'Senior ML Engineer'
+    assert jobs['u2'].salary == '60k'
+
+
+class _StubScraper:
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+
+
+def _manager(db, scraper):
+    manager = ScraperManager.__new__(ScraperManager)
+    manager.db = db
+    manager.new_job_ids = []
+    manager.scrapers = {'src': scraper}
+    return manager
+
+
+def _watermark(db):
+    watermark = ScrapeWatermark(source='src', keyword='ml', location='Berlin')
+    db.add(watermark)
+    db.commit()
+    return watermark
+
+
+def test_watermark_not_advanced_when_scraper_reported_errors(db):
+    manager = _manager(db, _StubScraper(errors=["page 1: 503"]))
+    watermark = _watermark(db)
+
+    stats = {'total_found': 0, 'total_new': 0, 'total_updated': 0, 'sources': {}}
+    manager._record_source_result('src', [], datetime.now(), datetime.now(), stats, watermark, False)
+
+    assert watermark.last_run_at is None
+    assert watermark.get_seen_ids() == []
+
+
+def test_streamed_material_creates_missing_analysis(db):
+    manager = ScraperManager.__new__(ScraperManager)
+    manager.db = db
+    manager._upsert_jobs([_job_row('u1')], {})
+    db.commit()
+    job_id = db.query(Job.id).scalar()
+
+    agents = AgentManager.__new__(AgentManager)
+    agents.db_factory = sessionmaker(bind=db.get_bind())
+    streamed = list(agents._save_streamed_material(job_id, 'tailored_resume', iter(["Led ", "ML work"])))
+
+    assert streamed == ["Led ", "ML work"]
+    analysis = db.query(JobAnalysis).filter(JobAnalysis.job_id == job_id).one()
+    assert analysis.tailored_resume == "Led ML work"
+
+
+class _HangingScraper(BaseScraper):
+    def __init__(self):
+        super().__init__(delay_min=0.05, delay_max=0.05)
+        self.stopped = threading.Event()
+
+    def scrape(self, keyword, location="Germany", **kwargs):
+        while not self.is_cancelled():
+            self.random_delay()
+        self.report_error("still running after the timeout")
+        self.stopped.set()
+        return []
+
+
+def test_timed_out_scraper_is_cancelled_and_replaced(db):
+    hanging = _HangingScraper()
+    manager = _manager(db, hanging)
+    manager._scraper_factories = {'src': _HangingScraper}
+
+    stats = {'total_found': 0, 'total_new': 0, 'total_updated': 0, 'sources': {}}
+    manager._scrape_sources_concurrent(['src'], 'ml', 'Berlin', stats, 1, 0.2, {'src': {}}, {})
+
+    assert 'timed out' in stats['sources']['src']['error']
+    assert hanging.stopped.wait(timeout=2)
+    assert manager.scrapers['src'] is not hanging
+    assert manager.scrapers['src'].errors == []
+
+
+def test_seen_jobs_are_refreshed_instead_of_saved(db):
+    manager = _manager(db, _StubScraper())
+    manager._upsert_jobs([_job_row('u1', external_id='r1')], {})
+    db.query(Job).update({Job.scraped_date: datetime(2026, 1, 1), Job.is_active: False})
+    db.commit()
+    watermark = _watermark(db)
+    watermark.seen_ids = '["r1"]'
+
+    stats = {'total_found': 0, 'total_new': 0, 'total_updated': 0, 'sources': {}}
+    manager._record_source_result('src', [_job_row('u1-moved', external_id='r1')], datetime.now(),
+                                  datetime.now(), stats, watermark, True)
+
+    job = db.query(Job).one()
+    assert stats['sources']['src']['new'] == 0
+    assert job.is_active and job.scraped_date > datetime(2026, 1, 1)
+
+
+def test_watermark_skips_rows_of_rolled_back_chunk(db, monkeypatch):
+    manager = _manager(db, _StubScraper())
+    watermark = _watermark(db)
+    monkeypatch.setattr(ScraperManager, "BULK_CHUNK_SIZE", 1)
+
+    original_upsert = ScraperManager._upsert_jobs
+
+    def failing_upsert(self, rows, existing):
+        if rows[0]['url'] == 'u2':
+            raise RuntimeError("database is locked")
+        return original_upsert(self, rows, existing)
+
+    monkeypatch.setattr(ScraperManager, "_upsert_jobs", failing_upsert)
+    stats = {'total_found': 0, 'total_new': 0, 'total_updated': 0, 'sources': {}}
+    manager._record_source_result('src', [_job_row('u1'), _job_row('u2')], datetime.now(), datetime.now(),
+                                  stats, watermark, False)
+
+    assert stats['total_new'] == 1
+    assert watermark.get_seen_ids() == ['u1']
+    assert watermark.last_run_at is None  # u2 must be fetched again
+
+
+def test_enrichment_deactivates_jobs_failing_filters_on_full_text(db):
+    manager = _manager(db, _StubScraper())
+    manager._upsert_jobs([
+        _job_row('u1', source='Arbeitsagentur', external_id='r1', description='ML role'),
+        _job_row('u2', source='Arbeitsagentur', external_id='r2', description='ML role'),
+    ], {})
+    db.commit()
+
+    pending = manager._pending_arbeitsagentur_details([{'external_id': 'r1'}, {'external_id': 'r2'}])
+    enriched = manager._store_arbeitsagentur_details(pending, {
+        'r1': {'description': 'Build ML pipelines', 'requirements': 'Python'},
+        'r2': {'description': 'Build ML pipelines', 'requirements': 'Fließend Deutsch (C1 Deutsch)'},
+    })
+    db.expire_all()
+
+    jobs = {job.url: job for job in db.query(Job)}
+    assert enriched == 2
+    assert jobs['u1'].is_active and jobs['u1'].details_fetched_at
+    assert not jobs['u2'].is_active
+    assert jobs['u2'].requirements == 'Fließend Deutsch (C1 Deutsch)'
+
+
+# ---------------------------------------------------------------------------
+# Deduplicator blocking
+# ---------------------------------------------------------------------------
+
+def _pairwise_duplicates(deduplicator, jobs):
+    """Reference: the all-pairs scan deduplicate_all did before blocking"""
+    duplicates, checked = [], set()
+    for i, job1 in enumerate(jobs):
+        if job1.id in checked:
+            continue
+        for job2 in jobs[i + 1:]:
+            if job2.id in checked or not deduplicator._is_duplicate(job1, job2):
+                continue
+            original, duplicate = (job1, job2) if job1.posted_date <= job2.posted_date else (job2, job1)
+            checked.add(duplicate.id)
+            duplicates.append((duplicate.id, original.id))
+    return duplicates
+
+
+def _add_jobs(db, specs):
+    for n, spec in enumerate(specs):
+        title, company, source = spec[:3]
+        location = spec[3] if len(spec) > 3 else 'Berlin'
+        db.add(Job(**_job_row(f'u{n}', title=title, company=company, source=source, location=location,
+                              posted_date=datetime(2026, 1, 1) + timedelta(hours=n))))
+    db.commit()
+    return db.query(Job).filter(Job.is_active == True, Job.is_duplicate == False).all()
+
+
+def _random_job_specs(count, seed=7):
+    """Near-duplicate postings: reworded titles, legal forms, typos, other sources"""
+    rng = random.Random(seed)
+    titles = ['Senior ML Engineer', 'Sr ML Engineer', 'Data Scientist', 'Senior Data Scientist',
+              'MLOps Engineer', 'ML Ops Engineer', 'Backend Developer', 'Python Developer (m/w/d)']
+    companies = ['SAP SE', 'SAP', 'Zalando', 'Zalando DE', 'Siemens AG', 'Siemens', 'N26 GmbH', 'N26']
+    locations = ['Berlin', 'Munich', 'Berlin, Germany', 'Hamburg']
+    sources = ['linkedin', 'indeed', 'arbeitsagentur', 'stepstone']
+    specs = []
+    for _ in range(count):
+        title = rng.choice(titles)
+        if rng.random() < 0.2:
+            position = rng.randrange(len(title))
+            title = title[:position] + title[position + 1:]  # Typo
+        specs.append((title, rng.choice(companies), rng.choice(sources), rng.choice(locations)))
+    return specs
+
+
+def test_blocking_finds_same_pairs_as_pairwise_scan(db):
+    jobs = _add_jobs(db, [
+        ('Data Scientist', 'Siemens AG', 'linkedin'),
+        ('Data Scientist', 'Siemens', 'arbeitsagentur'),
+        ('Data Engineer', 'The Adtech Company', 'linkedin'),
+        ('Data Engineer', 'Adtech Company GmbH', 'indeed'),
+        ('ML Engineer', 'N26 GmbH', 'linkedin'),
+        ('ML Engineer', 'N26', 'stepstone'),
+        ('ML Engineer', 'N26', 'linkedin'),  # Same source as the first N26 posting
+        ('Senior Backend Developer', 'SAP SE', 'indeed'),
+        ('Sr Backend Developer', 'SAP', 'linkedin'),  # Reworded title and legal form
+        ('Senior ML Engineer', 'Zalando', 'linkedin'),
+        ('Sr ML Engineer', 'Zalando DE', 'indeed'),
+    ])
+    deduplicator = Deduplicator(db)
+    expected = _pairwise_duplicates(deduplicator, jobs)
+
+    assert deduplicator.deduplicate_all() == expected
+    assert len(expected) == 5
+
+
+def test_blocking_matches_pairwise_scan_on_generated_postings(db):
+    jobs = _add_jobs(db, _random_job_specs(300))
+    deduplicator = Deduplicator(db)
+    expected = _pairwise_duplicates(deduplicator, jobs)
+
+    assert deduplicator.deduplicate_all() == expected
+    assert len(expected) > 50
+
+
+def test_length_range_keeps_every_reachable_length(db):
+    deduplicator = Deduplicator(db)
+    for length in range(1, 80):
+        low, high = deduplicator._length_range(length)
+        for other in range(1, 160):
+            reachable = 200 * min(length, other) / (length + other) >= deduplicator.similarity_threshold
+            assert reachable == (low <= other <= high)
+
+
+def test_incremental_dedup_matches_job_with_other_company_spelling(db):
+    get_similarity_index().invalidate()
+    _add_jobs(db, [('Senior Backend Developer', 'SAP SE', 'indeed')])
+    deduplicator = Deduplicator(db)
+    get_similarity_index().sync(db)
+
+    db.add(Job(**_job_row('new', title='Sr Backend Developer', company='SAP', source='linkedin',
+                          posted_date=datetime(2026, 2, 1))))
+    db.commit()
+    new_id = db.query(Job.id).filter(Job.url == 'new').scalar()
+
+    assert deduplicator.deduplicate_new([new_id]) == [(new_id, 1)]
+    get_similarity_index().invalidate()
+
+
+# ---------------------------------------------------------------------------
+# Provider circuit breaker
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.monotonic() for the circuit breaker"""
+    now = [1000.0]
+    monkeypatch.setattr(provider_health.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(settings, "llm_circuit_failure_threshold", 3)
+    monkeypatch.setattr(settings, "llm_circuit_cooldown_seconds", 60.0)
+    return now
+
+
+def test_circuit_opens_after_consecutive_failures(clock):
+    health = ProviderHealth("deepseek", "deepseek-chat")
+    health.record_failure()
+    health.record_failure()
+    assert health.state == CLOSED and health.allow_request()
+
+    health.record_failure()
+    assert health.state == OPEN
+    assert not health.allow_request()
+    assert health.is_open()
+
+
+def test_half_open_probe_closes_circuit_on_success(clock):
+    health = ProviderHealth("deepseek", "deepseek-chat")
+    for _ in range(3):
+        health.record_failure()
+
+    clock[0] += 61
+    assert not health.is_open()
+    assert health.allow_request()  # The single probe
+    assert health.state == HALF_OPEN
+    assert not health.allow_request()  # No second request while probing
+
+    health.record_success(1.0, 800)
+    assert health.state == CLOSED
+    assert health.allow_request()
+
+
+def test_half_open_probe_failure_reopens_circuit(clock):
+    health = ProviderHealth("deepseek", "deepseek-chat")
+    for _ in range(3):
+        health.record_failure()
+
+    clock[0] += 61
+    assert health.allow_request()
+    health.record_failure()
+    assert health.state == OPEN
+    assert health.open_count == 2
+    assert not health.allow_request()
+
+
+def test_released_probe_can_be_retaken(clock):
+    health = ProviderHealth("deepseek", "deepseek-chat")
+    for _ in range(3):
+        health.record_failure()
+
+    clock[0] += 61
+    assert health.allow_request()
+    health.release_probe()  # e.g. rate limiter wait exceeded, nothing sent
+    assert health.allow_request()
+
+
+def test_hedge_delay_only_uses_calls_with_enough_budget(monkeypatch):
+    monkeypatch.setattr(settings, "llm_hedge_min_samples", 3)
+    monkeypatch.setattr(settings, "llm_hedge_min_delay_seconds", 0.0)
+    health = ProviderHealth("deepseek", "deepseek-chat")
+    for latency in (1.0, 2.0, 3.0):
+        health.record_success(latency, 800)
+
+    assert health.hedge_delay(800) == 3.0
+    assert health.hedge_delay(3000) is None
+
+
+def test_health_is_tracked_per_model():
+    assert provider_health.get_health("deepseek", "deepseek-chat") is \
+        provider_health.get_health("deepseek", "deepseek-chat")
+    assert provider_health.get_health("deepseek", "deepseek-chat") is not \
+        provider_health.get_health("deepseek", "deepseek-reasoner")
+
+
+# ---------------------------------------------------------------------------
+# KeywordMatcher
+# ---------------------------------------------------------------------------
+
+MATCHER_KEYWORDS = [
+    '.net', 'asp.net', 'c++', 'c', 'c#', 'node.js', 'sql', 'nosql', 'ms sql',
+    'machine learning', 'learning', 'deep learning', 'ml', 'a/b testing',
+    'ci/cd', 'aa', 'go', 'google cloud',
+]
+
+MATCHER_TEXTS = [
+    "Experience with .NET, ASP.NET Core and C++ (C++17); C# a plus. Not .net-only.",
+    "Stack: C, C++, c#, node.js/Node.JS and vb.net",
+    "SQL, NoSQL and MS SQL Server; mssql and sql-server",
+    "Machine Learning and deep learning; machine learning engineers love learning",
+    "ML/MLOps, A/B testing, CI/CD pipelines, ci/cd",
+    "aaa aa aaaa a aa_aa aa-aa",
+    "Go, Golang, Google Cloud, google cloud platform, go-to",
+    "",
+]
+
+
+def _regex_counts(keywords, text):
+    counts = {}
+    for keyword in keywords:
+        found = len(re.findall(r'\b' + re.escape(keyword) + r'\b', text.lower()))
+        if found:
+            counts[keyword] = found
+    return counts
+
+
+@pytest.mark.parametrize("text", MATCHER_TEXTS)
+def test_keyword_matcher_matches_regex_findall(text):
+    assert KeywordMatcher(MATCHER_KEYWORDS).count(text) == _regex_counts(MATCHER_KEYWORDS, text)
+
+
+def test_keyword_matcher_counts_overlapping_keywords_independently():
+    counts = KeywordMatcher(['machine learning', 'learning', 'deep learning']).count(
+        "Deep learning and machine learning")
+    assert counts == {'machine learning': 1, 'learning': 2, 'deep learning': 1}
+
+
+def test_keyword_matcher_dedupes_and_lowercases_keywords():
+    matcher = KeywordMatcher(['Python', 'python', '', 'SQL'])
+    assert matcher.keywords == ['python', 'sql']
+    assert matcher.count("python PYTHON Sql") == {'python': 2, 'sql': 1}
@@ -2,7 +2,11 @@
 Job deduplication engine
 Uses fuzzy matching to identify duplicate job postings
 """
-from typing import List, Tuple
+import math
+import threading
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
 from sqlalchemy.orm import Session
 from models.job import Job
 from utils.logger import setup_logger
@@ -13,22 +17,34 @@ try:
 except ImportError:
     RAPIDFUZZ_AVAILABLE = False
 
+try:
+    import numpy as np
+    from rapidfuzz import process
+    CDIST_AVAILABLE = RAPIDFUZZ_AVAILABLE
+except ImportError:
+    CDIST_AVAILABLE = False
+
 logger = setup_logger(__name__)
 
+# Jobs per process.cdist call in the full sweep
+SWEEP_CHUNK_SIZE = 512
+
 
 class Deduplicator:
     """Identifies and marks duplicate job postings"""
     
-    def __init__(self, db: Session, similarity_threshold: int = 85):
+    def __init__(self, db: Session, similarity_threshold: int = 85, workers: int = -1):
         """
         Initialize deduplicator
         
         Args:
             db: Database session
             similarity_threshold: Minimum similarity score (0-100) to consider duplicate
+            workers: Threads for RapidFuzz cdist scoring (-1 = all cores)
         """
         self.db = db
         self.similarity_threshold = similarity_threshold
+        self.workers = workers
         
         if not RAPIDFUZZ_AVAILABLE:
             logger.warning("⚠️  RapidFuzz not installed. Using basic matching.")
@@ -37,6 +53,11 @@ class Deduplicator:
         """
         Find and mark all duplicate jobs
         
+        Jobs are sorted by comparison-string length and each job is only
+        scored against later jobs whose length can still reach the threshold
+        (see _length_range), in multi-threaded process.cdist calls. The filter
+        is lossless, so the result is the same as scoring every pair.
+        
         Returns:
             List of tuples (duplicate_id, original_id)
         """
@@ -50,6 +71,10 @@ class Deduplicator:
         
         logger.info(f"Checking {len(jobs)} jobs for duplicates...")
         
+        # Normalized comparison strings, built once per job
+        texts = [self._comparison_string(job) for job in jobs]
+        matches = self._matching_pairs(jobs, texts)
+        
         duplicates = []
         checked = set()
         
@@ -57,26 +82,27 @@ class Deduplicator:
             if job1.id in checked:
                 continue
             
-            for job2 in jobs[i+1:]:
+            # Matching later jobs, in the same order as the pairwise scan
+            for j in matches.get(i, ()):
+                job2 = jobs[j]
                 if job2.id in checked:
                     continue
                 
-                if self._is_duplicate(job1, job2):
-                    # Keep the older one (earliest posted_date) as original
-                    if job1.posted_date <= job2.posted_date:
-                        original = job1
-                        duplicate = job2
-                    else:
-                        original = job2
-                        duplicate = job1
-                    
-                    # Mark as duplicate
-                    duplicate.is_duplicate = True
-                    duplicate.duplicate_of = original.id
-                    checked.add(duplicate.id)
-                    
-                    duplicates.append((duplicate.id, original.id))
-                    logger.debug(f"Duplicate found: Job {duplicate.id} → {original.id}")
+                # Keep the older one (earliest posted_date) as original
+                if job1.posted_date <= job2.posted_date:
+                    original = job1
+                    duplicate = job2
+                else:
+                    original = job2
+                    duplicate = job1
+                
+                # Mark as duplicate
+                duplicate.is_duplicate = True
+                duplicate.duplicate_of = original.id
+                checked.add(duplicate.id)
+                
+                duplicates.append((duplicate.id, original.id))
+                logger.debug(f"Duplicate found: Job {duplicate.id} → {original.id}")
         
         # Commit changes
         try:
@@ -86,8 +112,194 @@ class Deduplicator:
             logger.error(f"Error committing duplicates: {e}")
             self.db.rollback()
         
+        # Index is rebuilt from the swept table on next use
+        get_similarity_index().invalidate()
+        
+        return duplicates
+    
+    def deduplicate_new(self, job_ids: List[int]) -> List[Tuple[int, int]]:
+        """
+        Check only newly inserted jobs against the in-memory similarity index
+        
+        Each new job is compared with the indexed jobs of compatible length (and with
+        the new jobs checked before it). The older job of a matching pair stays
+        the original, as in deduplicate_all.
+        
+        Args:
+            job_ids: IDs of jobs inserted since the last check
+            
+        Returns:
+            List of tuples (duplicate_id, original_id)
+        """
+        duplicates = []
+        if not job_ids:
+            return duplicates
+        
+        index = get_similarity_index()
+        
+        with index.lock:
+            index.sync(self.db, exclude=set(job_ids))
+            
+            new_jobs = self.db.query(Job).filter(
+                Job.id.in_(job_ids),
+                Job.is_active == True,
+                Job.is_duplicate == False
+            ).order_by(Job.id).all()
+            
+            logger.info(f"🔍 Checking {len(new_jobs)} new jobs against {len(index)} indexed jobs...")
+            
+            for job in new_jobs:
+                text = self._comparison_string(job)
+                
+                for entry in self._matching_entries(index, job, text):
+                    if index.get(entry.id) is None:
+                        continue  # Removed earlier in this loop
+                    
+                    if job.posted_date <= entry.posted_date:
+                        # Indexed job is the newer posting - mark it (if still valid in DB)
+                        marked = self.db.query(Job).filter(
+                            Job.id == entry.id,
+                            Job.is_active == True,
+                            Job.is_duplicate == False
+                        ).update({Job.is_duplicate: True, Job.duplicate_of: job.id},
+                                 synchronize_session=False)
+                        index.remove(entry.id)
+                        if marked:
+                            duplicates.append((entry.id, job.id))
+                            logger.debug(f"Duplicate found: Job {entry.id} → {job.id}")
+                        continue
+                    
+                    original = self.db.query(Job.id).filter(
+                        Job.id == entry.id,
+                        Job.is_active == True,
+                        Job.is_duplicate == False
+                    ).first()
+                    if not original:
+                        index.remove(entry.id)  # Stale entry
+                        continue
+                    
+                    job.is_duplicate = True
+                    job.duplicate_of = entry.id
+                    duplicates.append((job.id, entry.id))
+                    logger.debug(f"Duplicate found: Job {job.id} → {entry.id}")
+                    break
+                
+                if not job.is_duplicate:
+                    index.add(job)
+            
+            try:
+                self.db.commit()
+                logger.info(f"✅ Marked {len(duplicates)} duplicates")
+            except Exception as e:
+                logger.error(f"Error committing duplicates: {e}")
+                self.db.rollback()
+                index.invalidate()
+        
         return duplicates
     
+    def _matching_entries(self, index: "SimilarityIndex", job: Job, text: str) -> List["_IndexedJob"]:
+        """Indexed jobs (by ID) from other sources that match a new job"""
+        low, high = self._length_range(len(text))
+        entries = [
+            entry for entry in (index.get(i) for i in sorted(index.candidates(low, high)))
+            if entry is not None and entry.id != job.id and entry.source != job.source
+        ]
+        if not entries:
+            return []
+        
+        if CDIST_AVAILABLE:
+            scores = process.cdist([text], [entry.text for entry in entries], scorer=fuzz.ratio,
+                                   score_cutoff=self.similarity_threshold, workers=self.workers)[0]
+            return [entry for entry, score in zip(entries, scores.tolist())
+                    if score >= self.similarity_threshold]
+        
+        return [entry for entry in entries if self._similarity(text, entry.text) >= self.similarity_threshold]
+    
+    def _matching_pairs(self, jobs: List[Job], texts: List[str]) -> Dict[int, List[int]]:
+        """
+        Score all candidate pairs and keep those at or above the threshold
+        
+        Args:
+            jobs: Jobs to compare (order defines the pair direction)
+            texts: Comparison string of each job
+            
+        Returns:
+            Dictionary of job index -> sorted indices of later jobs it matches
+        """
+        # Shortest first: a job's candidates are a contiguous run after it
+        order = sorted(range(len(jobs)), key=lambda i: len(texts[i]))
+        lengths = [len(texts[i]) for i in order]
+        sorted_texts = [texts[i] for i in order]
+        
+        matches = defaultdict(set)
+        
+        def add_match(a: int, b: int):
+            i, j = order[a], order[b]
+            if jobs[i].source != jobs[j].source:
+                matches[min(i, j)].add(max(i, j))
+        
+        if CDIST_AVAILABLE:
+            _, source_codes = np.unique([jobs[i].source or "" for i in order], return_inverse=True)
+            for start in range(0, len(order), SWEEP_CHUNK_SIZE):
+                end = min(start + SWEEP_CHUNK_SIZE, len(order))
+                stop = bisect_right(lengths, self._length_range(lengths[end - 1])[1])
+                scores = process.cdist(sorted_texts[start:end], sorted_texts[start:stop], scorer=fuzz.ratio,
+                                       score_cutoff=self.similarity_threshold, workers=self.workers)
+                
+                # Pairs after the row in sorted order, from different sources
+                mask = scores >= self.similarity_threshold
+                mask &= np.arange(start, stop)[None, :] > np.arange(start, end)[:, None]
+                mask &= source_codes[start:end, None] != source_codes[None, start:stop]
+                rows, cols = np.nonzero(mask)
+                for a, b in zip((rows + start).tolist(), (cols + start).tolist()):
+                    add_match(a, b)
+        else:
+            for a in range(len(order)):
+                stop = bisect_right(lengths, self._length_range(lengths[a])[1])
+                for b in range(a + 1, stop):
+                    if self._similarity(sorted_texts[a], sorted_texts[b]) >= self.similarity_threshold:
+                        add_match(a, b)
+        
+        return {i: sorted(partners) for i, partners in matches.items()}
+    
+    def _length_range(self, length: int) -> Tuple[int, float]:
+        """
+        Comparison-string lengths a string of this length can match
+        
+        fuzz.ratio(a, b) can't exceed 200 * min(len) / (len(a) + len(b)), so
+        lengths outside this range never reach the threshold (lossless).
+        The word-Jaccard fallback has no length bound.
+        """
+        threshold = self.similarity_threshold
+        if not RAPIDFUZZ_AVAILABLE or threshold <= 0:
+            return 0, math.inf
+        if threshold >= 200:
+            return length, length
+        
+        # Small epsilon: rounding must only ever widen the range
+        low = math.ceil(length * threshold / (200 - threshold) - 1e-9)
+        high = math.floor(length * (200 - threshold) / threshold + 1e-9)
+        return low, high
+    
+    def _length_allows_match(self, len1: int, len2: int) -> bool:
+        """
+        Length filter: fuzz.ratio can't exceed 200 * min / (len1 + len2)
+        
+        (Lossless - never drops a pair that could reach the threshold.)
+        """
+        if not RAPIDFUZZ_AVAILABLE:
+            return True  # Word-Jaccard fallback has no length bound
+        
+        total = len1 + len2
+        if total == 0:
+            return True
+        return 200 * min(len1, len2) / total >= self.similarity_threshold
+    
+    @staticmethod
+    def _comparison_string(job: Job) -> str:
+        """String compared for fuzzy matching"""
+        return f"{job.title} {job.company} {job.location}".lower()
+    
     def _is_duplicate(self, job1: Job, job2: Job) -> bool:
         """
         Check if two jobs are duplicates using fuzzy matching
@@ -108,17 +320,19 @@ class Deduplicator:
             return True
         
         # Combine title, company, and location for comparison
-        str1 = f"{job1.title} {job1.company} {job1.location}".lower()
-        str2 = f"{job2.title} {job2.company} {job2.location}".lower()
+        str1 = self._comparison_string(job1)
+        str2 = self._comparison_string(job2)
         
+        return self._similarity(str1, str2) >= self.similarity_threshold
+    
+    def _similarity(self, str1: str, str2: str) -> float:
+        """Similarity score (0-100) of two comparison strings"""
         if RAPIDFUZZ_AVAILABLE:
             # Use RapidFuzz for fuzzy matching
-            similarity = fuzz.ratio(str1, str2)
-        else:
-            # Fallback to simple string matching
-            similarity = self._simple_similarity(str1, str2)
+            return fuzz.ratio(str1, str2)
         
-        return similarity >= self.similarity_threshold
+        # Fallback to simple string matching
+        return self._simple_similarity(str1, str2)
     
     def _simple_similarity(self, str1: str, str2: str) -> float:
         """
@@ -178,8 +392,117 @@ class Deduplicator:
             remove_job.duplicate_of = keep_id
             
             self.db.commit()
+            get_similarity_index().remove(remove_id)
             logger.info(f"Merged job {remove_id} into {keep_id}")
         
         except Exception as e:
             logger.error(f"Error merging duplicates: {e}")
             self.db.rollback()
+
+
+class _IndexedJob:
+    """Fields of an indexed job needed for fuzzy matching"""
+    __slots__ = ("id", "source", "posted_date", "text")
+    
+    def __init__(self, job_id: int, source: str, posted_date, text: str):
+        self.id = job_id
+        self.source = source
+        self.posted_date = posted_date
+        self.text = text
+
+
+class SimilarityIndex:
+    """
+    In-memory index of active, non-duplicate jobs, bucketed by comparison-string length
+    
+    Kept for the life of the process so incremental deduplication doesn't
+    reload the jobs table. Jobs inserted by other processes are picked up by
+    sync() (by ID); entries that went stale are dropped when they are hit.
+    """
+    
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._entries: Dict[int, _IndexedJob] = {}
+        self._by_length: Dict[int, Set[int]] = defaultdict(set)
+        self._max_id = 0
+        self._built = False
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def sync(self, db: Session, exclude: Set[int] = None):
+        """
+        Build the index on first use, afterwards add jobs inserted since the last sync
+        
+        Args:
+            db: Database session
+            exclude: Job IDs not to add (e.g. the new jobs about to be checked)
+        """
+        with self.lock:
+            query = db.query(Job.id, Job.title, Job.company, Job.location, Job.source, Job.posted_date)
+            if self._built:
+                query = query.filter(Job.id > self._max_id)
+            else:
+                self._entries.clear()
+                self._by_length.clear()
+                self._max_id = 0
+            
+            rows = query.filter(Job.is_active == True, Job.is_duplicate == False).all()
+            exclude = exclude or set()
+            
+            for row in rows:
+                self._max_id = max(self._max_id, row.id)
+                if row.id not in exclude:
+                    self.add(row)
+            
+            if not self._built:
+                logger.info(f"📇 Built similarity index with {len(self._entries)} jobs")
+            self._built = True
+    
+    def add(self, job):
+        """Add (or replace) a job; accepts a Job or a row with the same attributes"""
+        with self.lock:
+            self.remove(job.id)
+            entry = _IndexedJob(job.id, job.source, job.posted_date, Deduplicator._comparison_string(job))
+            self._entries[job.id] = entry
+            self._by_length[len(entry.text)].add(job.id)
+            self._max_id = max(self._max_id, job.id)
+    
+    def remove(self, job_id: int):
+        """Remove a job (deactivated, deleted or marked duplicate)"""
+        with self.lock:
+            entry = self._entries.pop(job_id, None)
+            if entry is None:
+                return
+            bucket = self._by_length.get(len(entry.text))
+            if bucket is not None:
+                bucket.discard(job_id)
+                if not bucket:
+                    del self._by_length[len(entry.text)]
+    
+    def get(self, job_id: int) -> Optional[_IndexedJob]:
+        return self._entries.get(job_id)
+    
+    def candidates(self, min_length: int, max_length: float) -> Set[int]:
+        """IDs of indexed jobs whose comparison string length is within the range"""
+        result = set()
+        for length, ids in self._by_length.items():
+            if min_length <= length <= max_length:
+                result |= ids
+        return result
+    
+    def invalidate(self):
+        """Force a full rebuild on next sync (after a full sweep or failed commit)"""
+        with self.lock:
+            self._built = False
+
+
+# Singleton instance
+_similarity_index = None
+
+def get_similarity_index() -> SimilarityIndex:
+    """Get the process-wide similarity index"""
+    global _similarity_index
+    if _similarity_index is None:
+        _similarity_index = SimilarityIndex()
+    return _similarity_index
@@ -0,0 +1,115 @@
+"""
+Multi-keyword matcher
+Aho-Corasick automaton that counts whole-word occurrences of many keywords
+in a single pass over the text
+"""
+from collections import deque
+from typing import Dict, Iterable, List
+
+
+def _is_word_char(char: str) -> bool:
+    """Same character class as regex \\w"""
+    return char.isalnum() or char == '_'
+
+
+class KeywordMatcher:
+    """
+    Counts keyword occurrences in one scan, whatever the number of keywords
+
+    Counts are identical to running
+    len(re.findall(r'\\b' + re.escape(keyword) + r'\\b', text.lower()))
+    for every keyword: matching is case-insensitive, both ends need a word
+    boundary and occurrences of the same keyword never overlap.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Build the automaton
+
+        Args:
+            keywords: Keywords/phrases to match (lowercased, empty ones ignored)
+        """
+        self.keywords: List[str] = []
+        seen = set()
+        for keyword in keywords:
+            keyword = keyword.lower()
+            if keyword and keyword not in seen:
+                seen.add(keyword)
+                self.keywords.append(keyword)
+
+        # Word-ness of each keyword's first/last character (for the \b checks)
+        self._starts_with_word = [_is_word_char(kw[0]) for kw in self.keywords]
+        self._ends_with_word = [_is_word_char(kw[-1]) for kw in self.keywords]
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._output[state].append(index)
+
+        # Breadth-first failure links; each state also reports the keywords
+        # that end at its longest proper suffix
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+                queue.append(next_state)
+
+    def count(self, text: str) -> Dict[str, int]:
+        """
+        Count whole-word occurrences of every keyword
+
+        Args:
+            text: Text to search (lowercased before matching)
+
+        Returns:
+            Dict mapping each keyword found to its occurrence count
+            (keywords that do not occur are left out)
+        """
+        text = text.lower()
+        length = len(text)
+        goto, fail, output = self._goto, self._fail, self._output
+        starts_with_word, ends_with_word = self._starts_with_word, self._ends_with_word
+        keywords = self.keywords
+
+        counts: Dict[int, int] = {}
+        # End of the last counted occurrence per keyword (occurrences don't overlap)
+        last_end: Dict[int, int] = {}
+
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for index in output[state]:
+                end = position + 1
+                start = end - len(keywords[index])
+                if start < last_end.get(index, 0):
+                    continue
+                before_is_word = start > 0 and _is_word_char(text[start - 1])
+                if before_is_word == starts_with_word[index]:
+                    continue
+                after_is_word = end < length and _is_word_char(text[end])
+                if after_is_word == ends_with_word[index]:
+                    continue
+                counts[index] = counts.get(index, 0) + 1
+                last_end[index] = end
+
+        return {keywords[index]: count for index, count in counts.items()}
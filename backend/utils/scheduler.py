@@ -56,6 +56,17 @@ class JobScheduler:
             )
             logger.info(f"   Analysis scheduled every {settings.analysis_interval_hours} hours")
         
+        # Schedule full deduplication sweep (scrapes only check new jobs)
+        if settings.dedup_full_sweep_hours > 0:
+            self.scheduler.add_job(
+                func=self._scheduled_dedup_sweep,
+                trigger=IntervalTrigger(hours=settings.dedup_full_sweep_hours),
+                id='dedup_sweep',
+                name='Full deduplication sweep',
+                replace_existing=True
+            )
+            logger.info(f"   Deduplication sweep scheduled every {settings.dedup_full_sweep_hours} hours")
+        
         # Schedule manual prep cleanup (daily)
         self.scheduler.add_job(
             func=self._cleanup_expired_preps,
@@ -122,6 +133,16 @@ class JobScheduler:
         
         except Exception as e:
             logger.error(f"❌ Error in scheduled scraping: {e}")
+        
+        # Keep the inventory sortable by rules-based ATS score (no AI)
+        db = self.db_factory()
+        try:
+            from ai_agents.rules_ats_batch import RulesATSBatch
+            RulesATSBatch(db).run()
+        except Exception as e:
+            logger.error(f"❌ Error in rules-based ATS batch: {e}")
+        finally:
+            db.close()
     
     def _scheduled_analysis(self):
         """Scheduled analysis task"""
@@ -130,43 +151,49 @@ class JobScheduler:
         try:
             db = self.db_factory()
             
-            from models.job import Job, JobAnalysis
-            from ai_agents.agent_manager import AgentManager
-            
-            # Get jobs WITH match_score but WITHOUT full ATS analysis
-            # Only analyze jobs with good match scores (60%+)
-            jobs = db.query(Job)\
-                .join(JobAnalysis)\
-                .filter(Job.is_active == True)\
-                .filter(JobAnalysis.match_score >= 60)\
-                .filter(JobAnalysis.ats_score == 0)\
-                .limit(20)\
-                .all()
-            
-            if not jobs:
-                logger.info("No high-match jobs to analyze")
-                db.close()
-                return
-            
-            logger.info(f"🤖 Running FULL AI analysis on {len(jobs)} high-match jobs (60%+)...")
+            from ai_agents.scoring_funnel import ScoringFunnel
             
-            agent_manager = AgentManager(db)
-            
-            for job in jobs:
-                try:
-                    # Full AI analysis: All 5 agents + 42-point ATS + tailored materials
-                    agent_manager.analyze_job(job.id, generate_materials=True)
-                    logger.info(f"✅ Analyzed job {job.id}: {job.title}")
-                except Exception as e:
-                    logger.error(f"Error analyzing job {job.id}: {e}")
-                    continue
+            # Quick match every new job, re-rank the best ones with the
+            # rules-based ATS scorer and run the full AI analysis (all agents
+            # + tailored materials) on the top-K only - see settings.funnel_*.
+            # Layer 3 of the ATS scoring only runs (or runs in the background)
+            # when the faster layers disagree - see settings.scheduled_ats_policy
+            funnel = ScoringFunnel(
+                db,
+                db_factory=self.db_factory,
+                ats_policy=settings.scheduled_ats_policy,
+                speculative_ats=settings.scheduled_ats_speculative
+            )
+            stats = funnel.run(generate_materials=True)
             
             db.close()
-            logger.info("✅ Scheduled full AI analysis completed")
+            
+            batch = stats.get('llm_batch')
+            if batch:
+                logger.info(f"✅ Scheduled full AI analysis completed: {batch['success']}/{batch['total']} "
+                           f"in {batch['elapsed_seconds']}s")
+            else:
+                logger.info("No high-match jobs to analyze")
         
         except Exception as e:
             logger.error(f"❌ Error in scheduled analysis: {e}")
     
+    def _scheduled_dedup_sweep(self):
+        """Scheduled full deduplication of all active jobs"""
+        logger.info("⏰ Running scheduled deduplication sweep...")
+        
+        db = self.db_factory()
+        try:
+            from utils.deduplicator import Deduplicator
+            
+            duplicates = Deduplicator(db).deduplicate_all()
+            logger.info(f"✅ Deduplication sweep completed: {len(duplicates)} duplicates")
+        
+        except Exception as e:
+            logger.error(f"❌ Error in deduplication sweep: {e}")
+        finally:
+            db.close()
+    
     def add_job(self, func, trigger, job_id: str, **kwargs):
         """
         Add a custom job to scheduler